@@ -16,6 +16,25 @@ def importFile(fileName, genome, trackName):
     from gtrackcore.preprocess.PreProcessTracksJob import PreProcessAllTracksJob
     PreProcessAllTracksJob(genome, trackName).process()
 
+def exportTrackBundle(bundleFileName, genome, trackName):
+    """bundleFileName genome trackName"""
+    
+    trackName = _convertTrackName(trackName)
+    if not _trackNameExists(genome, trackName):
+        return
+    
+    from gtrackcore.track.hierarchy.TrackBundle import exportTrackBundle as _exportTrackBundle
+    _exportTrackBundle(genome, trackName, os.path.abspath(bundleFileName))
+
+def importTrackBundle(bundleFileName, trackName=None):
+    """bundleFileName [trackName]"""
+    
+    if trackName is not None:
+        trackName = _convertTrackName(trackName)
+    
+    from gtrackcore.track.hierarchy.TrackBundle import importTrackBundle as _importTrackBundle
+    _importTrackBundle(bundleFileName, trackName)
+
 def _convertTrackName(trackName):
     from gtrackcore.util.CommonFunctions import convertTNstrToTNListFormat
     return convertTNstrToTNListFormat(trackName, doUnquoting=True)
@@ -96,8 +115,32 @@ def exportFileInRegion(outFileName, genome, trackName, fileFormatName, allowOver
     
     _commonExportFile(outFileName, genome, trackName, fileFormatName, allowOverlaps, bins)
 
+def getTrackViewSummary(genome, trackName, region):
+    """genome trackName region (e.g. chr21:1m-2m)"""
+    
+    trackName = _convertTrackName(trackName)
+    if not _trackNameExists(genome, trackName):
+        return
     
-def _usage():
+    from gtrackcore.input.userbins.UserBinSource import UserBinSource
+    from gtrackcore.track.core.Track import PlainTrack
+    
+    bins = UserBinSource(region, '*', genome, includeExtraChrs=True)
+    track = PlainTrack(trackName)
+    print '{:<35}'.format('region') + '{:<20}'.format('trackFormat') + 'numElements'
+    print '-'*80
+    for bin in bins:
+        tv = track.getTrackView(bin)
+        print '{:<35}'.format(str(bin)) + '{:<20}'.format(tv.trackFormat.getFormatName()) + str(tv.getNumElements())
+
+def _getFuncList(module):
+    from collections import OrderedDict
+    import types
+    
+    return OrderedDict((a, module.__dict__.get(a)) for a in sorted(dir(module))
+                       if isinstance(module.__dict__.get(a), types.FunctionType) and a[0] != '_')
+
+def _usage(funcList):
     print 'syntax: '
     print 'to use: [name] [args]'
     print 'available commands: '
@@ -105,21 +148,21 @@ def _usage():
     sys.exit(0)
 
 if __name__ == "__main__":
-    from collections import OrderedDict
-    import types
-    import sys
-    thisModule = sys.modules[__name__]
-
-    funcList = OrderedDict((a, thisModule.__dict__.get(a)) for a in sorted(dir(thisModule))
-                if isinstance(thisModule.__dict__.get(a), types.FunctionType) and a[0] != '_')
+    funcList = _getFuncList(sys.modules[__name__])
 
     if len(sys.argv) == 1:
-        _usage()
+        _usage(funcList)
     else:
         assert( len(sys.argv) >= 2)
         if not sys.argv[1] in funcList:
-            _usage()
+            _usage(funcList)
         else:
+            #If an ApiServer is running, the command is run there, avoiding the startup costs
+            from gtrackcore.core.ApiServer import forwardToApiServer
+            succeeded = forwardToApiServer(sys.argv[1], sys.argv[2:])
+            if succeeded is not None:
+                sys.exit(0 if succeeded else 1)
+            
             try:
                 func = funcList[sys.argv[1]]
                 func(*sys.argv[2:])
@@ -127,4 +170,4 @@ if __name__ == "__main__":
                 print
                 print 'usage: python Api.py ' + str(func.__name__) + ' ' + str(func.__doc__)
                 print
-                raise
\ No newline at end of file
+                raise
@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import socket
+import traceback
+import SocketServer
+
+from cStringIO import StringIO
+
+API_SOCKET_ENV_VAR = 'GTRACKCORE_API_SOCKET'
+DEFAULT_API_SOCKET_PATH = '~/gtrackcore_api.sock'
+
+#
+# An ApiServer runs the commands of Api.py in a long-running process listening on a Unix socket,
+# so that modules, configuration, genome metadata and opened preprocessed files (memmaps and
+# bounding regions) are kept in memory between commands. When a server is running, Api.py forwards
+# its command line to the server instead of running the command itself.
+#
+# The protocol is one JSON line per connection in each direction:
+#   request:  {"command": <Api function name>, "args": [<str>, ...], "cwd": <client working dir>}
+#   response: {"output": <captured stdout>, "error": <traceback or null>}
+#
+# The socket path is taken from the GTRACKCORE_API_SOCKET environment variable, if set (an empty
+# value disables forwarding), otherwise ~/gtrackcore_api.sock is used.
+#
+
+def _encode(val):
+    return val.encode('utf-8') if isinstance(val, unicode) else val
+
+def getApiSocketPath():
+    return os.path.expanduser(os.environ.get(API_SOCKET_ENV_VAR, DEFAULT_API_SOCKET_PATH))
+
+def forwardToApiServer(command, args, socketPath=None):
+    '''
+    Runs an Api command in a running ApiServer and prints its output. Returns
+    None if no server is listening or the server does not reply, in which
+    case the command should be run locally, otherwise whether the command
+    succeeded.
+    '''
+    if socketPath is None:
+        socketPath = getApiSocketPath()
+    if not socketPath or not os.path.exists(socketPath):
+        return None
+
+    try:
+        #Arguments and paths are byte strings, which JSON requires to be UTF-8 encoded
+        request = json.dumps({'command': command, 'args': list(args), 'cwd': os.getcwd()}, encoding='utf-8')
+    except UnicodeDecodeError:
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(socketPath)
+        except socket.error:
+            return None
+
+        #The command may have been run when the reply is missing, so it is not run again locally
+        try:
+            sock.sendall(request + '\n')
+            response = json.loads(sock.makefile('rb').readline())
+            output, error = response['output'], response['error']
+            if not isinstance(output, basestring) or not (error is None or isinstance(error, basestring)):
+                raise ValueError('invalid reply: %s' % response)
+        except (socket.error, ValueError, TypeError, KeyError), e:
+            sys.stderr.write('Error: no valid reply from the ApiServer at "%s" (%s)\n' % (socketPath, e))
+            return False
+    finally:
+        sock.close()
+
+    sys.stdout.write(_encode(output))
+    if error is not None:
+        sys.stderr.write(_encode(error))
+        return False
+    return True
+
+
+class _OutputCapture(object):
+    'Collects written output as UTF-8 encoded bytes, also when unicode is printed.'
+    def __init__(self):
+        self._out = StringIO()
+
+    def write(self, data):
+        self._out.write(_encode(data))
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return self._out.getvalue()
+
+
+class _ApiRequestHandler(SocketServer.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            output, error = self.server.runCommand(_encode(request['command']), \
+                                                   [_encode(x) for x in request['args']], _encode(request['cwd']))
+        except Exception:
+            output, error = '', traceback.format_exc()
+        self.wfile.write(json.dumps({'output': output.decode('utf-8', 'replace'), \
+                                     'error': error.decode('utf-8', 'replace') if error is not None else None}) + '\n')
+
+
+class ApiServer(SocketServer.UnixStreamServer):
+    '''
+    Serves Api commands on a Unix socket, one at a time (the standard output
+    and working directory of the process are redirected for each command).
+    The shared cache of preprocessed files and the cached bounding regions
+    are cleared whenever the track metadata has been updated, e.g. by
+    importing a track.
+    '''
+    def __init__(self, socketPath=None):
+        from gtrackcore.core import Api
+        from gtrackcore.metadata.TrackInfo import TrackInfo
+        from gtrackcore.track.memmap.TrackSource import TrackSource
+
+        self._socketPath = socketPath if socketPath is not None else getApiSocketPath()
+        self._funcList = Api._getFuncList(Api)
+        self._trackInfoShelveFn = TrackInfo.SHELVE_FN
+        self._trackInfoMtime = self._getTrackInfoMtime()
+
+        self._removeStaleSocket()
+        SocketServer.UnixStreamServer.__init__(self, self._socketPath, _ApiRequestHandler)
+        TrackSource.enableSharedFileCache()
+
+    def _removeStaleSocket(self):
+        from gtrackcore.util.CustomExceptions import ArgumentValueError
+
+        if os.path.exists(self._socketPath):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self._socketPath)
+            except socket.error:
+                os.unlink(self._socketPath)
+            else:
+                raise ArgumentValueError('An ApiServer is already listening on "%s"' % self._socketPath)
+            finally:
+                sock.close()
+
+    def _getTrackInfoMtime(self):
+        return os.path.getmtime(self._trackInfoShelveFn) if os.path.exists(self._trackInfoShelveFn) else None
+
+    def _clearCachesIfTracksUpdated(self):
+        from gtrackcore.input.userbins.BoundingRegionUserBinSource import BoundingRegionUserBinSource
+        from gtrackcore.track.memmap.TrackSource import TrackSource
+
+        mtime = self._getTrackInfoMtime()
+        if mtime != self._trackInfoMtime:
+            TrackSource.clearSharedFileCache()
+            BoundingRegionUserBinSource.clearRegionArraysCache()
+            self._trackInfoMtime = mtime
+
+    def runCommand(self, command, args, cwd):
+        'Returns the standard output of the command and the traceback of any error.'
+        if command not in self._funcList:
+            return '', 'Unknown command: %s. Available commands: %s\n' % (command, ', '.join(self._funcList.keys()))
+
+        self._clearCachesIfTracksUpdated()
+        func = self._funcList[command]
+        error = None
+        prevStdout, prevCwd = sys.stdout, os.getcwd()
+        sys.stdout = _OutputCapture()
+        try:
+            os.chdir(cwd)
+            func(*args)
+        except (Exception, SystemExit):
+            error = '\nusage: python Api.py %s %s\n\n%s' % (func.__name__, func.__doc__, traceback.format_exc())
+        finally:
+            output = sys.stdout.getvalue()
+            sys.stdout = prevStdout
+            os.chdir(prevCwd)
+        self._clearCachesIfTracksUpdated()
+        return output, error
+
+    def server_close(self):
+        from gtrackcore.track.memmap.TrackSource import TrackSource
+
+        SocketServer.UnixStreamServer.server_close(self)
+        TrackSource.disableSharedFileCache()
+        if os.path.exists(self._socketPath):
+            os.unlink(self._socketPath)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in [1, 2]:
+        print 'Syntax: python ApiServer.py [socketPath]'
+        sys.exit(0)
+
+    server = ApiServer(sys.argv[1] if len(sys.argv) == 2 else None)
+    print 'Listening on "%s"' % server.server_address
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
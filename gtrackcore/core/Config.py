@@ -19,7 +19,12 @@ class Config(object):
     _INITIALIZED = False
     
     @classmethod
-    def initialize(cls, configFileName='~/gtrackcore_config', dataDir='~/gtrackcore_data'):
+    def initialize(cls, configFileName='~/gtrackcore_config', dataDir='~/gtrackcore_data', writeConfig=False):
+        '''
+        Sets the configuration from the defaults and any existing config file.
+        If writeConfig is True, the resulting configuration is written back
+        to the config file (e.g. to create a template for editing).
+        '''
         cls._INITIALIZED = True
         
         try:
@@ -54,7 +59,8 @@ class Config(object):
             if configFileName:
                 if os.path.exists(configFileName):
                     cls._readConfig(configFileName, configDef)            
-                cls._writeConfig(configFileName, configDef)
+                if writeConfig:
+                    cls._writeConfig(configFileName, configDef)
         
         except:
             cls._INITIALIZED = False
@@ -0,0 +1,105 @@
+import os
+import shutil
+import multiprocessing
+
+from collections import deque, namedtuple
+from itertools import islice, izip
+from tempfile import mkdtemp
+from zipfile import ZipFile, ZIP_DEFLATED
+
+from gtrackcore.util.CommonFunctions import ensurePathExists
+
+ExtractionJob = namedtuple('ExtractionJob', ['trackName', 'regionList', 'fn', 'kwArgs'])
+
+def _extractToFile(job):
+    from gtrackcore.extract.TrackExtractor import TrackExtractor
+    return TrackExtractor.extract(job.trackName, job.regionList, job.fn, **job.kwArgs)
+
+class ExtractionPool(object):
+    '''
+    Runs extraction jobs, typically one per (track, region) combination, in a
+    bounded pool of worker processes. The results are returned in job order.
+    After each finished job, progressCallback (if given) is called with the
+    number of finished jobs, the total number of jobs and the job.
+
+    At most MAX_JOBS_IN_FLIGHT_PER_WORKER jobs per worker are submitted ahead
+    of the result that is being consumed, so that finished results do not
+    pile up while the consumer waits for a slow job.
+
+    With numWorkers=1, the jobs are run serially in the current process.
+    '''
+    MAX_JOBS_IN_FLIGHT_PER_WORKER = 2
+
+    def __init__(self, numWorkers=None, progressCallback=None):
+        self._numWorkers = numWorkers if numWorkers is not None else multiprocessing.cpu_count()
+        self._progressCallback = progressCallback
+
+    def run(self, jobFunc, jobs):
+        '''
+        Returns a generator of the results of calling jobFunc (a module-level
+        function, as it is sent to the worker processes) for each job.
+        '''
+        jobs = list(jobs)
+        numWorkers = min(self._numWorkers, len(jobs))
+
+        if numWorkers <= 1:
+            return self._reportProgress(jobs, (jobFunc(job) for job in jobs))
+        return self._runInPool(jobFunc, jobs, numWorkers)
+
+    def _runInPool(self, jobFunc, jobs, numWorkers):
+        pool = multiprocessing.Pool(numWorkers)
+        try:
+            results = self._iterBoundedResults(pool, jobFunc, jobs, self.MAX_JOBS_IN_FLIGHT_PER_WORKER * numWorkers)
+            for result in self._reportProgress(jobs, results):
+                yield result
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    @staticmethod
+    def _iterBoundedResults(pool, jobFunc, jobs, maxJobsInFlight):
+        'Yields the results in job order, with at most maxJobsInFlight jobs submitted but not yet yielded.'
+        jobIter = iter(jobs)
+        pending = deque(pool.apply_async(jobFunc, (job,)) for job in islice(jobIter, maxJobsInFlight))
+        while pending:
+            result = pending.popleft().get()
+            for job in islice(jobIter, 1):
+                pending.append(pool.apply_async(jobFunc, (job,)))
+            yield result
+
+    def _reportProgress(self, jobs, results):
+        for i, (job, result) in enumerate(izip(jobs, results)):
+            if self._progressCallback is not None:
+                self._progressCallback(i + 1, len(jobs), job)
+            yield result
+
+    def extractToFiles(self, jobs):
+        'Composes each job to its own file. Returns the file names (None for ignored empty files).'
+        return list(self.run(_extractToFile, jobs))
+
+    def extractToZipFile(self, jobs, zipFn):
+        '''
+        Composes each job to a temporary file, which is added as an entry of
+        a single zip file and removed as soon as its job is finished. At most
+        MAX_JOBS_IN_FLIGHT_PER_WORKER composed files per worker are thus kept
+        on disk, and none in memory. Only the composing runs in parallel: the
+        entries are compressed one at a time in the current process, by
+        ZipFile.write().
+        '''
+        ensurePathExists(zipFn)
+        tempDir = mkdtemp(prefix='.extract', dir=os.path.dirname(zipFn))
+        try:
+            jobs = [job._replace(fn=os.path.join(tempDir, os.path.basename(job.fn))) for job in jobs]
+            zipFile = ZipFile(zipFn, 'w', ZIP_DEFLATED, allowZip64=True)
+            try:
+                for fn in self.run(_extractToFile, jobs):
+                    if fn is not None:
+                        zipFile.write(fn, os.path.basename(fn))
+                        os.remove(fn)
+            finally:
+                zipFile.close()
+        finally:
+            shutil.rmtree(tempDir, ignore_errors=True)
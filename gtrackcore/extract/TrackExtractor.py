@@ -2,7 +2,6 @@ import os
 import sys
 
 from copy import copy
-from zipfile import ZipFile
 
 from gtrackcore.metadata.GenomeInfo import GenomeInfo
 from gtrackcore.metadata.TrackInfo import TrackInfo
@@ -96,7 +95,20 @@ class TrackExtractor:
     
     @classmethod
     def extract(cls, trackName, regionList, fn, fileFormatName=DEFAULT_FILE_FORMAT_NAME, globalCoords=True, \
-                addSuffix=False, asOriginal=False, allowOverlaps=False, ignoreEmpty=False):
+                addSuffix=False, asOriginal=False, allowOverlaps=False, ignoreEmpty=False, compression=None):
+        composer, fn = cls.createComposer(trackName, regionList, fn, fileFormatName=fileFormatName, \
+                                          globalCoords=globalCoords, addSuffix=addSuffix, \
+                                          asOriginal=asOriginal, allowOverlaps=allowOverlaps)
+        if addSuffix and compression is not None:
+            fn += '.gz'
+        ok = composer.composeToFile(fn, ignoreEmpty=ignoreEmpty, compression=compression)
+        
+        if ok:
+            return fn
+    
+    @classmethod
+    def createComposer(cls, trackName, regionList, fn, fileFormatName=DEFAULT_FILE_FORMAT_NAME, globalCoords=True, \
+                       addSuffix=False, asOriginal=False, allowOverlaps=False):
         from gtrackcore.input.adapters.TrackGenomeElementSource import TrackGenomeElementSource
         from gtrackcore.extract.fileformats.FileFormatComposer import getComposerClsFromFileFormatName, getComposerClsFromFileSuffix
         
@@ -127,42 +139,42 @@ class TrackExtractor:
         if addSuffix:
             fn = os.path.splitext(fn)[0] + '.' + composerCls.getDefaultFileNameSuffix()
         
-        composer = composerCls(trackGESource)
-        ok = composer.composeToFile(fn, ignoreEmpty=ignoreEmpty)
-        
-        if ok:
-            return fn
+        return composerCls(trackGESource), fn
     
     #
     # Note: asOriginal=True trumps fileFormatName for specifying output file format
     #
+    # The extractions of many tracks or regions are run as independent jobs in an ExtractionPool
+    # of numWorkers processes (default: serially). progressCallback(numDone, numJobs, job) is
+    # called after each job. compression ('gzip' or 'bgzf') compresses each extracted file.
+    #
     @classmethod
     def extractManyToRegionDirs(cls, trackNameList, regionList, baseDir, fileFormatName=DEFAULT_FILE_FORMAT_NAME, \
-                                globalCoords=False, asOriginal=False, allowOverlaps=False, ignoreEmpty=True):
-        for trackName in trackNameList:
-            for region in regionList:
-                fn = baseDir + os.sep + \
-                    str(region).replace(':','_') + os.sep + \
-                    '_'.join(trackName)
-                cls.extract(trackName, [region], fn, fileFormatName=fileFormatName, globalCoords=globalCoords, \
-                            addSuffix=True, asOriginal=asOriginal, allowOverlaps=allowOverlaps, \
-                            ignoreEmpty=ignoreEmpty)
+                                globalCoords=False, asOriginal=False, allowOverlaps=False, ignoreEmpty=True, \
+                                numWorkers=1, progressCallback=None, compression=None):
+        from gtrackcore.extract.ExtractionPool import ExtractionPool, ExtractionJob
+        
+        kwArgs = dict(fileFormatName=fileFormatName, globalCoords=globalCoords, addSuffix=True, \
+                      asOriginal=asOriginal, allowOverlaps=allowOverlaps, ignoreEmpty=ignoreEmpty, \
+                      compression=compression)
+        jobs = [ExtractionJob(trackName, [region], \
+                              baseDir + os.sep + str(region).replace(':','_') + os.sep + '_'.join(trackName), \
+                              kwArgs) \
+                for trackName in trackNameList for region in regionList]
+        ExtractionPool(numWorkers, progressCallback).extractToFiles(jobs)
                 
     @classmethod
     def extractOneTrackManyToRegionFilesInOneZipFile(cls, trackName, regionList, zipFn, fileFormatName=DEFAULT_FILE_FORMAT_NAME, \
                                                      globalCoords=False, asOriginal=False, allowOverlaps=False, \
-                                                     ignoreEmpty=True):
-        ensurePathExists(zipFn)
-        zipFile = ZipFile(zipFn, 'w')
-        for region in regionList:
-            fn = os.path.dirname(zipFn) + os.sep + str(region).replace(':','_')
-            okFn = cls.extract(trackName, [region], fn, fileFormatName=fileFormatName, \
-                               globalCoords=globalCoords, addSuffix=True, asOriginal=asOriginal, \
-                               allowOverlaps=allowOverlaps, ignoreEmpty=ignoreEmpty)
-            if okFn:
-                zipFile.write(okFn, os.path.basename(okFn))
-                os.remove(okFn)
-        zipFile.close()
+                                                     ignoreEmpty=True, numWorkers=1, progressCallback=None):
+        from gtrackcore.extract.ExtractionPool import ExtractionPool, ExtractionJob
+        
+        kwArgs = dict(fileFormatName=fileFormatName, globalCoords=globalCoords, addSuffix=True, \
+                      asOriginal=asOriginal, allowOverlaps=allowOverlaps, ignoreEmpty=ignoreEmpty)
+        jobs = [ExtractionJob(trackName, [region], \
+                              os.path.dirname(zipFn) + os.sep + str(region).replace(':','_'), kwArgs) \
+                for region in regionList]
+        ExtractionPool(numWorkers, progressCallback).extractToZipFile(jobs, zipFn)
 
     @classmethod
     def extractOneTrackManyRegsToOneFile(cls, trackName, regionList, fn, fileFormatName=DEFAULT_FILE_FORMAT_NAME, \
@@ -172,12 +184,15 @@ class TrackExtractor:
         
     @classmethod
     def extractManyToOneDir(cls, trackNameList, regionList, baseDir, fileFormatName=DEFAULT_FILE_FORMAT_NAME, \
-                            globalCoords=False, asOriginal=False, allowOverlaps=False):
-        for trackName in trackNameList:
-            fn = baseDir + os.sep + '_'.join(trackName)
-            cls.extractOneTrackManyRegsToOneFile(trackName, regionList, fn, fileFormatName=fileFormatName,
-                                                 globalCoords=globalCoords, asOriginal=asOriginal, \
-                                                 allowOverlaps=allowOverlaps)
+                            globalCoords=False, asOriginal=False, allowOverlaps=False, \
+                            numWorkers=1, progressCallback=None, compression=None):
+        from gtrackcore.extract.ExtractionPool import ExtractionPool, ExtractionJob
+        
+        kwArgs = dict(fileFormatName=fileFormatName, globalCoords=globalCoords, addSuffix=False, \
+                      asOriginal=asOriginal, allowOverlaps=allowOverlaps, compression=compression)
+        jobs = [ExtractionJob(trackName, list(regionList), baseDir + os.sep + '_'.join(trackName), kwArgs) \
+                for trackName in trackNameList]
+        ExtractionPool(numWorkers, progressCallback).extractToFiles(jobs)
                 
 if __name__ == "__main__":
     if len(sys.argv) not in [4, 5]:
@@ -1,7 +1,10 @@
+import numpy
+
 from collections import OrderedDict, namedtuple
 
 from gtrackcore.extract.fileformats.FileFormatComposer import FileFormatComposer, MatchResult
 from gtrackcore.track.format.TrackFormat import TrackFormat
+from gtrackcore.util.CommonConstants import BINARY_MISSING_VAL
 from gtrackcore.util.CommonFunctions import getStringFromStrand
 from gtrackcore.util.CustomExceptions import ShouldNotOccurError
 
@@ -35,7 +38,7 @@ class BedComposer(FileFormatComposer):
         self._allValsAreBedVals = False
         tf = TrackFormat.createInstanceFromGeSource(self._geSource)
         if tf.getValTypeName() == 'Number (integer)':
-            self._allValsAreBedVals = all((0 <= ge.val <= 1000) for ge in self._geSource)
+            self._allValsAreBedVals = self._extractionPlanner.allValsAreInRange(0, 1000)
 
     @staticmethod
     def matchesTrackFormat(trackFormat):
@@ -59,6 +62,12 @@ class BedComposer(FileFormatComposer):
         numCols = self._findNumCols()
         bedColumnsList = list(self._bedColumnsDict.iteritems())
 
+        if self._useColumnarComposing():
+            self._composeColumns(out, bedColumnsList[:numCols])
+        else:
+            self._composeElements(out, numCols, bedColumnsList)
+
+    def _composeElements(self, out, numCols, bedColumnsList):
         for ge in self._geSource:
             cols = ['']*numCols
             for i in range(numCols):
@@ -91,12 +100,57 @@ class BedComposer(FileFormatComposer):
 
             print >>out, '\t'.join([str(x) for x in cols])
 
+    def _composeColumns(self, out, bedColumnsList):
+        for chr, columns in self._iterColumnChunks():
+            numEls = len(columns['start'])
+            self._writeColumns(out, [self._getColumn(colNames, colInfo, chr, columns, numEls) \
+                                     for colNames, colInfo in bedColumnsList])
+
+    def _getColumn(self, colNames, colInfo, chr, columns, numEls):
+        for colName in (colNames if type(colNames) == tuple else (colNames,)):
+            if colName == 'chr':
+                return [chr] * numEls
+
+            values = columns.get(colName)
+            if colName == 'end':
+                values = self._handleEndColumn(columns)
+            elif colName == 'val' and values is not None:
+                values = self._handleValColumn(values)
+            elif colName == 'strand' and values is not None:
+                values = numpy.where(values == BINARY_MISSING_VAL, '.', numpy.where(values, '+', '-'))
+
+            if values is None:
+                if colName == 'id':
+                    continue
+                return [colInfo.defaultVal] * numEls
+
+            if isinstance(values, numpy.ndarray) and values.dtype.kind == 'S' and colName not in ('name', 'id'):
+                invalid = self._containsPipe(values)
+                for col in colInfo.checkExtra:
+                    if col in columns:
+                        invalid |= self._containsPipe(columns[col])
+                values = numpy.where(invalid, colInfo.defaultVal, values)
+
+            return values.tolist() if isinstance(values, numpy.ndarray) else values
+
+    @staticmethod
+    def _containsPipe(values):
+        if values.dtype.itemsize == 0 or len(values) == 0:
+            return numpy.zeros(len(values), dtype='bool')
+        return (numpy.ascontiguousarray(values).view('S1').reshape(len(values), values.dtype.itemsize) == '|').any(axis=1)
+
     def _handleEnd(self, ge, value):
         return value
 
+    def _handleEndColumn(self, columns):
+        return columns.get('end')
+
     def _handleVal(self, value):
         return value if self._allValsAreBedVals else None
 
+    def _handleValColumn(self, vals):
+        return vals if self._allValsAreBedVals else None
+
     def _findNumCols(self):
         numCols = None
         for colNames, colInfo in reversed(list(self._bedColumnsDict.iteritems())):
@@ -137,6 +191,9 @@ class CategoryBedComposer(BedComposer):
     def _handleVal(self, value):
         return value
 
+    def _handleValColumn(self, vals):
+        return vals
+
 class ValuedBedComposer(BedComposer):
     FILE_SUFFIXES = ['valued.bed', 'marked.bed']
     FILE_FORMAT_NAME = 'Valued BED'
@@ -153,6 +210,9 @@ class ValuedBedComposer(BedComposer):
     def _handleVal(self, value):
         return self._commonFormatNumberVal(value)
 
+    def _handleValColumn(self, vals):
+        return self._commonFormatNumberColumn(vals)
+
 class PointBedComposer(BedComposer):
     FILE_SUFFIXES = ['point.bed']
     FILE_FORMAT_NAME = 'Point BED'
@@ -164,6 +224,9 @@ class PointBedComposer(BedComposer):
     def _handleEnd(self, ge, value):
         return ge.start + 1
 
+    def _handleEndColumn(self, columns):
+        return columns['start'] + 1
+
     @staticmethod
     def matchesTrackFormat(trackFormat):
         trackFormatName = ''
@@ -22,6 +22,12 @@ class BedGraphComposer(FileFormatComposer):
         
         print >>out, 'track type=bedGraph' + (' name=%s' % name if name is not None else '')
 
+        if self._useColumnarComposing():
+            self._composeColumns(out)
+        else:
+            self._composeElements(out)
+
+    def _composeElements(self, out):
         for ge in self._geSource:
             cols = [''] * 4
             
@@ -32,9 +38,18 @@ class BedGraphComposer(FileFormatComposer):
             
             print >>out, '\t'.join([str(x) for x in cols])
             
+    def _composeColumns(self, out):
+        for chr, columns in self._iterColumnChunks():
+            starts = columns['start']
+            self._writeColumns(out, [[chr] * len(starts), starts.tolist(), columns['end'].tolist(), \
+                                     self._formatValColumn(columns['val'])])
+
     def _formatVal(self, value):
         return self._commonFormatNumberVal(value)
 
+    def _formatValColumn(self, vals):
+        return self._commonFormatNumberColumn(vals)
+
 class BedGraphTargetControlComposer(BedGraphComposer):
     FILE_SUFFIXES = ['targetcontrol.bedgraph']
     FILE_FORMAT_NAME = 'target/control bedGraph'
@@ -46,4 +61,7 @@ class BedGraphTargetControlComposer(BedGraphComposer):
                            trackFormatName='valued segments')
             
     def _formatVal(self, value):
-        return self._commonFormatBinaryVal(value)
\ No newline at end of file
+        return self._commonFormatBinaryVal(value)
+
+    def _formatValColumn(self, vals):
+        return self._commonFormatBinaryColumn(vals)
\ No newline at end of file
@@ -0,0 +1,170 @@
+import os
+import sys
+import struct
+import threading
+import time
+import zlib
+
+from collections import deque
+from multiprocessing.pool import ThreadPool
+
+from gtrackcore.util.CustomExceptions import ArgumentValueError
+
+COMPRESSIONS = ['gzip', 'bgzf']
+BGZF_INDEX_FILE_SUFFIX = 'gzi'
+
+_BGZF_EOF = '\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+
+def openOutputFile(fn, compression=None, pool=None):
+    '''
+    Opens fn for writing, either as a plain file (compression=None), or as a
+    gzip or block-gzip (BGZF) file compressed by a pool of threads. A
+    ThreadPool may be passed to share the threads between files.
+    '''
+    if compression is None:
+        return open(fn, 'w')
+    elif compression == 'gzip':
+        return BlockGzipFile(fn, pool=pool)
+    elif compression == 'bgzf':
+        return BgzfFile(fn, pool=pool)
+    raise ArgumentValueError('Compression "%s" is not supported. Supported: %s' % (compression, ', '.join(COMPRESSIONS)))
+
+def _compressBlock(data, level):
+    compressObj = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressObj.compress(data) + compressObj.flush(), zlib.crc32(data) & 0xffffffff, len(data)
+
+
+class BlockGzipFile(object):
+    '''
+    Write-only file object producing a gzip file, consisting of one gzip
+    member per BLOCK_SIZE bytes of uncompressed data.
+
+    Written data passes through an OS pipe, so that write() is as cheap as for
+    a plain file. A reader thread cuts the data into blocks, which are
+    compressed independently, in parallel, by a pool of numThreads threads
+    (zlib releases the GIL), and written in order. At most 2 * numThreads
+    blocks are kept in memory. If a ThreadPool is given as pool, it is used
+    (and left open) instead of starting a pool for the file.
+
+    An empty file is written as a single empty gzip member, which is valid.
+    '''
+    BLOCK_SIZE = 2**20
+    DEFAULT_NUM_THREADS = 2
+
+    def __init__(self, fn, numThreads=None, level=6, pool=None):
+        self._file = open(fn, 'wb')
+        self._numThreads = numThreads if numThreads is not None else self.DEFAULT_NUM_THREADS
+        self._level = level
+        self._ownsPool = pool is None
+        self._pool = ThreadPool(self._numThreads) if self._ownsPool else pool
+        self._pending = deque()
+        self._isEmpty = True
+        self._excInfo = None
+        self.closed = False
+
+        readFd, writeFd = os.pipe()
+        self._pipeIn = os.fdopen(writeFd, 'wb', self.BLOCK_SIZE)
+        self.write = self._pipeIn.write
+        self.writelines = self._pipeIn.writelines
+
+        self._thread = threading.Thread(target=self._compressFromPipe, args=(os.fdopen(readFd, 'rb'),))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _compressFromPipe(self, pipeOut):
+        try:
+            while True:
+                data = pipeOut.read(self.BLOCK_SIZE)
+                if self._excInfo is None:
+                    try:
+                        self._submitBlock(data)
+                    except Exception:
+                        #The pipe is still emptied, so that the writing thread is not blocked
+                        self._excInfo = sys.exc_info()
+                if len(data) < self.BLOCK_SIZE:
+                    break
+        finally:
+            pipeOut.close()
+
+    def _submitBlock(self, data):
+        if len(data) > 0:
+            self._pending.append(self._pool.apply_async(_compressBlock, (data, self._level)))
+        while len(self._pending) > 2 * self._numThreads:
+            self._writeBlock(*self._pending.popleft().get())
+
+    def _writeBlock(self, compressed, crc, size):
+        self._isEmpty = False
+        self._file.write(self._getMemberHeader(len(compressed)))
+        self._file.write(compressed)
+        self._file.write(struct.pack('<II', crc, size))
+
+    def _getMemberHeader(self, compressedSize):
+        return struct.pack('<BBBBIBB', 31, 139, 8, 0, int(time.time()), 0, 255)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.closed:
+            return
+
+        try:
+            self._pipeIn.close()
+            self._thread.join()
+            if self._excInfo is not None:
+                raise self._excInfo[0], self._excInfo[1], self._excInfo[2]
+
+            while self._pending:
+                self._writeBlock(*self._pending.popleft().get())
+            self._finish()
+        finally:
+            if self._ownsPool:
+                self._pool.terminate()
+            self._file.close()
+            self.closed = True
+
+    def _finish(self):
+        if self._isEmpty:
+            self._writeBlock(*_compressBlock('', self._level))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+class BgzfFile(BlockGzipFile):
+    '''
+    Write-only file object producing a BGZF (block-gzip) file, as used by
+    bgzip/tabix and htslib, compressed in parallel as BlockGzipFile. If
+    writeIndex is True, a bgzip-compatible index of the block offsets is
+    written to fn + '.gzi', allowing random access to the uncompressed data.
+    '''
+    BLOCK_SIZE = 0xff00
+
+    def __init__(self, fn, numThreads=None, level=6, writeIndex=True, pool=None):
+        BlockGzipFile.__init__(self, fn, numThreads, level, pool)
+        self._indexFn = '.'.join([fn, BGZF_INDEX_FILE_SUFFIX]) if writeIndex else None
+        self._blockOffsets = []
+        self._compressedOffset = 0
+        self._uncompressedOffset = 0
+
+    def _writeBlock(self, compressed, crc, size):
+        if self._compressedOffset > 0:
+            self._blockOffsets.append((self._compressedOffset, self._uncompressedOffset))
+        BlockGzipFile._writeBlock(self, compressed, crc, size)
+        self._compressedOffset += len(compressed) + 26
+        self._uncompressedOffset += size
+
+    def _getMemberHeader(self, compressedSize):
+        #The BC extra subfield contains the total block size minus 1
+        return struct.pack('<BBBBIBBHBBHH', 31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, compressedSize + 25)
+
+    def _finish(self):
+        self._file.write(_BGZF_EOF)
+        if self._indexFn is not None:
+            with open(self._indexFn, 'wb') as indexFile:
+                indexFile.write(struct.pack('<Q', len(self._blockOffsets)))
+                for offsets in self._blockOffsets:
+                    indexFile.write(struct.pack('<QQ', *offsets))
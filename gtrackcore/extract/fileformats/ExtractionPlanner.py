@@ -0,0 +1,98 @@
+import numpy
+
+from gtrackcore.input.adapters.TrackGenomeElementSource import TrackGenomeElementSource
+
+class ExtractionPlanner(object):
+    '''
+    Finds the properties of a geSource that the composers need before the
+    elements are written: whether the geSource is empty, whether any of the
+    elements have a genome and the range of the values.
+
+    For geSources based on preprocessed tracks, the properties are derived from
+    the bounding region tuples and the value arrays of the track views, without
+    creating any GenomeElement objects. For other geSources, all properties
+    are collected in a single pass over the elements, which also stores the
+    bounding regions and dimensions in a GEDependentAttributesHolder. The
+    elements are thus streamed only once more, when composing.
+    '''
+
+    def __init__(self, geSource):
+        self._geSource = geSource
+        self._isTrackSource = isinstance(geSource, TrackGenomeElementSource)
+
+        self._isEmpty = None
+        self._anyElementHasGenome = None
+        self._valRange = None
+        self._foundValRange = False
+
+    def isTrackSource(self):
+        'Returns True if the elements can be read as column arrays of track views.'
+        return self._isTrackSource
+
+    def isEmpty(self):
+        if self._isEmpty is None:
+            if self._isTrackSource:
+                self._isEmpty = all(brt.elCount == 0 for brt in self._geSource.getBoundingRegionTuples())
+            else:
+                self._isEmpty = True
+                for ge in self._geSource:
+                    self._isEmpty = False
+                    break
+        return self._isEmpty
+
+    def anyElementHasGenome(self):
+        if self._anyElementHasGenome is None:
+            if self._isTrackSource:
+                #Regions without genome get the genome of the geSource when creating the track views
+                self._anyElementHasGenome = any(brt.elCount > 0 and \
+                                                (brt.region.genome or self._geSource.genome) is not None \
+                                                for brt in self._geSource.getBoundingRegionTuples())
+            else:
+                self._collectElementStatistics()
+        return self._anyElementHasGenome
+
+    def getValRange(self):
+        '''
+        Returns a tuple of the minimum and maximum value, or None if there
+        are no values or any of the values are not numbers.
+        '''
+        if not self._foundValRange:
+            if self._isTrackSource:
+                self._valRange = self._geSource.getValRange()
+                self._foundValRange = True
+            else:
+                self._collectElementStatistics()
+        return self._valRange
+
+    def allValsAreInRange(self, minVal, maxVal):
+        if self.isEmpty():
+            return True
+
+        valRange = self.getValRange()
+        return valRange is not None and minVal <= valRange[0] and valRange[1] <= maxVal
+
+    def _collectElementStatistics(self):
+        isEmpty = True
+        anyElementHasGenome = False
+        allValsAreNumbers = True
+        minVal = maxVal = None
+
+        for ge in self._geSource:
+            isEmpty = False
+            if ge.genome is not None:
+                anyElementHasGenome = True
+
+            if allValsAreNumbers:
+                val = ge.val
+                if isinstance(val, (int, long, float, numpy.number)) and not isinstance(val, bool):
+                    if minVal is None or val < minVal:
+                        minVal = val
+                    if maxVal is None or val > maxVal:
+                        maxVal = val
+                else:
+                    allValsAreNumbers = False
+
+        self._isEmpty = isEmpty
+        self._anyElementHasGenome = anyElementHasGenome
+        self._valRange = (minVal, maxVal) if allValsAreNumbers and not isEmpty else None
+        self._foundValRange = True
@@ -1,10 +1,12 @@
+import numpy
+
 from gtrackcore.extract.fileformats.FileFormatComposer import FileFormatComposer, MatchResult
-from gtrackcore.input.wrappers.GEDependentAttributesHolder import iterateOverBRTuplesWithContainedGEs
-from gtrackcore.track.format.TrackFormat import TrackFormat
+from gtrackcore.util.CustomExceptions import InvalidFormatError, NotIteratedYetError
 
 class FastaComposer(FileFormatComposer):
     FILE_SUFFIXES = ['fasta', 'fas', 'fa']
     FILE_FORMAT_NAME = 'FASTA'
+    LINE_LENGTH = 60
     
     @staticmethod
     def matchesTrackFormat(trackFormat):
@@ -14,17 +16,62 @@ class FastaComposer(FileFormatComposer):
     # Compose methods
     
     def _compose(self, out):
-        
-        for brt, geList in iterateOverBRTuplesWithContainedGEs(self._geSource):
-            chr, startEnd = str(brt.region).split(':')
-            print >> out, '>%s %s' % (chr, startEnd)
-             
-            line = ''
-            for i, ge in enumerate(geList):
-                line += ge.val
-                if (i+1) % 60 == 0:
-                    print >> out, line
-                    line = ''
-            
-            if i+1 % 60 != 0:
-                print >> out, line
\ No newline at end of file
+        if self._useDenseBlockComposing():
+            #Blocks are a multiple of the line length, so that only the last block ends with a partial line
+            for region, valBlocks in self._iterDenseValBlocks(self.LINE_LENGTH * 10000):
+                self._composeHeaderLine(out, region)
+                for vals in valBlocks:
+                    self._composeSequenceLines(out, vals.tostring())
+        else:
+            for region, seq in self._iterRegionSequences():
+                self._composeHeaderLine(out, region)
+                self._composeSequenceLines(out, seq)
+
+    def _composeHeaderLine(self, out, region):
+        chr, startEnd = str(region).split(':')
+        print >> out, '>%s %s' % (chr, startEnd)
+
+    def _composeSequenceLines(self, out, seq):
+        numFullLines = len(seq) / self.LINE_LENGTH
+        if numFullLines > 0:
+            lines = numpy.empty((numFullLines, self.LINE_LENGTH + 1), dtype='S1')
+            lines[:, :self.LINE_LENGTH] = numpy.frombuffer(seq, dtype='S1', count=numFullLines * self.LINE_LENGTH).\
+                                          reshape(numFullLines, self.LINE_LENGTH)
+            lines[:, self.LINE_LENGTH] = '\n'
+            out.write(lines.tostring())
+
+        rest = seq[numFullLines * self.LINE_LENGTH:]
+        if rest:
+            print >> out, rest
+
+    def _iterRegionSequences(self):
+        '''
+        Iterates over the bounding regions and their sequences, as strings.
+        The element counts of the bounding regions are the number of
+        characters, as the elements may contain several characters each (e.g.
+        one line of a FASTA file).
+        '''
+        try:
+            brTuples = self._geSource.getBoundingRegionTuples()
+        except NotIteratedYetError:
+            for ge in self._geSource:
+                pass
+            brTuples = self._geSource.getBoundingRegionTuples()
+
+        if len(brTuples) == 0:
+            raise InvalidFormatError('Error: bounding regions are needed to compose FASTA files.')
+
+        geIter = self._geSource.__iter__()
+        rest = ''
+        for brt in brTuples:
+            parts = [rest]
+            numChars = len(rest)
+            while numChars < brt.elCount:
+                val = geIter.next().val
+                part = val.tostring() if isinstance(val, numpy.ndarray) else str(val)
+                parts.append(part)
+                numChars += len(part)
+
+            seq = ''.join(parts)
+            rest = seq[brt.elCount:]
+            yield brt.region, seq[:brt.elCount]
@@ -1,8 +1,16 @@
+import sys
+import threading
+import numpy
+
 from collections import namedtuple
 from cStringIO import StringIO
+from Queue import Queue, Full
 
 from gtrackcore.core.Config import Config
+from gtrackcore.extract.fileformats.CompressedOutputFile import openOutputFile
+from gtrackcore.extract.fileformats.ExtractionPlanner import ExtractionPlanner
 from gtrackcore.input.wrappers.GEDependentAttributesHolder import GEDependentAttributesHolder
+from gtrackcore.track.format.TrackFormat import TrackFormat
 from gtrackcore.util.CommonConstants import BINARY_MISSING_VAL
 from gtrackcore.util.CommonFunctions import isNan, ensurePathExists
 from gtrackcore.util.CustomExceptions import InvalidFormatError, AbstractClassError, NotIteratedYetError
@@ -10,6 +18,8 @@ from gtrackcore.util.CustomExceptions import InvalidFormatError, AbstractClassEr
 MatchResult = namedtuple('MatchResult', ['match', 'trackFormatName'])
 ComposerInfo = namedtuple('ComposerInfo', ['trackFormatName','fileFormatName','fileSuffix'])
 
+_CHUNK, _END, _ERROR = range(3)
+
 def findMatchingFileFormatComposers(trackFormat):
     matchingComposers = []
     for composer in getAllComposers():
@@ -35,6 +45,9 @@ def getComposerClsFromFileSuffix(fileSuffix):
 class FileFormatComposer(object):
     FILE_SUFFIXES = ['']
     FILE_FORMAT_NAME = ''
+    COLUMN_CHUNK_SIZE = 100000
+    COMPOSED_CHUNK_SIZE = 2**20
+    MAX_QUEUED_CHUNKS = 4
     
     def __init__(self, geSource):
         try:
@@ -45,29 +58,75 @@ class FileFormatComposer(object):
         except NotIteratedYetError:
             self._geSource = geSource
         
-        self._emptyGeSource = True
-        for ge in self._geSource:
-            self._emptyGeSource = False
-            break
+        self._extractionPlanner = ExtractionPlanner(self._geSource)
     
     @staticmethod
     def matchesTrackFormat(trackFormat):
         return MatchResult(match=False, trackFormatName=trackFormat.getFormatName())
 
-    def composeToFile(self, fn, ignoreEmpty=False, **kwArgs):
+    def isEmpty(self):
+        return self._extractionPlanner.isEmpty()
+
+    def composeToFile(self, fn, ignoreEmpty=False, compression=None, **kwArgs):
+        '''
+        Composes to the file fn. If compression is 'gzip' or 'bgzf', the
+        output is compressed while composing, using a pool of threads.
+        '''
         ensurePathExists(fn)
-        f = open(fn, 'w')
-        ok = self._composeCommon(f, ignoreEmpty, **kwArgs)
-        f.close()
+        f = openOutputFile(fn, compression)
+        try:
+            ok = self._composeCommon(f, ignoreEmpty, **kwArgs)
+        finally:
+            f.close()
         return ok
     
     def returnComposed(self, ignoreEmpty=False, **kwArgs):
         memFile = StringIO()
         self._composeCommon(memFile, ignoreEmpty, **kwArgs)
         return memFile.getvalue()
+
+    def iterComposed(self, ignoreEmpty=False, chunkSize=None, maxQueuedChunks=None, **kwArgs):
+        '''
+        Returns a generator of the composed contents, as string chunks of at
+        least chunkSize bytes (except the last one), without keeping the full
+        contents in memory. Composing is run in a separate thread, which blocks
+        when maxQueuedChunks chunks are waiting to be consumed.
+        '''
+        queue = Queue(maxsize=maxQueuedChunks if maxQueuedChunks is not None else self.MAX_QUEUED_CHUNKS)
+        stopEvent = threading.Event()
+        out = _QueueWriter(queue, stopEvent, chunkSize if chunkSize is not None else self.COMPOSED_CHUNK_SIZE)
+
+        thread = threading.Thread(target=self._composeToQueue, args=(out, ignoreEmpty, kwArgs))
+        thread.daemon = True
+        thread.start()
+
+        try:
+            while True:
+                itemType, content = queue.get()
+                if itemType == _END:
+                    break
+                elif itemType == _ERROR:
+                    raise content[0], content[1], content[2]
+                yield content
+            thread.join()
+        finally:
+            stopEvent.set()
+
+    def _composeToQueue(self, out, ignoreEmpty, kwArgs):
+        try:
+            self._composeCommon(out, ignoreEmpty, **kwArgs)
+            out.flush()
+            out.put(_END, None)
+        except _ComposingStopped:
+            pass
+        except Exception:
+            try:
+                out.put(_ERROR, sys.exc_info())
+            except _ComposingStopped:
+                pass
     
     def _composeCommon(self, out, ignoreEmpty=False, **kwArgs):
-        if ignoreEmpty and self._emptyGeSource:
+        if ignoreEmpty and self.isEmpty():
             return False
         
         self._compose(out, **kwArgs)
@@ -76,6 +135,57 @@ class FileFormatComposer(object):
     def _compose(self, out, **kwArgs):
         raise AbstractClassError()
         
+    def _useColumnarComposing(self):
+        return self._extractionPlanner.isTrackSource() and \
+            not TrackFormat.createInstanceFromGeSource(self._geSource).reprIsDense()
+
+    def _useDenseBlockComposing(self):
+        if not self._extractionPlanner.isTrackSource():
+            return False
+        tf = TrackFormat.createInstanceFromGeSource(self._geSource)
+        return tf.reprIsDense() and not tf.isInterval() and self._geSource.getValDim() == 1
+
+    def _iterDenseValBlocks(self, blockSize=None):
+        '''
+        Iterates over the value arrays of dense tracks, as tuples of the
+        bounding region and a list of consecutive blocks of at most blockSize
+        (default: COLUMN_CHUNK_SIZE) values, sliced from the value memmap.
+        '''
+        if blockSize is None:
+            blockSize = self.COLUMN_CHUNK_SIZE
+
+        for region, tv in self._geSource.iterTrackViews():
+            vals = tv.valsAsNumpyArray()
+            yield region, [vals[i:i + blockSize] for i in xrange(0, len(vals), blockSize)]
+
+    def _iterColumnChunks(self):
+        return self._geSource.iterColumnChunks(self.COLUMN_CHUNK_SIZE)
+
+    def _writeColumns(self, out, cols):
+        '''
+        Writes tab-separated lines from a list of equally long lists of column
+        values, formatting all lines of the chunk with a single operation.
+        '''
+        numLines = len(cols[0])
+        if numLines == 0:
+            return
+
+        numCols = len(cols)
+        allVals = [None] * (numLines * numCols)
+        for i, col in enumerate(cols):
+            allVals[i::numCols] = col
+
+        out.write( (('\t'.join(['%s'] * numCols) + '\n') * numLines) % tuple(allVals) )
+
+    def _commonFormatNumberColumn(self, vals):
+        formatted = ((('%#.' + str(Config.OUTPUT_PRECISION) + 'g\n') * len(vals)) % tuple(vals.tolist())).split('\n')
+        for i in numpy.nonzero(numpy.isnan(vals))[0]:
+            formatted[i] = '.'
+        return formatted[:-1]
+
+    def _commonFormatBinaryColumn(self, vals):
+        return numpy.where(vals == BINARY_MISSING_VAL, '.', numpy.where(vals == True, '1', '0')).tolist()
+
     def _commonFormatNumberVal(self, val):
         if isNan(val) or val is None:
             return '.'
@@ -91,6 +201,40 @@ class FileFormatComposer(object):
     def getDefaultFileNameSuffix(cls):
         return cls.FILE_SUFFIXES[0]
         
+class _ComposingStopped(Exception):
+    pass
+
+class _QueueWriter(object):
+    'File-like object passing the written contents to a queue, in chunks of at least chunkSize bytes.'
+    def __init__(self, queue, stopEvent, chunkSize):
+        self._queue = queue
+        self._stopEvent = stopEvent
+        self._chunkSize = chunkSize
+        self._buffer = []
+        self._bufferSize = 0
+
+    def write(self, data):
+        self._buffer.append(data)
+        self._bufferSize += len(data)
+        if self._bufferSize >= self._chunkSize:
+            self.flush()
+
+    def flush(self):
+        if self._bufferSize > 0:
+            self.put(_CHUNK, ''.join(self._buffer))
+            self._buffer = []
+            self._bufferSize = 0
+
+    def put(self, itemType, content):
+        #Composing is stopped if the consumer stops iterating
+        while not self._stopEvent.is_set():
+            try:
+                self._queue.put((itemType, content), timeout=0.1)
+                return
+            except Full:
+                pass
+        raise _ComposingStopped()
+
 def getAllComposers():
     from gtrackcore.extract.fileformats.GtrackComposer import StdGtrackComposer, ExtendedGtrackComposer
     from gtrackcore.extract.fileformats.BedComposer import BedComposer, PointBedComposer, CategoryBedComposer, ValuedBedComposer
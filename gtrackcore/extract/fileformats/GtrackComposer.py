@@ -1,15 +1,19 @@
 import os
+import re
 import numpy as np
 import urllib
 
 from copy import copy, deepcopy
 from cStringIO import StringIO
 from collections import OrderedDict
+from itertools import izip
+from operator import attrgetter
 
 from gtrackcore.extract.fileformats.FileFormatComposer import FileFormatComposer, MatchResult
 from gtrackcore.input.wrappers.GEDependentAttributesHolder import iterateOverBRTuplesWithContainedGEs
 from gtrackcore.input.fileformats.GtrackGenomeElementSource import GtrackGenomeElementSource as Gtrack
 from gtrackcore.track.format.TrackFormat import TrackFormat
+from gtrackcore.util.CommonConstants import BINARY_MISSING_VAL
 from gtrackcore.util.CommonFunctions import getStringFromStrand, isIter, isNan
 from gtrackcore.util.CustomExceptions import InvalidFormatError, ShouldNotOccurError
 
@@ -37,6 +41,7 @@ class StdGtrackComposer(FileFormatComposer):
          #'http://gtrack.no/hyperbrowser.gtrack'
 
     _USE_EXTENDED_GTRACK = False
+    _PHRASE_FORMATTERS = {}
 
     def __init__(self, geSource, forcedHeaderDict={}):
         FileFormatComposer.__init__(self, geSource)
@@ -45,10 +50,7 @@ class StdGtrackComposer(FileFormatComposer):
         self._forcedHeaderDict = forcedHeaderDict
 
         #Also stores bounding regions and value dimensions in GEDependentAttributesHolder, if present
-        self._anyGeHasGenome = False
-        for ge in self._geSource:
-            if ge.genome is not None:
-                self._anyGeHasGenome = True
+        self._anyGeHasGenome = self._extractionPlanner.anyElementHasGenome()
 
     @staticmethod
     def matchesTrackFormat(trackFormat):
@@ -64,22 +66,42 @@ class StdGtrackComposer(FileFormatComposer):
         self._composeContents(out, hbColumns, columns, self._geSource, onlyNonDefault=onlyNonDefault)
 
     def _composeContents(self, out, hbColumns, columns, geSource, onlyNonDefault=True, singleDataLine=False):
-        tf = TrackFormat.createInstanceFromGeSource(self._geSource)
         out.write( self._composeHeaderLines(onlyNonDefault) )
         out.write( self._composeColSpecLine(columns) )
 
+        if not singleDataLine and self._useColumnarDataLines(hbColumns):
+            self._composeDataColumns(out, hbColumns)
+        else:
+            self._composeDataLines(out, hbColumns, geSource, singleDataLine)
+
+    def _composeDataLines(self, out, hbColumns, geSource, singleDataLine):
+        tf = TrackFormat.createInstanceFromGeSource(self._geSource)
+        formatters = self._getDataLineFormatters(hbColumns)
+
         for br, geList in iterateOverBRTuplesWithContainedGEs(geSource, onlyYieldTwoGEs=singleDataLine):
             if br is not None:
                 out.write( self._composeBoundingRegionLine(br) )
 
             for i, ge in enumerate(self._removeStartElementIfApplicable(tf, geList)):
-                out.write( self._composeDataLine(ge, hbColumns, i+1, i+1 == len(geList)) )
+                out.write( self._composeDataLine(ge, formatters, i+1, i+1 == len(geList)) )
 
                 if singleDataLine:
                     break
             if singleDataLine:
                 break
 
+    def _composeDataColumns(self, out, hbColumns):
+        columnFormatters = self._getDataColumnFormatters(hbColumns)
+
+        for brTuple, (region, tv) in izip(self._geSource.getBoundingRegionTuples(), self._geSource.iterTrackViews()):
+            out.write( self._composeBoundingRegionLine(brTuple) )
+
+            columns = self._geSource.getTrackViewColumns(tv)
+            for chunkStart in xrange(0, brTuple.elCount, self.COLUMN_CHUNK_SIZE):
+                chunkEnd = chunkStart + self.COLUMN_CHUNK_SIZE
+                self._writeColumns(out, [formatter(columns[hbColName][chunkStart:chunkEnd]) \
+                                         for hbColName, formatter in columnFormatters])
+
     def _headerShouldBeWritten(self, header, value, onlyNonDefault):
         if header in ['gtrack version', 'track type']:
             return True
@@ -112,24 +134,8 @@ class StdGtrackComposer(FileFormatComposer):
         return '####' + '; '.join(k + '=' + self._formatPhraseWithCorrectChrUsage(str(v), useUrlEncoding=True, notAllowedChars='=;#\t') \
                                   for k,v in brLinePartList if v is not None) + os.linesep
 
-    def _composeDataLine(self, ge, hbColumns, dataLineCount, lastGE):
-        cols = []
-        for hbColName in hbColumns:
-            if hbColName == 'start':
-                cols.append( self._formatStart(ge.start) )
-            elif hbColName == 'end':
-                cols.append( self._formatEnd(ge.end) )
-            elif hbColName == 'strand':
-                cols.append( getStringFromStrand(ge.strand) )
-            elif hbColName == 'val':
-                cols.append( self._formatValue(ge.val) )
-            elif hbColName == 'edges':
-                cols.append( self._formatEdges(ge.edges, ge.weights) )
-            elif hbColName == 'weights':
-                pass
-            else:
-                cols.append(self._formatPhraseWithCorrectChrUsage(str(getattr(ge, hbColName)), \
-                                                                  useUrlEncoding=True, notAllowedChars='#\t'))
+    def _composeDataLine(self, ge, formatters, dataLineCount, lastGE):
+        cols = [formatter(ge) for formatter in formatters]
 
         if self._headerDict['fixed-size data lines']:
             assert len(cols) == 1
@@ -139,6 +145,134 @@ class StdGtrackComposer(FileFormatComposer):
             return '\t'.join(cols) + os.linesep
 
 
+    # Composition plan methods
+
+    def _getDataLineFormatters(self, hbColumns):
+        '''
+        Returns a list of functions formatting each column of the data line of
+        a genome element. The functions are chosen once, according to the
+        header lines, instead of for each column of each data line.
+        '''
+        return [self._getDataLineFormatter(hbColName) for hbColName in hbColumns if hbColName != 'weights']
+
+    def _getDataLineFormatter(self, hbColName):
+        if hbColName == 'start':
+            startOffset = self._getStartOffset()
+            return lambda ge: str(ge.start + startOffset)
+        elif hbColName == 'end':
+            endOffset = self._getEndOffset()
+            return lambda ge: str(ge.end + endOffset)
+        elif hbColName == 'strand':
+            return lambda ge: getStringFromStrand(ge.strand)
+        elif hbColName == 'val':
+            formatValue = self._getValueFormatter()
+            return lambda ge: formatValue(ge.val)
+        elif hbColName == 'edges':
+            formatEdges = self._getEdgesFormatter()
+            return lambda ge: formatEdges(ge.edges, ge.weights)
+        else:
+            formatPhrase = self._getPhraseFormatter(useUrlEncoding=True, notAllowedChars='#\t')
+            getAttr = attrgetter(hbColName)
+            return lambda ge: formatPhrase(str(getAttr(ge)))
+
+    def _useColumnarDataLines(self, hbColumns):
+        if not self._useColumnarComposing() or self._headerDict['fixed-size data lines'] or \
+                any(hbColName in hbColumns for hbColName in ['genome', 'chr', 'edges', 'weights']):
+            return False
+
+        if 'val' in hbColumns and (self._geSource.getValDim() != 1 or self._headerDict['value dimension'] != 'scalar'):
+            return False
+
+        #Elements are assigned to bounding regions by counts, as in iterateOverBRTuplesWithContainedGEs
+        brTuples = self._geSource.getBoundingRegionTuples()
+        return len(brTuples) > 0 and all(brTuple.elCount > 0 for brTuple in brTuples)
+
+    def _getDataColumnFormatters(self, hbColumns):
+        '''
+        Returns a list of tuples of column names and functions formatting a
+        numpy array of the column to a list of strings, as the corresponding
+        data line formatters, but vectorized.
+        '''
+        return [(hbColName, self._getDataColumnFormatter(hbColName)) for hbColName in hbColumns]
+
+    def _getDataColumnFormatter(self, hbColName):
+        if hbColName == 'start':
+            startOffset = self._getStartOffset()
+            return lambda starts: (starts + startOffset).tolist()
+        elif hbColName == 'end':
+            endOffset = self._getEndOffset()
+            return lambda ends: (ends + endOffset).tolist()
+        elif hbColName == 'strand':
+            return lambda strands: np.where(strands == BINARY_MISSING_VAL, '.', np.where(strands, '+', '-')).tolist()
+        elif hbColName == 'val':
+            return self._getValueColumnFormatter()
+        else:
+            notAllowedChars = '#\t'
+            return lambda phrases: self._formatPhraseColumn(phrases, notAllowedChars)
+
+    def _getValueColumnFormatter(self):
+        missingVal = Gtrack.VAL_TYPE_DICT[self._headerDict['value type']].missingVal
+        formatValue = self._getValueFormatter()
+
+        def formatValueColumn(vals):
+            if vals.ndim > 1:
+                vals = vals.reshape(len(vals))
+
+            if vals.dtype.kind == 'S':
+                formatted = self._formatPhraseColumn(vals, notAllowedChars='#.,;=\t')
+                missing = (vals == missingVal) if isinstance(missingVal, str) else []
+            elif vals.dtype.kind in 'iubf':
+                #Python integers and booleans are formatted as the numpy scalars, while floats are not
+                formatted = vals.tolist() if vals.dtype.kind != 'f' else [str(val) for val in vals]
+                if isNan(missingVal):
+                    missing = np.isnan(vals) if vals.dtype.kind == 'f' else []
+                else:
+                    missing = (vals == missingVal) if isinstance(missingVal, int) else []
+            else:
+                return [formatValue(val) for val in vals]
+
+            for i in np.nonzero(missing)[0]:
+                formatted[i] = '.'
+            return formatted
+
+        return formatValueColumn
+
+    def _formatPhraseColumn(self, phrases, notAllowedChars):
+        '''
+        Formats a numpy array of phrases as _formatPhraseWithCorrectChrUsage,
+        but only URL-quotes the phrases that contain characters that need it,
+        as found for the full array at once.
+        '''
+        formatPhrase = self._getPhraseFormatter(useUrlEncoding=True, notAllowedChars=notAllowedChars)
+        if phrases.dtype.kind != 'S':
+            return [formatPhrase(str(phrase)) for phrase in phrases]
+
+        formatted = phrases.tolist()
+        if len(phrases) == 0 or phrases.dtype.itemsize == 0:
+            return formatted
+
+        charCodes = np.ascontiguousarray(phrases).view('uint8').reshape(len(phrases), phrases.dtype.itemsize)
+        #Trailing null characters are padding, while any other null characters are part of the phrase
+        needsQuoting = self._getDisallowedCharTable(notAllowedChars)[charCodes].any(axis=1) | \
+                       ((charCodes[:, :-1] == 0) & (charCodes[:, 1:] != 0)).any(axis=1)
+
+        for i in np.nonzero(needsQuoting)[0]:
+            formatted[i] = formatPhrase(formatted[i])
+        return formatted
+
+    @staticmethod
+    def _getDisallowedCharTable(notAllowedChars):
+        table = np.array([chr(x) not in Gtrack.ALLOWED_CHARS or chr(x) in notAllowedChars for x in xrange(256)])
+        table[0] = False
+        return table
+
+    def _getStartOffset(self):
+        return 1 if self._geSource.inputIsOneIndexed() else 0
+
+    def _getEndOffset(self):
+        return (1 if self._geSource.inputIsOneIndexed() else 0) - (1 if self._geSource.inputIsEndInclusive() else 0)
+
+
     # Column specification line methods
 
     def _findHbColumns(self):
@@ -282,6 +416,10 @@ class StdGtrackComposer(FileFormatComposer):
                                             [x for x in columns if x not in subtypeColSet]
                     rearrangedHbColumns = self._getHbColumnsFromGtrackColumns(rearrangedColumns)
 
+                #The source is only copied and iterated for subtypes matching the header lines and columns
+                if not self._compliesWithSubtypeSchema(subtypeUrl, rearrangedColumns):
+                    continue
+
                 try:
                     tempFile = StringIO()
                     self._composeContents(tempFile, rearrangedHbColumns, rearrangedColumns, \
@@ -305,6 +443,15 @@ class StdGtrackComposer(FileFormatComposer):
 
         return hbColumns, columns, False
 
+    def _compliesWithSubtypeSchema(self, subtypeUrl, columns):
+        try:
+            schema = self._composeHeaderLines(onlyNonDefault=True) + self._composeColSpecLine(columns)
+            gtrackGESource = Gtrack('subtype.test.' + self.getDefaultFileNameSuffix(), printWarnings=False, \
+                                    strToUseInsteadOfFn=schema)
+            return gtrackGESource.compliesWithSubtype(subtypeUrl, checkFirstDataLine=False)
+        except Exception, e:
+            return False
+
 
     # Bounding region specification line methods
 
@@ -317,59 +464,82 @@ class StdGtrackComposer(FileFormatComposer):
 
     # Data line methods
 
-    def _formatStart(self, start):
-        return str(start + 1 if self._geSource.inputIsOneIndexed() else start)
-
-    def _formatEnd(self, end):
-        if self._geSource.inputIsOneIndexed():
-            end += 1
-        if self._geSource.inputIsEndInclusive():
-            end -= 1
-        return str(end)
-
-    def _formatValue(self, val):
-        return self._commonFormatVal(val, self._headerDict['value type'], self._headerDict['value dimension'])
+    def _getValueFormatter(self):
+        return self._getCommonValFormatter(self._headerDict['value type'], self._headerDict['value dimension'])
 
-    def _formatEdgeWeight(self, val):
-        return self._commonFormatVal(val, self._headerDict['edge weight type'], self._headerDict['edge weight dimension'])
+    def _getEdgeWeightFormatter(self):
+        return self._getCommonValFormatter(self._headerDict['edge weight type'], self._headerDict['edge weight dimension'])
 
     def _formatPhraseWithCorrectChrUsage(self, phrase, useUrlEncoding=True, notAllowedChars=''):
-        corrected = ''
-        for char in phrase:
-            if char not in Gtrack.ALLOWED_CHARS or char in notAllowedChars:
-                if useUrlEncoding:
-                    corrected += '%' + '{:0>2X}'.format(ord(char))
-            else:
-                corrected += char
-        return corrected
-
-    def _commonFormatVal(self, val, valueType, valueDim):
+        return self._getPhraseFormatter(useUrlEncoding, notAllowedChars)(phrase)
+
+    @classmethod
+    def _getPhraseFormatter(cls, useUrlEncoding=True, notAllowedChars=''):
+        '''
+        Returns a function removing or URL-encoding the characters of a phrase
+        that are not allowed. Phrases without such characters, found with a
+        single str.translate() call, are returned as they are.
+        '''
+        key = (useUrlEncoding, notAllowedChars)
+        if key not in cls._PHRASE_FORMATTERS:
+            disallowedChars = ''.join(chr(x) for x in xrange(256) \
+                                      if chr(x) not in Gtrack.ALLOWED_CHARS or chr(x) in notAllowedChars)
+
+            def formatChar(char):
+                if char not in Gtrack.ALLOWED_CHARS or char in notAllowedChars:
+                    return '%' + '{:0>2X}'.format(ord(char)) if useUrlEncoding else ''
+                return char
+
+            charReplacements = dict((char, formatChar(char)) for char in disallowedChars)
+            disallowedCharRegExp = re.compile('[%s]' % re.escape(disallowedChars))
+            replaceMatch = lambda match: charReplacements[match.group()]
+
+            def formatPhrase(phrase):
+                if not isinstance(phrase, str):
+                    return ''.join([formatChar(char) for char in phrase])
+                if len(phrase.translate(None, disallowedChars)) == len(phrase):
+                    return phrase
+                return disallowedCharRegExp.sub(replaceMatch, phrase)
+
+            cls._PHRASE_FORMATTERS[key] = formatPhrase
+        return cls._PHRASE_FORMATTERS[key]
+
+    def _getCommonValFormatter(self, valueType, valueDim):
         valTypeInfo = Gtrack.VAL_TYPE_DICT[valueType]
+        missingVal = valTypeInfo.missingVal
+        missingValIsNan = isNan(missingVal)
+        formatPhrase = self._getPhraseFormatter(useUrlEncoding=True, notAllowedChars='#.,;=\t')
 
-        if valueDim == 'scalar':
+        def formatScalar(val):
             if not isinstance(val, str) and hasattr(val, '__len__') and len(val)==1:
                 val = val[0]
 
-            if (val == valTypeInfo.missingVal) or (isNan(val) and isNan(valTypeInfo.missingVal)):
+            if (val == missingVal) or (missingValIsNan and isNan(val)):
                 return '.'
             elif isinstance(val, str):
-                return self._formatPhraseWithCorrectChrUsage(val, useUrlEncoding=True, notAllowedChars='#.,;=\t')
+                return formatPhrase(val)
+            elif isinstance(val, bool):
+                return '1' if val == True else '0'
             else:
-                if isinstance(val, bool):
-                    return '1' if val == True else '0'
-                else:
-                    return str(val)
-        else:
-            return valTypeInfo.delim.join([self._commonFormatVal(valPart, valueType, 'scalar') for valPart in val]) \
-                   if len(val) != 0 else '.'
+                return str(val)
 
-    def _formatEdges(self, edges, weights):
-        if len(edges) == 0:
-            return '.'
-        else:
-            return ';'.join(self._formatPhraseWithCorrectChrUsage(edge, useUrlEncoding=True, notAllowedChars='#,;=\t') + \
-                             ('=' + self._formatEdgeWeight(weights[i]) if weights is not None else '') \
-                              for i,edge in enumerate(edges) )
+        if valueDim == 'scalar':
+            return formatScalar
+
+        delim = valTypeInfo.delim
+        return lambda val: delim.join([formatScalar(valPart) for valPart in val]) if len(val) != 0 else '.'
+
+    def _getEdgesFormatter(self):
+        formatPhrase = self._getPhraseFormatter(useUrlEncoding=True, notAllowedChars='#,;=\t')
+        formatEdgeWeight = self._getEdgeWeightFormatter()
+
+        def formatEdges(edges, weights):
+            if len(edges) == 0:
+                return '.'
+            return ';'.join(formatPhrase(edge) + ('=' + formatEdgeWeight(weights[i]) if weights is not None else '') \
+                            for i,edge in enumerate(edges) )
+
+        return formatEdges
 
 
     # Helper methods
@@ -28,6 +28,21 @@ class WigComposer(FileFormatComposer):
         
         isFixedStep = (tf.reprIsDense() or step > 1 or (step == 1 and span != 1))
         
+        if self._useDenseBlockComposing():
+            self._composeDenseBlocks(out, step, span)
+        else:
+            self._composeElements(out, tf, step, span, isFixedStep)
+
+    def _composeDenseBlocks(self, out, step, span):
+        for region, valBlocks in self._iterDenseValBlocks():
+            if len(valBlocks) == 0:
+                continue
+
+            self._composeFixedStepDeclarationLine(out, region, step, span)
+            for vals in valBlocks:
+                out.write('\n'.join(self._commonFormatNumberColumn(vals)) + '\n')
+
+    def _composeElements(self, out, tf, step, span, isFixedStep):
         for brt, geList in iterateOverBRTuplesWithContainedGEs(self._geSource):
             if len(geList) == 0:
                 continue
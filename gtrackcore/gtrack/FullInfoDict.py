@@ -1,58 +1,231 @@
+import os
+import shutil
+import cPickle
+import hashlib
+import numpy
+
+from array import array
+from glob import glob
+from tempfile import mkdtemp
+
+from gtrackcore.core.Config import Config
 from gtrackcore.core.LogSetup import logMessage
-from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
 from gtrackcore.util.CustomExceptions import AbstractClassError, InvalidFormatError
 
-class FullInfoDict(dict):
+KEY_INDEX_DIR_NAME = 'FullInfoDictKeyIndexes'
+
+def _getKeyIndexDirPrefix(fn):
+    return os.sep.join([Config.METADATA_FILES_PATH, KEY_INDEX_DIR_NAME, hashlib.sha1(os.path.abspath(fn)).hexdigest()])
+
+def removeKeyIndexes(fn):
+    'Removes the stored key indexes of the database file fn.'
+    for indexDir in glob(_getKeyIndexDirPrefix(fn) + '.*'):
+        shutil.rmtree(indexDir, ignore_errors=True)
+
+class FullInfoDict(object):
+    '''
+    Read-only mapping from genome elements to dicts of the column values of
+    matching elements in a database GTrack file.
+
+    The mapping is backed by an on-disk key index, stored in the metadata
+    directory under the SHA-1 of the absolute path of the database file (or in
+    a temporary directory if that is not writable), and rebuilt if the file
+    or the columns have changed. The index consists of the sorted element
+    keys, as a numpy string array, and the pickled column values of each
+    element, stored consecutively in a separate file. Lookups are done by
+    searchsorted on the memory-mapped keys, so that no per-element Python
+    objects are kept in memory for the database file.
+
+    Looking up a key that matches more than one element of the database file
+    raises InvalidFormatError.
+    '''
+
+    KEY_TYPE = None
+    BATCH_SIZE = 100000
+    _VERSION = '1.0'
+
     #@takes(GenomeElementSource, tuple)
     def __init__(self, geSource, columnHeader):
-        dict.__init__(self)
-        
-        for ge in geSource:
-            self[ge] = dict([(col, getattr(ge, geSource.convertNameFromGtrack(col))) for col in columnHeader])
-        
+        self._geSource = geSource
+        self._columnHeader = tuple(columnHeader)
+        self._fn = geSource.getFileName()
+        self._tempDir = None
+
+        self._indexDir = self.getIndexDirName()
+        if not self._load():
+            self._create()
+
+    def getIndexDirName(self):
+        return '.'.join([_getKeyIndexDirPrefix(self._fn), self.KEY_TYPE])
+
+    def _getFingerprint(self):
+        stat = os.stat(self._fn)
+        return (self._VERSION, self.KEY_TYPE, self._columnHeader, self._geSource.__class__.__name__, \
+                self._geSource.getVersion(), stat.st_size, int(stat.st_mtime))
+
+    def _getPath(self, name):
+        return os.sep.join([self._indexDir, name])
+
+    def _load(self):
+        fingerprintFn = self._getPath('fingerprint')
+        if not os.path.exists(fingerprintFn):
+            return False
+
+        try:
+            with open(fingerprintFn, 'rb') as fingerprintFile:
+                if cPickle.load(fingerprintFile) != self._getFingerprint():
+                    return False
+            self._open()
+        except Exception, e:
+            logMessage("Unable to read key index '%s': %s" % (self._indexDir, e))
+            return False
+
+        return True
+
+    def _open(self):
+        self._keys = numpy.load(self._getPath('keys.npy'), mmap_mode='r')
+        self._rows = numpy.load(self._getPath('rows.npy'), mmap_mode='r')
+        self._isDuplicate = numpy.load(self._getPath('duplicates.npy'), mmap_mode='r')
+        self._offsets = numpy.load(self._getPath('offsets.npy'), mmap_mode='r')
+        self._recordFile = open(self._getPath('records'), 'rb')
+
+    def _create(self):
+        try:
+            if os.path.exists(self._indexDir):
+                shutil.rmtree(self._indexDir)
+            os.makedirs(self._indexDir)
+        except (IOError, OSError), e:
+            #The index is stored in a temporary directory if the metadata directory is read-only
+            logMessage("Unable to store key index '%s': %s" % (self._indexDir, e))
+            self._tempDir = self._indexDir = mkdtemp()
+
+        keyChunks = []
+        curKeys = []
+        offsets = array('l', [0])
+        colPrefixes = [(col, self._geSource.convertNameFromGtrack(col)) for col in self._columnHeader]
+
+        with open(self._getPath('records'), 'wb') as recordFile:
+            for i, ge in enumerate(self._geSource):
+                key = self._extractKey(ge)
+                if key is None:
+                    continue
+
+                record = cPickle.dumps(dict([(col, getattr(ge, prefix)) for col, prefix in colPrefixes]), \
+                                       cPickle.HIGHEST_PROTOCOL)
+                recordFile.write(record)
+                offsets.append(offsets[-1] + len(record))
+
+                curKeys.append(key)
+                if len(curKeys) >= self.BATCH_SIZE:
+                    keyChunks.append(numpy.array(curKeys))
+                    curKeys = []
+
+        keyChunks.append(numpy.array(curKeys, dtype='S1' if len(curKeys) == 0 else None))
+        keys = numpy.concatenate(keyChunks)
+
+        #Stable sorting keeps duplicate keys in file order
+        sortOrder = numpy.argsort(keys, kind='mergesort')
+        sortedKeys = keys[sortOrder]
+        isDuplicate = numpy.zeros(len(sortedKeys), dtype='bool')
+        if len(sortedKeys) > 1:
+            sameAsNext = sortedKeys[1:] == sortedKeys[:-1]
+            isDuplicate[1:] |= sameAsNext
+            isDuplicate[:-1] |= sameAsNext
+
+        numpy.save(self._getPath('keys.npy'), sortedKeys)
+        numpy.save(self._getPath('rows.npy'), sortOrder.astype('int64'))
+        numpy.save(self._getPath('duplicates.npy'), isDuplicate)
+        numpy.save(self._getPath('offsets.npy'), numpy.frombuffer(offsets, dtype=offsets.typecode).astype('int64'))
+
+        with open(self._getPath('fingerprint'), 'wb') as fingerprintFile:
+            cPickle.dump(self._getFingerprint(), fingerprintFile, cPickle.HIGHEST_PROTOCOL)
+
+        self._open()
+
+    def __del__(self):
+        if hasattr(self, '_recordFile'):
+            self._recordFile.close()
+        if self._tempDir is not None:
+            shutil.rmtree(self._tempDir, ignore_errors=True)
+
     def _extractKey(self, genomeElement):
         raise AbstractClassError
-    
-    def __setitem__(self, ge, value):
-        key = self._extractKey(ge)
-        if dict.has_key(self, key):
-            value = dict.__getitem__(self, key).append(value)
-        dict.__setitem__(self, key, [value])
-    
+
+    def __len__(self):
+        return len(self._keys)
+
+    def getRows(self, keys):
+        '''
+        Returns the row numbers in the database file of the elements matching
+        each of the keys, with -1 for keys without any match. Raises
+        InvalidFormatError if any of the keys match more than one element.
+        '''
+        keys = numpy.array(keys, dtype='S1' if len(keys) == 0 else None)
+        if len(self._keys) == 0 or len(keys) == 0:
+            return -numpy.ones(len(keys), dtype='int64')
+
+        idxs = numpy.minimum(numpy.searchsorted(self._keys, keys), len(self._keys) - 1)
+        #Keys longer than any key in the index may be truncated by searchsorted, so matches are checked
+        found = self._keys[idxs] == keys
+
+        duplicated = found & self._isDuplicate[idxs]
+        if duplicated.any():
+            raise InvalidFormatError('Error: duplicate match on the same key, "%s"' % \
+                                     keys[numpy.nonzero(duplicated)[0][0]])
+
+        return numpy.where(found, self._rows[idxs], -1)
+
+    def getRecords(self, rows):
+        'Returns the dicts of column values of the elements at the given rows (None for rows of -1).'
+        records = [None] * len(rows)
+        #Records are read in file order
+        for i in numpy.argsort(rows, kind='mergesort'):
+            row = rows[i]
+            if row < 0:
+                continue
+            start, end = self._offsets[row], self._offsets[row + 1]
+            self._recordFile.seek(start)
+            records[i] = cPickle.loads(self._recordFile.read(end - start))
+        return records
+
+    def getBatch(self, ges):
+        'Returns the dicts of column values matching each of the genome elements (None if not matching).'
+        keys = [self._extractKey(ge) for ge in ges]
+        validIdxs = [i for i, key in enumerate(keys) if key is not None]
+
+        records = [None] * len(ges)
+        validRecords = self.getRecords(self.getRows([keys[i] for i in validIdxs]))
+        for i, record in zip(validIdxs, validRecords):
+            records[i] = record
+        return records
+
     def get(self, ge):
-        key = self._extractKey(ge)
-        return self._handleGetItem(key, dict.get(self, key))
-    
+        return self.getBatch([ge])[0]
+
     def has_key(self, ge):
-        return dict.has_key(self, self._extractKey(ge))
-    
-    def __delitem__(self, ge):
-        dict.__delitem__(self, self._extractKey(ge))
-    
-    def __getitem__(self, ge):
         key = self._extractKey(ge)
-        return self._handleGetItem(key, dict.__getitem__(self, key))
-    
+        return key is not None and self.getRows([key])[0] >= 0
+
+    def __getitem__(self, ge):
+        record = self.get(ge)
+        if record is None:
+            raise KeyError(self._extractKey(ge))
+        return record
+
     def __contains__(self, ge):
-        return dict.__contains__(self, self._extractKey(ge))
-        
-    def _handleGetItem(self, key, item):
-        if item is not None and len(item) > 1:
-            raise InvalidFormatError('Error: duplicate match on the same key, "%s"' % str(key))
-        return item[0]
+        return self.has_key(ge)
 
 
-class IdFullInfoDict(FullInfoDict):        
+class IdFullInfoDict(FullInfoDict):
+    KEY_TYPE = 'id'
+
     def _extractKey(self, genomeElement):
-        return genomeElement.id
-    
-    def getKey(self, genomeElement):
-        return self[self._extractKey(genomeElement)]
+        return str(genomeElement.id) if genomeElement.id is not None else None
+
 
+class TupleFullInfoDict(FullInfoDict):
+    KEY_TYPE = 'position'
 
-class TupleFullInfoDict(FullInfoDict):       
     def _extractKey(self, genomeElement):
-        return (genomeElement.genome, genomeElement.chr, genomeElement.start, genomeElement.end)
-        
-    def getKey(self, genomeElement):
-        return self[self._extractKey(genomeElement)]
\ No newline at end of file
+        return '\t'.join(str(x) for x in \
+                         (genomeElement.genome, genomeElement.chr, genomeElement.start, genomeElement.end))
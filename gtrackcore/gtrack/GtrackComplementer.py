@@ -6,6 +6,13 @@ from gtrackcore.input.wrappers.GESourceWrapper import ElementModifierGESourceWra
 from gtrackcore.util.CustomExceptions import ShouldNotOccurError
 
 class ElementComplementer(ElementModifierGESourceWrapper):
+    '''
+    Adds columns from a database GTrack file to the elements of a GTrack
+    file. The elements are looked up in the FullInfoDict in batches of
+    BATCH_SIZE elements, using vectorized searches in the key index.
+    '''
+    BATCH_SIZE = 10000
+
     def __init__(self, geSource, fullDbDict, gtrackColsToAdd):
         self._prefixesToAdd = [GtrackGenomeElementSource.convertNameFromGtrack(col) for col in gtrackColsToAdd]
         if 'edges' in self._prefixesToAdd:
@@ -16,9 +23,32 @@ class ElementComplementer(ElementModifierGESourceWrapper):
         self._fullDbDict = fullDbDict
         self._prefixList = geSource.getPrefixList() + self._prefixesToAdd
         
-    def _next(self, brt, ge, i):
+    def _iter(self):
+        self._batch = []
+        self._batchIdx = 0
+
+    def next(self):
+        if self._batchIdx >= len(self._batch):
+            self._readBatch()
+            if len(self._batch) == 0:
+                raise StopIteration
+
+        self._batchIdx += 1
+        return self._batch[self._batchIdx - 1]
+
+    def _readBatch(self):
+        ges = []
+        for brt, ge, i in self._brtAndGeIter:
+            # Elements are copied, as they are kept while reading the rest of the batch
+            ges.append(ge.getCopy())
+            if len(ges) >= self.BATCH_SIZE:
+                break
+
+        self._batch = [self._next(ge, dbGE) for ge, dbGE in zip(ges, self._fullDbDict.getBatch(ges))]
+        self._batchIdx = 0
+
+    def _next(self, ge, dbGE):
         for prefix in self._prefixesToAdd:
-            dbGE = self._fullDbDict.get(ge)
             if prefix == 'weights' and (dbGE is None or dbGE.get('edges') is None):
                 continue
             setattr(ge, prefix, dbGE.get(prefix) if dbGE is not None else '.')
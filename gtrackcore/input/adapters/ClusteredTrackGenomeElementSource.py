@@ -0,0 +1,144 @@
+import numpy
+
+from collections import OrderedDict
+
+from gtrackcore.core.Config import Config
+from gtrackcore.input.adapters.TrackGenomeElementSource import TrackGenomeElementSource
+from gtrackcore.input.core.GenomeElement import GenomeElement
+from gtrackcore.input.core.GenomeElementSource import BoundingRegionTuple
+from gtrackcore.input.wrappers.GEOverlapClusterer import getMissingValue
+from gtrackcore.util.CommonConstants import RESERVED_PREFIXES
+
+class ArrayOverlapClusterer(object):
+    '''
+    Vectorized version of GEOverlapClusterer, working on the sorted columns of
+    a track. Segments are clustered where they overlap (the start is smaller
+    than the maximal end of all previous segments), while points are clustered
+    where they have the same start. The contents of the clusters are merged
+    using the same rules as GEOverlapClusterer.
+    '''
+
+    def __init__(self, starts, ends=None):
+        numEls = len(starts)
+        if ends is not None:
+            prevMaxEnds = numpy.maximum.accumulate(ends)[:-1]
+            isClusterStart = numpy.r_[True, starts[1:] >= prevMaxEnds]
+        else:
+            isClusterStart = numpy.r_[True, starts[1:] != starts[:-1]]
+
+        self._numEls = numEls
+        self._isClusterStart = isClusterStart[:numEls]
+        self._firstIdxs = numpy.flatnonzero(self._isClusterStart)
+        self._clusterSizes = numpy.diff(numpy.r_[self._firstIdxs, numEls])
+
+    def getNumClusters(self):
+        return len(self._firstIdxs)
+
+    def getStarts(self, starts):
+        return starts[self._firstIdxs]
+
+    def getEnds(self, ends):
+        if self._numEls == 0:
+            return ends
+        return numpy.maximum.reduceat(ends, self._firstIdxs)
+
+    def _getClustersWithDifferentContents(self, array):
+        if self._numEls == 0:
+            return numpy.zeros(0, dtype='bool8')
+
+        differs = array[1:] != array[:-1]
+        if len(differs.shape) > 1:
+            differs = differs.reshape(len(differs), -1).any(axis=1)
+        differs = numpy.r_[False, differs] & ~self._isClusterStart
+        return numpy.logical_or.reduceat(differs, self._firstIdxs)
+
+    def getEqualOrMissing(self, array, missingVal):
+        'Contents of the first element of each cluster, or missingVal if the elements of the cluster differ.'
+        clustered = array[self._firstIdxs]
+        clustered[self._getClustersWithDifferentContents(array)] = missingVal
+        return clustered
+
+    def getConcatenated(self, array, sortContents):
+        "Contents of the elements of each cluster joined by '|', unless all elements are equal."
+        clustered = array[self._firstIdxs].tolist()
+        for i in numpy.flatnonzero(self._getClustersWithDifferentContents(array)):
+            first = self._firstIdxs[i]
+            contents = array[first:first + self._clusterSizes[i]].tolist()
+            if sortContents:
+                contents.sort()
+
+            if len(contents) < Config.MAX_CONCAT_LEN_FOR_OVERLAPPING_ELS:
+                clustered[i] = '|'.join(contents)
+            else:
+                clustered[i] = contents[0] + '|...'
+        return numpy.array(clustered, dtype='S')
+
+
+class ClusteredTrackGenomeElementSource(TrackGenomeElementSource):
+    '''
+    Reads the preprocessed allowOverlaps=True version of a track and returns,
+    for each bounding region, a slice (element with array contents) of the
+    elements with overlapping elements clustered. Used to create the
+    allowOverlaps=False version of a track without iterating element by
+    element.
+    '''
+    _isSliceSource = True
+
+    def __init__(self, genome, trackName, boundingRegions, *args, **kwArgs):
+        TrackGenomeElementSource.__init__(self, genome, trackName, boundingRegions, globalCoords=True, \
+                                          allowOverlaps=True, *args, **kwArgs)
+
+    @staticmethod
+    def supportsGESource(geSource):
+        prefixList = geSource.getPrefixList()
+        return 'start' in prefixList and not any(prefix in prefixList for prefix in ['edges', 'weights'])
+
+    def _getClusterer(self, tv):
+        if 'end' in self.getPrefixList():
+            return ArrayOverlapClusterer(tv.startsAsNumpyArray(), tv.endsAsNumpyArray())
+        else:
+            return ArrayOverlapClusterer(tv.startsAsNumpyArray())
+
+    def _wrappedTrackElsGenerator(self):
+        track = self._getTrack()
+        for region, tv in ((region, self._getTrackView(track, region)) for region in self._boundingRegions):
+            if tv.getNumElements() > 0:
+                yield self._getClusteredSlice(region, tv)
+
+    def _getClusteredSlice(self, region, tv):
+        prefixList = self.getPrefixList()
+        clusterer = self._getClusterer(tv)
+
+        contents = {}
+        contents['start'] = clusterer.getStarts(tv.startsAsNumpyArray()) + region.start
+        if 'end' in prefixList:
+            contents['end'] = clusterer.getEnds(tv.endsAsNumpyArray()) + region.start
+
+        if 'val' in prefixList:
+            valDataType = self.getValDataType()
+            if valDataType[0] == 'S' and valDataType != 'S1':
+                contents['val'] = clusterer.getConcatenated(tv.valsAsNumpyArray(), sortContents=True)
+            else:
+                contents['val'] = clusterer.getEqualOrMissing(tv.valsAsNumpyArray(), getMissingValue('val', valDataType))
+
+        if 'strand' in prefixList:
+            contents['strand'] = clusterer.getEqualOrMissing(tv.strandsAsNumpyArray(), getMissingValue('strand', None))
+
+        if 'id' in prefixList:
+            contents['id'] = clusterer.getConcatenated(tv.idsAsNumpyArray(), sortContents=False)
+
+        extraKeys = [prefix for prefix in prefixList if prefix not in RESERVED_PREFIXES]
+        extra = OrderedDict([(key, clusterer.getConcatenated(tv.extrasAsNumpyArray(key), sortContents=False)) \
+                             for key in extraKeys])
+
+        return GenomeElement(self._genome, region.chr, contents.get('start'), contents.get('end'), \
+                             contents.get('val'), contents.get('strand'), contents.get('id'), \
+                             extra=extra, orderedExtraKeys=extraKeys)
+
+    def getBoundingRegionTuples(self):
+        if self._boundingRegionTuples is None:
+            track = self._getTrack()
+            self._boundingRegionTuples = [BoundingRegionTuple(region, self._getClusterer(tv).getNumClusters()) \
+                                          for region, tv in ((region, self._getTrackView(track, region)) \
+                                                             for region in self._boundingRegions)]
+        return self._boundingRegionTuples
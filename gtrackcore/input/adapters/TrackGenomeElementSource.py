@@ -41,6 +41,8 @@ class TrackGenomeElementSource(GenomeElementSource):
         self._preProcVersion = None
         self._id = None
         self._undirectedEdges = None
+        self._storedFixedLength = None
+        self._storedFixedGapSize = None
         self._foundTrackInfoBasedMetaData = False
 
         self._doneCalculatingTrackViewBasedValues = False
@@ -55,6 +57,7 @@ class TrackGenomeElementSource(GenomeElementSource):
         self._reprIsDense = False
         fixedLengths = set([])
         fixedGapSizes = set([])
+        storedFixedLength, storedFixedGapSize = self._getStoredFixedLengthAndGapSize()
 
         track = self._getTrack()
         for i, region, tv in ((i, region, self._getTrackView(track, region)) for i, region in enumerate(self._boundingRegions)):
@@ -63,26 +66,37 @@ class TrackGenomeElementSource(GenomeElementSource):
                 break
 
             starts, ends = tv.startsAsNumpyArray(), tv.endsAsNumpyArray()
-            lengths = ends - starts
 
-            if len(lengths) == 0:
+            if len(starts) == 0:
                 continue
 
-            if (lengths == lengths[0]).all():
-                fixedLengths.add(lengths[0])
-            else:
-                fixedLengths.add(None)
-                break
+            #Only the elements at the region borders may be cut, so if these have the fixed length
+            #stored at preprocessing time, so have all elements, with the stored gap size between them
+            usesStoredValues = storedFixedLength is not None and \
+                ends[0] - starts[0] == storedFixedLength and ends[-1] - starts[-1] == storedFixedLength
 
-            gaps = starts[1:] - starts[:-1] - lengths[0]
+            if usesStoredValues:
+                fixedLengths.add(storedFixedLength)
+            else:
+                lengths = ends - starts
+                if (lengths == lengths[0]).all():
+                    fixedLengths.add(lengths[0])
+                else:
+                    fixedLengths.add(None)
+                    break
 
             if starts[0] != 0:
                 fixedGapSizes.add(None)
                 continue
 
-            if len(gaps) == 0:
+            if len(starts) == 1:
+                continue
+
+            if usesStoredValues and storedFixedGapSize is not None:
+                fixedGapSizes.add(storedFixedGapSize)
                 continue
 
+            gaps = starts[1:] - starts[:-1] - (ends[0] - starts[0])
             if (gaps == gaps[0]).all():
                 fixedGapSizes.add(gaps[0])
             else:
@@ -93,6 +107,66 @@ class TrackGenomeElementSource(GenomeElementSource):
 
         self._doneCalculatingTrackViewBasedValues = True
 
+    def _getStoredFixedLengthAndGapSize(self):
+        '''
+        Returns the fixed length and gap size of all elements of the track, as
+        stored at preprocessing time, or None if not fixed or not stored.
+        '''
+        self._findTrackInfoBasedMetaData()
+        return self._storedFixedLength, self._storedFixedGapSize
+
+    def findFixedLengthAndGapSizeOfAllElements(self):
+        '''
+        Returns the length of the elements and the size of the gaps between
+        consecutive elements within each bounding region, if these are the same
+        for all elements, and None otherwise. The gap size is only found if the
+        length is fixed.
+        '''
+        fixedLength, fixedGapSize = None, None
+        gapSizeVaries = False
+
+        for region, tv in self.iterTrackViews():
+            starts, ends = tv.startsAsNumpyArray(), tv.endsAsNumpyArray()
+            if len(starts) == 0:
+                continue
+
+            lengths = ends - starts
+            if not (lengths == lengths[0]).all() or fixedLength not in [None, lengths[0]]:
+                return None, None
+            fixedLength = int(lengths[0])
+
+            gaps = starts[1:] - starts[:-1] - fixedLength
+            if gapSizeVaries or len(gaps) == 0:
+                continue
+
+            if (gaps == gaps[0]).all() and fixedGapSize in [None, gaps[0]]:
+                fixedGapSize = int(gaps[0])
+            else:
+                fixedGapSize = None
+                gapSizeVaries = True
+
+        return fixedLength, fixedGapSize
+
+    def getValRange(self):
+        '''
+        Returns a tuple of the minimum and maximum value, found from the value
+        arrays of the track views, or None if there are no numerical values.
+        '''
+        minVals, maxVals = [], []
+
+        track = self._getTrack()
+        for region in self._boundingRegions:
+            vals = self._getTrackView(track, region).valsAsNumpyArray()
+            if vals is None or vals.dtype.kind not in 'iuf':
+                return None
+            if len(vals) > 0:
+                minVals.append(vals.min())
+                maxVals.append(vals.max())
+
+        if len(minVals) == 0:
+            return None
+        return min(minVals), max(maxVals)
+
     def getFixedLength(self):
         self._calcTrackViewBasedValues()
         return self._fixedLength
@@ -123,6 +197,50 @@ class TrackGenomeElementSource(GenomeElementSource):
             for te in tv:
                 yield GenomeElement.createGeFromTrackEl(te, tv.trackFormat, globalCoords=self._globalCoords)
 
+    def iterTrackViews(self):
+        'Iterates over tuples of the bounding regions and the corresponding track views.'
+        track = self._getTrack()
+        for region in self._boundingRegions:
+            yield region, self._getTrackView(track, region)
+
+    def iterColumnChunks(self, chunkSize):
+        '''
+        Iterates over the elements of non-dense tracks as chunks of at most
+        chunkSize elements, without creating GenomeElement objects. Yields
+        tuples of the chromosome and an OrderedDict from prefix to numpy
+        array, with start and end coordinates as for the genome elements.
+        '''
+        for region, tv in self.iterTrackViews():
+            genomeAnchor = tv.genomeAnchor
+            chr = genomeAnchor.chr if self._globalCoords else str(genomeAnchor)
+            columns = self.getTrackViewColumns(tv)
+
+            numElements = len(columns['start'])
+            for chunkStart in xrange(0, numElements, chunkSize):
+                yield chr, OrderedDict([(prefix, array[chunkStart:chunkStart + chunkSize]) \
+                                        for prefix, array in columns.iteritems()])
+
+    def getTrackViewColumns(self, tv):
+        '''
+        Returns an OrderedDict from prefix to numpy array for the elements of
+        a non-dense track view, with start and end coordinates as for the
+        genome elements. Edges and weights are not included.
+        '''
+        tf = tv.trackFormat
+        assert not tf.reprIsDense()
+
+        offset = tv.genomeAnchor.start if self._globalCoords else 0
+
+        columns = OrderedDict()
+        columns['start'] = tv.startsAsNumpyArray() + offset
+        if tf.isInterval():
+            columns['end'] = tv.endsAsNumpyArray() + offset
+        for prefix, array in [('val', tv.valsAsNumpyArray()), ('strand', tv.strandsAsNumpyArray()), \
+                              ('id', tv.idsAsNumpyArray())] + tv.allExtrasAsDictOfNumpyArrays().items():
+            if array is not None:
+                columns[prefix] = array
+        return columns
+
     def next(self):
         return self._generator.next()
 
@@ -220,12 +338,16 @@ class TrackGenomeElementSource(GenomeElementSource):
                 self._preProcVersion = collector.getPreProcVersion()
                 self._id = collector.getId()
                 self._undirectedEdges = True if collector.hasUndirectedEdges() else False
+                self._storedFixedLength, self._storedFixedGapSize = \
+                    collector.getFixedLengthAndGapSize(self._allowOverlaps)
             else:
                 ti = TrackInfo(self._genome, self._trackName)
                 self._fileSuffix = ti.fileType
                 self._preProcVersion = ti.preProcVersion
                 self._id = ti.id
                 self._undirectedEdges = True if ti.undirectedEdges else False
+                self._storedFixedLength = ti.fixedLengths.get(self._allowOverlaps)
+                self._storedFixedGapSize = ti.fixedGapSizes.get(self._allowOverlaps)
 
     def getFileSuffix(self):
         self._findTrackInfoBasedMetaData()
@@ -281,6 +403,9 @@ class TrackViewListGenomeElementSource(TrackGenomeElementSource):
     def _getTrack(self):
         pass
 
+    def _getStoredFixedLengthAndGapSize(self):
+        return None, None
+
     def _getTrackView(self, track, region):
         return self._trackViewDict[region]
 
@@ -0,0 +1,200 @@
+from gtrackcore.input.core.GenomeElement import GenomeElement
+from gtrackcore.track.core.GenomeRegion import GenomeRegion
+from gtrackcore.util.CustomExceptions import NotSupportedError
+
+_MISSING = object()
+
+class GenomeElementSchema(object):
+    '''
+    Ordered list of extra keys, shared between all CompactGenomeElement
+    objects created by the same GenomeElementSource. Keys are added the first
+    time they are set for any of the elements.
+    '''
+    __slots__ = ['orderedExtraKeys', '_keyIndex']
+
+    def __init__(self, orderedExtraKeys=None):
+        self.orderedExtraKeys = []
+        self._keyIndex = {}
+        if orderedExtraKeys is not None:
+            for key in orderedExtraKeys:
+                self.getKeyIndex(key)
+
+    def getKeyIndex(self, key, addIfMissing=True):
+        try:
+            return self._keyIndex[key]
+        except KeyError:
+            if not addIfMissing:
+                return None
+            self._keyIndex[key] = len(self.orderedExtraKeys)
+            self.orderedExtraKeys.append(key)
+            return self._keyIndex[key]
+
+    def __len__(self):
+        return len(self.orderedExtraKeys)
+
+class CompactGenomeElement(object):
+    '''
+    Memory-efficient alternative to GenomeElement, with the same interface as
+    used by the GenomeElementSource parsers and wrappers. Standard attributes
+    are stored in slots, while extra column values are stored in a list
+    indexed by a GenomeElementSchema shared by all elements of a source.
+
+    Note that the 'extra' attribute returns a read-only snapshot (a new dict),
+    so that changes to it are not stored in the element. The extra columns are
+    instead changed by attribute assignment, e.g. "ge.source = 'x'", or
+    replaced by assigning a dict to 'extra'. 'orderedExtraKeys' cannot be
+    assigned, as the order of the extra columns is given by the schema.
+    '''
+    __slots__ = ['genome', 'chr', 'start', 'end', 'val', 'strand', 'id', 'edges', 'weights', \
+                 'isBlankElement', '_schema', '_extraVals']
+
+    def __init__(self, genome=None, chr=None, start=None, end=None, val=None, strand=None, id=None, edges=None, weights=None, \
+                 extra=None, orderedExtraKeys=None, isBlankElement=False, schema=None, **kwArgs):
+        #object.__setattr__ is used for speedup, so that __setattr__ is not called
+        setSlot = object.__setattr__
+        setSlot(self, 'genome', genome)
+        setSlot(self, 'chr', chr)
+        setSlot(self, 'start', start)
+        setSlot(self, 'end', end)
+        setSlot(self, 'val', val)
+        setSlot(self, 'strand', strand)
+        setSlot(self, 'id', id)
+        setSlot(self, 'edges', edges)
+        setSlot(self, 'weights', weights)
+        setSlot(self, 'isBlankElement', isBlankElement)
+        if schema is None:
+            schema = GenomeElementSchema()
+        setSlot(self, '_schema', schema)
+
+        if extra:
+            if orderedExtraKeys is None:
+                orderedExtraKeys = extra.keys()
+            if orderedExtraKeys == schema.orderedExtraKeys:
+                setSlot(self, '_extraVals', [extra[key] for key in orderedExtraKeys])
+            else:
+                setSlot(self, '_extraVals', [])
+                for key in orderedExtraKeys:
+                    self._setExtra(key, extra[key])
+        else:
+            setSlot(self, '_extraVals', [])
+
+        for kw in kwArgs:
+            self._setExtra(kw, kwArgs[kw])
+
+    @staticmethod
+    def createFromExtraVals(schema, extraVals, genome=None, chr=None, start=None, end=None, val=None, strand=None, id=None):
+        'Fast constructor for batch parsing. The extra values must follow the order of schema.orderedExtraKeys.'
+        ge = CompactGenomeElement.__new__(CompactGenomeElement)
+        setSlot = object.__setattr__
+        setSlot(ge, 'genome', genome)
+        setSlot(ge, 'chr', chr)
+        setSlot(ge, 'start', start)
+        setSlot(ge, 'end', end)
+        setSlot(ge, 'val', val)
+        setSlot(ge, 'strand', strand)
+        setSlot(ge, 'id', id)
+        setSlot(ge, 'edges', None)
+        setSlot(ge, 'weights', None)
+        setSlot(ge, 'isBlankElement', False)
+        setSlot(ge, '_schema', schema)
+        setSlot(ge, '_extraVals', extraVals)
+        return ge
+
+    def _setExtra(self, key, value):
+        index = self._schema.getKeyIndex(key)
+        extraVals = self._extraVals
+        if index >= len(extraVals):
+            extraVals.extend([_MISSING] * (index + 1 - len(extraVals)))
+        extraVals[index] = value
+
+    def __getattr__(self, item):
+        if item in ('_schema', '_extraVals') or item.startswith('__'):
+            raise AttributeError(item)
+
+        index = self._schema.getKeyIndex(item, addIfMissing=False)
+        if index is None or index >= len(self._extraVals) or self._extraVals[index] is _MISSING:
+            raise AttributeError(item)
+        return self._extraVals[index]
+
+    def __setattr__(self, item, value):
+        if item in _SLOTS:
+            object.__setattr__(self, item, value)
+        elif item == 'extra':
+            self._replaceExtra(value)
+        elif item == 'orderedExtraKeys':
+            raise NotSupportedError('The order of the extra columns of CompactGenomeElement objects is given '
+                                    'by the shared schema, and cannot be changed per element.')
+        else:
+            self._setExtra(item, value)
+
+    def _replaceExtra(self, extra):
+        object.__setattr__(self, '_extraVals', [])
+        if extra:
+            for key in extra:
+                self._setExtra(key, extra[key])
+
+    def __copy__(self):
+        raise NotSupportedError('Shallow copy.copy() of CompactGenomeElement objects is not supported, '
+                                'as this produces unwanted effects. Please use instance method '
+                                'getCopy() or copy.deepcopy() instead.')
+
+    def __getstate__(self):
+        return dict((slot, getattr(self, slot)) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in state.iteritems():
+            object.__setattr__(self, slot, value)
+
+    def getCopy(self):
+        ge = CompactGenomeElement.__new__(CompactGenomeElement)
+        setSlot = object.__setattr__
+        setSlot(ge, 'genome', self.genome)
+        setSlot(ge, 'chr', self.chr)
+        setSlot(ge, 'start', self.start)
+        setSlot(ge, 'end', self.end)
+        setSlot(ge, 'val', self.val)
+        setSlot(ge, 'strand', self.strand)
+        setSlot(ge, 'id', self.id)
+        setSlot(ge, 'edges', self.edges)
+        setSlot(ge, 'weights', self.weights)
+        setSlot(ge, 'isBlankElement', self.isBlankElement)
+        setSlot(ge, '_schema', self._schema)
+        setSlot(ge, '_extraVals', list(self._extraVals))
+        return ge
+
+    def getSchema(self):
+        return self._schema
+
+    @property
+    def orderedExtraKeys(self):
+        return [key for key, val in zip(self._schema.orderedExtraKeys, self._extraVals) if val is not _MISSING]
+
+    @property
+    def extra(self):
+        return dict((key, val) for key, val in zip(self._schema.orderedExtraKeys, self._extraVals) if val is not _MISSING)
+
+    def toGenomeElement(self):
+        return GenomeElement(self.genome, self.chr, self.start, self.end, self.val, self.strand, self.id, \
+                             self.edges, self.weights, self.extra, self.orderedExtraKeys, self.isBlankElement)
+
+    __str__ = GenomeElement.__str__.im_func
+    __repr__ = GenomeElement.__repr__.im_func
+    toStr = GenomeElement.toStr.im_func
+    __cmp__ = GenomeElement.__cmp__.im_func
+    overlaps = GenomeElement.overlaps.im_func
+    reprIsDense = GenomeElement.reprIsDense.im_func
+    validAsRegion = GenomeElement.validAsRegion.im_func
+
+    __len__ = GenomeRegion.__len__.im_func
+    __hash__ = GenomeRegion.__hash__.im_func
+    contains = GenomeRegion.contains.im_func
+    touches = GenomeRegion.touches.im_func
+    exclude = GenomeRegion.exclude.im_func
+    extend = GenomeRegion.extend.im_func
+    getTotalBpSpan = GenomeRegion.getTotalBpSpan.im_func
+    getAsRegSpec = GenomeRegion.getAsRegSpec.im_func
+    isWholeChr = GenomeRegion.isWholeChr.im_func
+    strShort = GenomeRegion.strShort.im_func
+    _shortenPosition = GenomeRegion._shortenPosition.im_func
+
+_SLOTS = frozenset(CompactGenomeElement.__slots__)
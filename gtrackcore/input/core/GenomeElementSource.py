@@ -6,6 +6,7 @@ from collections import OrderedDict
 from cStringIO import StringIO
 
 from gtrackcore.core.LogSetup import logException
+from gtrackcore.input.core.CompactGenomeElement import GenomeElementSchema
 from gtrackcore.input.core.GenomeElement import GenomeElement
 from gtrackcore.metadata.GenomeInfo import GenomeInfo
 from gtrackcore.util.CommonFunctions import getFileSuffix
@@ -43,6 +44,7 @@ class GenomeElementSource(object):
     _hasUndirectedEdges = False
     _inputIsOneIndexed = False
     _inputIsEndInclusive = False
+    _isIndexable = False
 
     def __new__(cls, fn, genome=None, trackName=None, suffix=None, forPreProcessor=False, *args, **kwArgs):
         geSourceCls = getGenomeElementSourceClass(fn, suffix=suffix, forPreProcessor=forPreProcessor)
@@ -52,6 +54,7 @@ class GenomeElementSource(object):
         self._fn = fn
         self._genome = genome
         self._genomeElement = GenomeElement(genome)
+        self._geSchema = GenomeElementSchema()
         self._trackName = trackName
         self._external = external
         self._prefixList = None
@@ -113,6 +116,9 @@ class GenomeElementSource(object):
     def inputIsEndInclusive(self):
         return self._inputIsEndInclusive
 
+    def isIndexable(self):
+        return self._isIndexable and self._fn is not None and self._strToUseInsteadOfFn == ''
+
     def anyWarnings(self):
         return self._lastWarning is not None
 
@@ -121,48 +127,52 @@ class GenomeElementSource(object):
 
     def next(self):
         while True:
-            line = self._file.readline()
-            lineStripped = line.rstrip('\r\n')
-
-            try:
-                if line == '':#End of file
-                    if not self._handledEof:
-                        self._handleEndOfFile()
-                        self._checkBoundingRegionOverlap()
-                        self._handledEof = True
-                    if not self._anyPendingElements():
-                        raise StopIteration
-                elif lineStripped == '': #Blank line
-                    self._handleBlankLine()
-                    continue
-
-                ge = self._next(lineStripped)
-                if ge is None:
-                    continue
-
-                self._genomeElement = ge
-                return self._genomeElement
-
-            except Warning, e:
-                if self._printWarnings:
-                    if not hasattr(self, '_numWarningLines'):
-                        self._numWarningLines = 0
-                    self._numWarningLines +=1
-                    if self._numWarningLines > 5:
-                        if self._numWarningLines == 6:
-                            print os.linesep + '5 warnings shown, skipping rest of warnings for file...'
-                    else:
-                        print os.linesep + "Warning in line\n---------------\n%s\n\nInternal representation: %s\n\n-> %s. Skipping line.\n---" % (lineStripped, repr(line), str(e))
-
-                self._lastWarning = str(e)
-                continue
-
-            except StopIteration:
-                raise
-
-            except Exception, e:
-                print os.linesep + "Error in line\n-------------\n%s\n\nInternal representation: %s\n\n-> %s\n---" % (lineStripped, repr(line), str(e))
-                raise
+            ge = self._parseLine(self._file.readline())
+            if ge is not None:
+                return ge
+
+    def _parseLine(self, line):
+        lineStripped = line.rstrip('\r\n')
+
+        try:
+            if line == '':#End of file
+                if not self._handledEof:
+                    self._handleEndOfFile()
+                    self._checkBoundingRegionOverlap()
+                    self._handledEof = True
+                if not self._anyPendingElements():
+                    raise StopIteration
+            elif lineStripped == '': #Blank line
+                self._handleBlankLine()
+                return None
+
+            ge = self._next(lineStripped)
+            if ge is None:
+                return None
+
+            self._genomeElement = ge
+            return self._genomeElement
+
+        except Warning, e:
+            if self._printWarnings:
+                if not hasattr(self, '_numWarningLines'):
+                    self._numWarningLines = 0
+                self._numWarningLines +=1
+                if self._numWarningLines > 5:
+                    if self._numWarningLines == 6:
+                        print os.linesep + '5 warnings shown, skipping rest of warnings for file...'
+                else:
+                    print os.linesep + "Warning in line\n---------------\n%s\n\nInternal representation: %s\n\n-> %s. Skipping line.\n---" % (lineStripped, repr(line), str(e))
+
+            self._lastWarning = str(e)
+            return None
+
+        except StopIteration:
+            raise
+
+        except Exception, e:
+            print os.linesep + "Error in line\n-------------\n%s\n\nInternal representation: %s\n\n-> %s\n---" % (lineStripped, repr(line), str(e))
+            raise
 
     def _anyPendingElements(self):
         return False
@@ -190,17 +200,67 @@ class GenomeElementSource(object):
         return open(self._fn, 'U', -1)
 
     def __iter__(self):
+        return self._getIterWithFile()._iter()
+
+    def _getIterWithFile(self):
         geIter = copy(self)
         geIter._file = geIter._getFileNoHeaders()
         geIter._handledEof = False
         self._lastWarning = None
-        return geIter._iter()
+        return geIter
+
+    def getIndex(self):
+        if not hasattr(self, '_index'):
+            from gtrackcore.input.core.GenomeElementSourceIndex import GenomeElementSourceIndex
+            self._index = GenomeElementSourceIndex(self).getIndex()
+        return self._index
+
+    def iterRegion(self, region):
+        '''
+        Iterates over the genome elements overlapping the region. For indexable
+        sources, the coordinate index is used to seek directly to the first
+        data line that may overlap the region. Other sources are scanned in full.
+        '''
+        if not self.isIndexable():
+            for ge in self:
+                if ge.chr == region.chr and self._overlapsRegion(ge, region):
+                    yield ge
+            return
+
+        offset = self.getIndex().getOffset(region.chr, region.start)
+        if offset is None:
+            return
+
+        geIter = self._getIterWithFile()
+        geIter._file.seek(offset)
+        geIter._iter()
+        try:
+            while True:
+                try:
+                    ge = geIter.next()
+                except StopIteration:
+                    return
+
+                if ge.chr != region.chr or ge.start >= region.end:
+                    return
+
+                if self._overlapsRegion(ge, region):
+                    yield ge
+        finally:
+            geIter._file.close()
+
+    @staticmethod
+    def _overlapsRegion(ge, region):
+        if ge.start is None:
+            return True
+        end = ge.end if ge.end is not None else ge.start + 1
+        return ge.start < region.end and end > region.start
 
     def _iter(self):
         return self
 
     def _checkValidChr(self, chr):
-        if self.genome and not GenomeInfo.isValidChr(self.genome, chr):
+        if self.genome and not GenomeInfo.getChrTable(self.genome).isValidChr(chr):
             raise InvalidFormatWarning('Chromosome incorrectly specified: ' + chr)
         return chr
 
@@ -208,22 +268,22 @@ class GenomeElementSource(object):
         if start < 0:
             raise InvalidFormatError('Error: start position is negative: %s' % start)
 
-        if self.genome and \
-            GenomeInfo.isValidChr(self.genome, chr) and \
-                start > GenomeInfo.getChrLen(self.genome, chr):
-                    raise InvalidFormatError('Error: start position is larger than the size of chromosome "%s" (%s > %s)' % \
-                                             (chr, start, GenomeInfo.getChrLen(self.genome, chr)))
+        if self.genome:
+            chrLen = GenomeInfo.getChrTable(self.genome).lookupChrLen(chr)
+            if chrLen is not None and start > chrLen:
+                raise InvalidFormatError('Error: start position is larger than the size of chromosome "%s" (%s > %s)' % \
+                                         (chr, start, chrLen))
         return start
 
     def _checkValidEnd(self, chr, end, start=None):
         if end < 0:
             raise InvalidFormatError('Error: end position is negative: %s' % end)
 
-        if self.genome and \
-            GenomeInfo.isValidChr(self.genome, chr) and \
-                end-1 > GenomeInfo.getChrLen(self.genome, chr):
-                    raise InvalidFormatError('Error: end position is larger than the size of chromosome "%s" (%s > %s)' % \
-                                             (chr, end-1, GenomeInfo.getChrLen(self.genome, chr)))
+        if self.genome:
+            chrLen = GenomeInfo.getChrTable(self.genome).lookupChrLen(chr)
+            if chrLen is not None and end-1 > chrLen:
+                raise InvalidFormatError('Error: end position is larger than the size of chromosome "%s" (%s > %s)' % \
+                                         (chr, end-1, chrLen))
         if start is not None and end <= start:
             if not start == end == 1:
                 raise InvalidFormatError('Error: end position (end-exclusive) is smaller than or equal to start position: %d <= %d' % (end, start))
@@ -286,7 +346,7 @@ class GenomeElementSource(object):
     def getPrefixList(self):
         if self._prefixList is None:
             ge, geIter = self.parseFirstDataLine()
-            self._prefixList = [prefix for prefix in ['start', 'end', 'val', 'strand', 'id', 'edges', 'weights'] if ge.__dict__.get(prefix) is not None]
+            self._prefixList = [prefix for prefix in ['start', 'end', 'val', 'strand', 'id', 'edges', 'weights'] if getattr(ge, prefix, None) is not None]
             if ge.extra is not None:
                 self._prefixList += [x for x in ge.orderedExtraKeys]
         return self._prefixList
@@ -323,6 +383,12 @@ def getGenomeElementSourceClass(fn, suffix=None, forPreProcessor=False):
             if (fn.endswith('.' + clsSuffix) if suffix is None else clsSuffix == suffix):
                 return geSourceCls
     else:
+        if suffix is None and os.path.isfile(fn):
+            from gtrackcore.input.core.GenomeElementSourceSniffer import sniffFileSuffix
+            sniffedSuffix = sniffFileSuffix(fn)
+            if sniffedSuffix is not None:
+                return getGenomeElementSourceClass(fn, suffix=sniffedSuffix, forPreProcessor=forPreProcessor)
+
         fileSuffix = os.path.splitext(fn)[1] if suffix is None else suffix
         raise NotSupportedError('File type ' + fileSuffix  + ' not supported.')
 
@@ -0,0 +1,173 @@
+import os
+import cPickle
+import numpy
+
+from gtrackcore.core.LogSetup import logMessage
+from gtrackcore.util.CustomExceptions import NotSupportedError, Warning
+
+INDEX_FILE_SUFFIX = 'gtcindex'
+
+def getIndexFileName(fn):
+    return fn + '.' + INDEX_FILE_SUFFIX
+
+class GenomeElementSourceIndex(object):
+    '''
+    Linear coordinate index for sorted, line-based text files, in the spirit
+    of the linear index of tabix. For each chromosome and each bin of BIN_SIZE
+    bps, the byte offset of the first data line overlapping the bin is stored.
+    A region query then seeks directly to the first possibly overlapping line
+    and reads only until the elements start after the region.
+
+    The index is stored next to the original file (as fn + '.gtcindex'), and
+    is rebuilt if the file, the GenomeElementSource class or its version have
+    changed since the index was created.
+    '''
+
+    _VERSION = '1.0'
+    BIN_SIZE = 2**14
+
+    def __init__(self, geSource):
+        self._geSource = geSource
+        self._fn = geSource.getFileName()
+        self._chrOffsets = None
+        self._chrEndOffsets = None
+
+    def getIndexFileName(self):
+        return getIndexFileName(self._fn)
+
+    def _getFingerprint(self):
+        stat = os.stat(self._fn)
+        return (self._VERSION, self.BIN_SIZE, self._geSource.__class__.__name__, \
+                self._geSource.getVersion(), stat.st_size, int(stat.st_mtime))
+
+    def isUpToDate(self):
+        return self._chrOffsets is not None or self._load()
+
+    def getIndex(self):
+        if not self.isUpToDate():
+            self.create()
+        return self
+
+    def _load(self):
+        indexFn = self.getIndexFileName()
+        if not os.path.exists(indexFn):
+            return False
+
+        try:
+            with open(indexFn, 'rb') as indexFile:
+                fingerprint, chrOffsets, chrEndOffsets = cPickle.load(indexFile)
+        except Exception, e:
+            logMessage("Unable to read index file '%s': %s" % (indexFn, e))
+            return False
+
+        if fingerprint != self._getFingerprint():
+            return False
+
+        self._chrOffsets, self._chrEndOffsets = chrOffsets, chrEndOffsets
+        return True
+
+    def _store(self):
+        indexFn = self.getIndexFileName()
+        try:
+            with open(indexFn, 'wb') as indexFile:
+                cPickle.dump((self._getFingerprint(), self._chrOffsets, self._chrEndOffsets), \
+                             indexFile, cPickle.HIGHEST_PROTOCOL)
+        except (IOError, OSError), e:
+            #The index is kept in memory if the directory of the original file is read-only
+            logMessage("Unable to store index file '%s': %s" % (indexFn, e))
+
+    def create(self):
+        if not self._geSource.isIndexable():
+            raise NotSupportedError('Coordinate indexing is not supported for file format: %s' % \
+                                    self._geSource.getFileFormatName())
+
+        chrBinOffsets = {}
+        chrEndOffsets = {}
+        prevChr, prevStart = None, None
+
+        geIter = self._geSource._getIterWithFile()
+        geIter._printWarnings = False
+        inFile = geIter._file
+
+        while True:
+            offset = inFile.tell()
+            line = inFile.readline()
+            if line == '':
+                break
+
+            lineStripped = line.rstrip('\r\n')
+            if lineStripped == '':
+                continue
+
+            try:
+                ge = geIter._next(lineStripped)
+            except Warning:
+                continue
+            except StopIteration:
+                break
+
+            if ge is None:
+                continue
+
+            chr, start = ge.chr, ge.start
+            end = ge.end if ge.end is not None else start + 1
+
+            if chr != prevChr:
+                if chr in chrBinOffsets:
+                    raise NotSupportedError('Error: unable to index file, as the data lines of chromosome '
+                                            '(sequence) %s are not grouped together.' % chr)
+                chrBinOffsets[chr] = []
+            elif start < prevStart:
+                raise NotSupportedError('Error: unable to index file, as the data lines are not sorted '
+                                        'by start position: %s < %s (chromosome %s).' % (start, prevStart, chr))
+
+            binOffsets = chrBinOffsets[chr]
+            lastBin = (max(start, end - 1)) / self.BIN_SIZE
+            if lastBin >= len(binOffsets):
+                binOffsets.extend([None] * (lastBin + 1 - len(binOffsets)))
+
+            for bin in xrange(start / self.BIN_SIZE, lastBin + 1):
+                if binOffsets[bin] is None:
+                    binOffsets[bin] = offset
+
+            chrEndOffsets[chr] = inFile.tell()
+            prevChr, prevStart = chr, start
+
+        inFile.close()
+
+        self._chrOffsets = {}
+        for chr, binOffsets in chrBinOffsets.iteritems():
+            #Bins without overlapping elements point to the next element (or the end of the chromosome)
+            nextOffset = chrEndOffsets[chr]
+            for bin in xrange(len(binOffsets)-1, -1, -1):
+                if binOffsets[bin] is None:
+                    binOffsets[bin] = nextOffset
+                else:
+                    nextOffset = binOffsets[bin]
+            self._chrOffsets[chr] = numpy.array(binOffsets, dtype='int64')
+
+        self._chrEndOffsets = chrEndOffsets
+        self._store()
+
+    def getChrs(self):
+        assert self.isUpToDate()
+        return self._chrOffsets.keys()
+
+    def getOffset(self, chr, start):
+        '''
+        Returns the byte offset of the first data line which may overlap a
+        region on chromosome chr starting at position start, or None if no
+        data lines of that chromosome may overlap the region.
+        '''
+        assert self.isUpToDate()
+
+        binOffsets = self._chrOffsets.get(chr)
+        if binOffsets is None:
+            return None
+
+        bin = max(0, start) / self.BIN_SIZE
+        if bin >= len(binOffsets):
+            return None
+
+        offset = int(binOffsets[bin])
+        return offset if offset < self._chrEndOffsets[chr] else None
@@ -0,0 +1,163 @@
+import re
+
+from collections import OrderedDict
+
+from gtrackcore.core.LogSetup import logException
+from gtrackcore.util.CommonConstants import RESERVED_PREFIXES
+from gtrackcore.util.CommonFunctions import flatten
+
+SAMPLE_SIZE = 1000
+SNIFF_LINE_COUNT = 50
+
+_INT_RE = re.compile('^[0-9]+$')
+_FLOAT_RE = re.compile('^[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?$|^[-+]?(nan|inf)$', re.IGNORECASE)
+
+def sniffFileSuffix(fn):
+    '''
+    Guesses the file format from the first lines of a file, for use when the
+    file suffix does not identify the format. Returns the (default) file
+    suffix of the format, or None if the format is not recognized.
+    '''
+    try:
+        with open(fn, 'rU') as inFile:
+            lines = [inFile.readline() for i in xrange(SNIFF_LINE_COUNT)]
+    except IOError:
+        return None
+
+    lines = [line.rstrip('\r\n') for line in lines if line.strip() != '']
+    dataLines = [line for line in lines if not line.startswith('#') and \
+                 not line.startswith('track') and not line.startswith('browser')]
+
+    if any(line.lower().startswith('##gtrack version') for line in lines) or \
+        any(line.startswith('###') for line in lines):
+        return 'gtrack'
+    if any(line.lower().startswith('##gff-version') for line in lines):
+        return 'gff'
+    if any(line.startswith('>') for line in dataLines[:1]):
+        return 'fa'
+    if any(line.startswith('fixedStep') or line.startswith('variableStep') for line in dataLines):
+        return 'wig'
+    if any(line.startswith('track') and 'type=bedGraph' in line for line in lines):
+        return 'bedgraph'
+
+    if len(dataLines) == 0:
+        return None
+
+    colsList = [line.split('\t') for line in dataLines]
+    if all(len(cols) == 9 and _INT_RE.match(cols[3]) and _INT_RE.match(cols[4]) and cols[6] in '+-.?' \
+           for cols in colsList):
+        return 'gff'
+    if all(len(cols) >= 3 and _INT_RE.match(cols[1]) and _INT_RE.match(cols[2]) for cols in colsList):
+        if all(len(cols) == 4 and _FLOAT_RE.match(cols[3]) for cols in colsList):
+            return 'bedgraph'
+        return 'bed'
+    return None
+
+
+class GenomeElementSourceSniffer(object):
+    '''
+    Parses a bounded sample of the elements of a GenomeElementSource in order
+    to find the prefix list, the value and edge weight types and dimensions and
+    the maximal string lengths, without a full pass over the data. If the
+    sample covers all elements of the source (see isExhaustive()), the sample
+    statistics are exact. Otherwise, they are a lower bound that must be
+    confirmed (or widened) while writing the elements.
+    '''
+
+    def __init__(self, geSource, sampleSize=SAMPLE_SIZE):
+        self._geSource = geSource
+        self._sampleSize = sampleSize
+
+        self._sample = None
+        self._isExhaustive = False
+        self._valDim = None
+        self._edgeWeightDim = None
+
+    def _sniff(self):
+        if self._sample is not None:
+            return
+
+        self._sample = []
+        prevPrintWarnings = self._geSource.getPrintWarnings()
+        self._geSource.setPrintWarnings(False)
+
+        try:
+            geIter = self._geSource.__iter__()
+            try:
+                for i in xrange(self._sampleSize + 1):
+                    self._sample.append(geIter.next().getCopy())
+            except StopIteration:
+                self._isExhaustive = True
+            else:
+                self._sample.pop()
+
+            self._valDim = geIter.getValDim()
+            self._edgeWeightDim = geIter.getEdgeWeightDim()
+        except Exception, e:
+            # Any errors in the sampled part of the data are raised again,
+            # with line information, during the full pass.
+            logException(e)
+            self._isExhaustive = False
+        finally:
+            self._geSource.setPrintWarnings(prevPrintWarnings)
+
+    def isExhaustive(self):
+        self._sniff()
+        return self._isExhaustive
+
+    def getSample(self):
+        self._sniff()
+        return self._sample
+
+    def getPrefixList(self):
+        return self._geSource.getPrefixList()
+
+    def getValDataType(self):
+        return self._geSource.getValDataType()
+
+    def getEdgeWeightDataType(self):
+        return self._geSource.getEdgeWeightDataType()
+
+    def getValDim(self):
+        valDim = self._geSource.getValDim()
+        if valDim is None:
+            self._sniff()
+            valDim = self._valDim
+        return valDim
+
+    def getEdgeWeightDim(self):
+        edgeWeightDim = self._geSource.getEdgeWeightDim()
+        if edgeWeightDim is None:
+            self._sniff()
+            edgeWeightDim = self._edgeWeightDim
+        return edgeWeightDim
+
+    def getMaxStrLens(self):
+        maxStrLens = OrderedDict([(prefix, 1) for prefix in getStrPrefixes(self._geSource)])
+        if self._geSource.isSliceSource():
+            return maxStrLens
+
+        for ge in self.getSample():
+            if ge.isBlankElement:
+                continue
+
+            for prefix in maxStrLens:
+                content = getattr(ge, prefix, None)
+                if content is not None:
+                    maxStrLens[prefix] = max(maxStrLens[prefix], getStrLen(content))
+        return maxStrLens
+
+def getStrPrefixes(geSource):
+    'Returns the prefixes of the geSource that are stored as string arrays.'
+    prefixList = geSource.getPrefixList()
+    prefixSet = set(prefixList)
+    return (['val'] if 'val' in prefixSet and geSource.getValDataType() == 'S' else []) + \
+           (['id'] if 'id' in prefixSet else []) + \
+           (['edges'] if 'edges' in prefixSet else []) + \
+           (['weights'] if 'weights' in prefixSet and geSource.getEdgeWeightDataType() == 'S' else []) + \
+           [x for x in prefixList if x not in RESERVED_PREFIXES]
+
+def getStrLen(content):
+    if isinstance(content, basestring):
+        return len(content)
+    return max([0] + [len(x) for x in flatten(content)])
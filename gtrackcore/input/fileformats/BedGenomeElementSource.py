@@ -1,7 +1,7 @@
 import numpy
 
 from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
-from gtrackcore.input.core.GenomeElement import GenomeElement
+from gtrackcore.input.core.CompactGenomeElement import CompactGenomeElement
 from gtrackcore.util.CustomExceptions import InvalidFormatError
 
 class BedGenomeElementSource(GenomeElementSource):
@@ -9,6 +9,7 @@ class BedGenomeElementSource(GenomeElementSource):
     FILE_SUFFIXES = ['bed']
     FILE_FORMAT_NAME = 'BED'
     _numHeaderLines = 0
+    _isIndexable = True
 
     MIN_NUM_COLS = 3
     MAX_NUM_COLS = 12
@@ -31,7 +32,7 @@ class BedGenomeElementSource(GenomeElementSource):
         if line.startswith('#'):
             return
 
-        ge = GenomeElement(self._genome)
+        ge = CompactGenomeElement(self._genome, schema=self._geSchema)
         cols = line.split('\t')
 
         if self._numCols is not None:
@@ -1,6 +1,6 @@
 import numpy
 
-from gtrackcore.input.core.GenomeElement import GenomeElement
+from gtrackcore.input.core.CompactGenomeElement import CompactGenomeElement
 from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
 from gtrackcore.util.CommonConstants import BINARY_MISSING_VAL
 from gtrackcore.util.CustomExceptions import InvalidFormatError
@@ -11,6 +11,7 @@ class BedGraphGenomeElementSource(GenomeElementSource):
     FILE_FORMAT_NAME = 'bedGraph'
 
     _numHeaderLines = 0
+    _isIndexable = True
         
     def __new__(cls, *args, **kwArgs):
         return object.__new__(cls)
@@ -35,7 +36,7 @@ class BedGraphGenomeElementSource(GenomeElementSource):
     def _next(self, line):
         cols = line.split('\t')
         
-        ge = GenomeElement(self._genome)
+        ge = CompactGenomeElement(self._genome, schema=self._geSchema)
         ge.chr = self._checkValidChr(cols[0])
         ge.start = int(cols[1])
         ge.end = int(cols[2])
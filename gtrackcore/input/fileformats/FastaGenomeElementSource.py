@@ -21,6 +21,14 @@ class FastaGenomeElementSource(GenomeElementSource):
         GenomeElementSource.__init__(self, *args, **kwArgs)
         self._boundingRegionTuples = []
         self._chr = None
+        self._fileOffset = kwArgs.get('fileOffset', 0)
+
+    def _getFileNoHeaders(self):
+        #fileOffset is used for FASTA sections embedded in other files, e.g. GFF3
+        file = GenomeElementSource._getFileNoHeaders(self)
+        if self._fileOffset:
+            file.seek(self._fileOffset)
+        return file
 
     def _iter(self):
         self._elCount = 0
@@ -1,8 +1,12 @@
 import numpy
+import re
 from urllib import unquote
 
-from gtrackcore.input.core.GenomeElement import GenomeElement
+from gtrackcore.input.core.CompactGenomeElement import CompactGenomeElement
 from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
+from gtrackcore.metadata.ChrTable import ChrTable
+from gtrackcore.metadata.GenomeInfo import GenomeInfo
+from gtrackcore.util.CommonConstants import BINARY_MISSING_VAL
 from gtrackcore.util.CustomExceptions import InvalidFormatError
 
 class GffGenomeElementSource(GenomeElementSource):
@@ -13,10 +17,157 @@ class GffGenomeElementSource(GenomeElementSource):
 
     _inputIsOneIndexed = True
     _inputIsEndInclusive = True
+    _isIndexable = True
+
+    MIN_BATCH_SIZE = 64
+    MAX_BATCH_SIZE = 8192
 
     def __new__(cls, *args, **kwArgs):
         return object.__new__(cls)
 
+    def _iter(self):
+        self._geBatch = []
+        self._geBatchIndex = 0
+        self._batchSize = self.MIN_BATCH_SIZE
+        self._reachedEndOfData = False
+        return self
+
+    def next(self):
+        while self._geBatchIndex >= len(self._geBatch):
+            if self._reachedEndOfData:
+                raise StopIteration
+            self._geBatch = self._parseBatch(self._readBatch())
+            self._geBatchIndex = 0
+
+        self._genomeElement = self._geBatch[self._geBatchIndex]
+        self._geBatchIndex += 1
+        return self._genomeElement
+
+    def _readBatch(self):
+        lines = []
+        readline = self._file.readline
+        for i in xrange(self._batchSize):
+            line = readline()
+            if line == '' or line.startswith('##FASTA'):
+                self._reachedEndOfData = True
+                break
+            lines.append(line)
+
+        #The batch size grows gradually, in order to keep region queries cheap
+        self._batchSize = min(2 * self._batchSize, self.MAX_BATCH_SIZE)
+        return lines
+
+    def _parseBatch(self, lines):
+        dataLines = [line.rstrip('\r\n') for line in lines if line[0] != '#']
+        dataLines = [line for line in dataLines if line != '']
+        if len(dataLines) == 0:
+            return []
+
+        #Lines that cannot be parsed column-wise are parsed by _parseLine(), so that any
+        #problems are reported in the same way as for line-by-line parsing, including
+        #warnings for skipped lines.
+        geList = self._parseDataLines(dataLines)
+        parseLine = self._parseLine
+        return [ge for ge in (ge if ge is not None else parseLine(line) for line, ge in zip(dataLines, geList)) \
+                if ge is not None]
+
+    def _parseDataLines(self, dataLines):
+        '''
+        Returns the genome element of each line, or None for lines that need to
+        be parsed line by line. If column-wise parsing fails, the lines are split
+        in halves until the failing lines are found, so that at most
+        MIN_BATCH_SIZE lines around each of them are parsed line by line.
+        '''
+        try:
+            return self._parseDataLinesAsColumns(dataLines)
+        except Exception:
+            if len(dataLines) <= self.MIN_BATCH_SIZE:
+                return [None] * len(dataLines)
+            mid = len(dataLines) // 2
+            return self._parseDataLines(dataLines[:mid]) + self._parseDataLines(dataLines[mid:])
+
+    def _parseDataLinesAsColumns(self, dataLines):
+        origRows = [line.split('\t') for line in dataLines]
+        if any(len(cols) != 9 for cols in origRows):
+            raise InvalidFormatError("Error: GFF files must contain 9 tab-separated columns")
+
+        if any('%' in line for line in dataLines):
+            rows = [[unquote(x) for x in cols] if '%' in line else cols for line, cols in zip(dataLines, origRows)]
+        else:
+            rows = origRows
+
+        chrs, sources, types, startStrs, endStrs, scores, strands, phases, attributes = zip(*rows)
+        starts = numpy.array(startStrs).astype('int64') - 1
+        ends = numpy.array(endStrs).astype('int64')
+
+        chrTable = GenomeInfo.getChrTable(self.genome) if self.genome else ChrTable(None, [], [])
+        #Lines with chromosomes that are not part of the genome are left to _parseLine(), which skips them
+        validChrs = chrTable.checkValidCoords(chrs, starts, ends)
+        if not self.genome:
+            validChrs = numpy.ones(len(rows), dtype=bool)
+
+        vals, middleExtraCols = self._parseThirdAndSixthCols(types, scores)
+        extraKeys = ['source'] + [key for key, col in middleExtraCols] + ['phase', 'attributes']
+        extraCols = [sources] + [col for key, col in middleExtraCols] + [phases, attributes]
+
+        schema = self._geSchema
+        if [schema.getKeyIndex(key) for key in extraKeys] != range(len(extraKeys)):
+            raise InvalidFormatError('Extra columns do not match the order of the element schema')
+
+        #ID and Name are only extracted if they may be part of the prefix list, which consumers
+        #(e.g. preprocessing and composers) use to select the columns they read
+        origAttributes = [cols[8] for cols in origRows]
+        prefixList = self._prefixList
+        ids = self._findAttributeValues(origAttributes, self._ID_ATTR_RE) \
+            if prefixList is None or 'id' in prefixList else [None] * len(rows)
+        names = self._findAttributeValues(origAttributes, self._NAME_ATTR_RE) \
+            if prefixList is None or 'name' in prefixList else [None] * len(rows)
+
+        strandDict = {}
+        geList = []
+        genome = self._genome
+        createGe = CompactGenomeElement.createFromExtraVals
+        for i, chr, start, end, val, strandStr, id, extraVals in \
+                zip(xrange(len(rows)), chrs, starts.tolist(), ends.tolist(), vals, strands, ids, zip(*extraCols)):
+            if not validChrs[i]:
+                geList.append(None)
+                continue
+            if strandStr not in strandDict:
+                strandDict[strandStr] = self._getStrandFromString(strandStr)
+            ge = createGe(schema, list(extraVals), genome, chr, start, end, val, strandDict[strandStr], id)
+            if names[i] is not None:
+                ge.name = names[i]
+            geList.append(ge)
+
+        return geList
+
+    def _parseThirdAndSixthCols(self, types, scores):
+        'Columnar version of _parseThirdCol and _parseSixthCol. Returns the values and a list of (key, column) for extra columns.'
+        return [numpy.float(self._handleNan(score)) for score in scores], [('type', types)]
+
+    _ID_ATTR_RE = re.compile(r'(?:^|;)[Ii][Dd]=([^;=\n]*)(?=;|$)', re.M)
+    _NAME_ATTR_RE = re.compile(r'(?:^|;)[Nn][Aa][Mm][Ee]=([^;=\n]*)(?=;|$)', re.M)
+
+    @staticmethod
+    def _findAttributeValues(origAttributes, attrRe):
+        '''
+        Vectorized version of the id/name part of _parseIdAndName. The attribute
+        column of all lines is searched in one pass, and the matches are mapped
+        back to lines by their positions. As in _parseIdAndName, the last match
+        in a line is used.
+        '''
+        values = [None] * len(origAttributes)
+        joined = '\n'.join(origAttributes)
+        matches = [(m.start(1), m.group(1)) for m in attrRe.finditer(joined)]
+        if len(matches) == 0:
+            return values
+
+        lineStarts = numpy.cumsum([0] + [len(x) + 1 for x in origAttributes[:-1]])
+        lineIdxs = numpy.searchsorted(lineStarts, [pos for pos, val in matches], side='right') - 1
+        for lineIdx, (pos, val) in zip(lineIdxs.tolist(), matches):
+            values[lineIdx] = unquote(val) if '%' in val else val
+        return values
+
     def _next(self, line):
         if line.startswith('##FASTA'):
             raise StopIteration
@@ -30,7 +181,7 @@ class GffGenomeElementSource(GenomeElementSource):
         if len(cols) != 9:
             raise InvalidFormatError("Error: GFF files must contain 9 tab-separated columns")
 
-        ge = GenomeElement(self._genome)
+        ge = CompactGenomeElement(self._genome, schema=self._geSchema)
         ge.chr = self._checkValidChr(cols[0])
         ge.source = cols[1]
 
@@ -45,7 +196,12 @@ class GffGenomeElementSource(GenomeElementSource):
         ge.phase = cols[7]
         ge.attributes = cols[8]
 
-        for attr in origCols[8].split(';'):
+        self._parseIdAndName(ge, origCols[8])
+
+        return ge
+
+    def _parseIdAndName(self, ge, origAttributes):
+        for attr in origAttributes.split(';'):
             attrSplitted = attr.split('=')
             if len(attrSplitted) == 2:
                 key, val = attrSplitted
@@ -54,7 +210,25 @@ class GffGenomeElementSource(GenomeElementSource):
                 elif key.lower() == 'name':
                     ge.name = unquote(val)
 
-        return ge
+    def getFastaGenomeElementSource(self):
+        'Returns a FastaGenomeElementSource for the trailing ##FASTA section of the file, or None if there is none.'
+        from gtrackcore.input.fileformats.FastaGenomeElementSource import FastaGenomeElementSource
+
+        gffFile = self._getFile()
+        try:
+            while True:
+                line = gffFile.readline()
+                if line == '':
+                    return None
+                if line.startswith('##FASTA'):
+                    fastaOffset = gffFile.tell()
+                    break
+        finally:
+            gffFile.close()
+
+        return FastaGenomeElementSource(self._fn, genome=self._genome, trackName=self._trackName, \
+                                        external=self._external, printWarnings=self._printWarnings, \
+                                        strToUseInsteadOfFn=self._strToUseInsteadOfFn, fileOffset=fastaOffset)
 
     def _parseThirdCol(self, ge, contents):
         ge.type = contents
@@ -79,5 +253,8 @@ class GffCategoryGenomeElementSource(GffGenomeElementSource):
     def _parseSixthCol(self, ge, contents):
         ge.score = self._handleNan(contents)
 
+    def _parseThirdAndSixthCols(self, types, scores):
+        return types, [('score', [self._handleNan(score) for score in scores])]
+
     def getValDataType(self):
         return 'S'
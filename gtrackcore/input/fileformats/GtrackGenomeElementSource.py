@@ -99,6 +99,7 @@ class GtrackGenomeElementSource(GenomeElementSource):
 
     ALLOWED_CHARS = set([chr(x) for x in xrange(128) if x not in set(range(9)+[11,12]+range(14,32)+[127])])
     _RETURN_NUMPY_TYPES = False
+    _LOCAL_SUBTYPE_CONTENTS = {}
 
     _addsStartElementToDenseIntervals = False
 
@@ -388,10 +389,13 @@ class GtrackGenomeElementSource(GenomeElementSource):
     def _downloadSubtypeFileContents(cls, url):
         try:
             if url.startswith('http://gtrack.no/'):
-                import pkg_resources
-                path = pkg_resources.resource_filename('gtrackcore', 'data')
-                fn = os.sep.join([path, 'gtrack', url[17:]])
-                return open(fn).read()
+                #The subtypes distributed with gtrackcore are read only once
+                if url not in cls._LOCAL_SUBTYPE_CONTENTS:
+                    import pkg_resources
+                    path = pkg_resources.resource_filename('gtrackcore', 'data')
+                    fn = os.sep.join([path, 'gtrack', url[17:]])
+                    cls._LOCAL_SUBTYPE_CONTENTS[url] = open(fn).read()
+                return cls._LOCAL_SUBTYPE_CONTENTS[url]
             else:
                 return urllib2.urlopen(url).read()
         except Exception, e:
@@ -482,11 +486,12 @@ class GtrackGenomeElementSource(GenomeElementSource):
         else:
             return True
 
-    def compliesWithSubtype(self, url):
+    def compliesWithSubtype(self, url, checkFirstDataLine=True):
         try:
             self._headerDict['subtype url'] = url
             self._updateHeadersAccordingToSubtype(overrideDefaults=False)
-            self.getPrefixList()
+            if checkFirstDataLine:
+                self.getPrefixList()
             result = True
         except Exception, e:
             #logException(e)
@@ -1,31 +1,150 @@
-from gtrackcore.metadata.GenomeInfo import GenomeInfo 
+import numpy
+
+from bisect import bisect_right
+
+from gtrackcore.metadata.GenomeInfo import GenomeInfo
 from gtrackcore.track.core.GenomeRegion import GenomeRegion
 
+class ChrBins(object):
+    '''
+    Consecutive bins of the same chromosome, stored as arrays of bin starts
+    and ends. GenomeRegion objects are created only when indexing or
+    iterating.
+    '''
+
+    def __init__(self, genome, chr, starts, ends):
+        self.genome = genome
+        self.chr = chr
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ChrBins(self.genome, self.chr, self.starts[index], self.ends[index])
+        return GenomeRegion(self.genome, self.chr, int(self.starts[index]), int(self.ends[index]))
+
+    def __iter__(self):
+        genome, chr = self.genome, self.chr
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            yield GenomeRegion(genome, chr, start, end)
+
+
+class BinSet(object):
+    '''
+    Array-backed list of bins, consisting of a list of ChrBins objects.
+    Supports len() and slicing without creating GenomeRegion objects.
+    '''
+
+    def __init__(self, chrBinsList):
+        self._chrBinsList = [chrBins for chrBins in chrBinsList if len(chrBins) > 0]
+        self._offsets = numpy.cumsum([0] + [len(chrBins) for chrBins in self._chrBinsList]).tolist()
+
+    def getChrBinsList(self):
+        return self._chrBinsList
+
+    def __len__(self):
+        return self._offsets[-1]
+
+    def __iter__(self):
+        for chrBins in self._chrBinsList:
+            for bin in chrBins:
+                yield bin
+
+    def _getLocalIndex(self, index):
+        chrBinsIndex = bisect_right(self._offsets, index) - 1
+        return chrBinsIndex, index - self._offsets[chrBinsIndex]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            assert step == 1, 'Only contiguous slices of bins are supported'
+            if start >= stop:
+                return BinSet([])
+
+            firstIdx, firstLocal = self._getLocalIndex(start)
+            lastIdx, lastLocal = self._getLocalIndex(stop - 1)
+            if firstIdx == lastIdx:
+                return BinSet([self._chrBinsList[firstIdx][firstLocal:lastLocal + 1]])
+            return BinSet([self._chrBinsList[firstIdx][firstLocal:]] + \
+                          self._chrBinsList[firstIdx + 1:lastIdx] + \
+                          [self._chrBinsList[lastIdx][:lastLocal + 1]])
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Bin index out of range: %s' % index)
+
+        chrBinsIndex, localIndex = self._getLocalIndex(index)
+        return self._chrBinsList[chrBinsIndex][localIndex]
+
+
 class AutoBinner(object):
     def __init__(self, userBinSource, binLen, genome=None):
         #binLen of -1 gives whole chromosomes as bins
         self.genome = userBinSource.genome if hasattr(userBinSource, 'genome') else genome
-        
+
         self._userBinSource = userBinSource
         self._binLen = binLen
+        self._binSet = None
 
     def __iter__(self):
         return self.nextBin()
-    
+
     def nextBin(self):
+        return self.getBinSet().__iter__()
+
+    def getBinSet(self):
+        if self._binSet is None:
+            self._binSet = BinSet(self._createChrBins())
+        return self._binSet
+
+    def _createChrBins(self):
+        # Bins of consecutive regions from the same chromosome are collected
+        # in the same ChrBins object
+        curKey = None
+        starts = []
+        ends = []
         for region in self._userBinSource:
-            start = region.start if region.start is not None else 0
+            key = (region.genome, region.chr)
+            if key != curKey:
+                if curKey is not None:
+                    yield self._concatenateChrBins(curKey, starts, ends)
+                curKey = key
+                starts = []
+                ends = []
 
-            chrLen = GenomeInfo.getChrLen(region.genome, region.chr) if region.genome is not None else None
-            regEnd = min([x for x in [region.end, chrLen] if x is not None])
-            
+            regStart, regEnd = self._getRegionBounds(region)
             if self._binLen is None:
-                yield GenomeRegion(region.genome, region.chr, start, regEnd)
-            else:
-                while start < regEnd:
-                    end = min(start + self._binLen, regEnd)
-                    yield GenomeRegion(region.genome, region.chr, start, end)
-                    start += self._binLen
+                starts.append(regStart)
+                ends.append(regEnd)
+            elif regStart < regEnd:
+                binStarts = numpy.arange(regStart, regEnd, self._binLen, dtype='int64')
+                starts.append(binStarts)
+                ends.append(numpy.minimum(binStarts + self._binLen, regEnd))
+
+        if curKey is not None:
+            yield self._concatenateChrBins(curKey, starts, ends)
+
+    @staticmethod
+    def _getRegionBounds(region):
+        start = region.start if region.start is not None else 0
+
+        chrLen = GenomeInfo.getChrTable(region.genome).getChrLen(region.chr) if region.genome is not None else None
+        regEnd = min([x for x in [region.end, chrLen] if x is not None])
+        return start, regEnd
+
+    @staticmethod
+    def _concatenateChrBins(key, starts, ends):
+        genome, chr = key
+        if len(starts) > 0 and isinstance(starts[0], numpy.ndarray):
+            return ChrBins(genome, chr, numpy.concatenate(starts), numpy.concatenate(ends))
+        return ChrBins(genome, chr, numpy.array(starts, dtype='int64'), numpy.array(ends, dtype='int64'))
 
     def __len__(self):
-        return sum(1 for bin in self)        
\ No newline at end of file
+        return len(self.getBinSet())
+
+    def __getitem__(self, index):
+        return self.getBinSet()[index]
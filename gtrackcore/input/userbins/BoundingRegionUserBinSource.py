@@ -1,4 +1,7 @@
 import numpy
+import os
+
+from collections import OrderedDict
 
 from gtrackcore.metadata.GenomeInfo import GenomeInfo
 from gtrackcore.track.hierarchy.ExternalTrackManager import ExternalTrackManager
@@ -7,7 +10,36 @@ from gtrackcore.track.memmap.BoundingRegionShelve import BoundingRegionShelve
 from gtrackcore.util.CustomExceptions import BoundingRegionsNotAvailableError
 from gtrackcore.util.CommonFunctions import prettyPrintTrackName
 
+def getIntersectingRegionArrays(starts1, ends1, starts2, ends2):
+    '''
+    Sweep-line intersection of two sorted lists of non-overlapping regions,
+    given as arrays of starts and ends. For each region in the first list, the
+    range of overlapping regions in the second list is found by searchsorted.
+    Returns the arrays of starts and ends of the non-empty intersections.
+    '''
+    firstIdxs2 = numpy.searchsorted(ends2, starts1, side='right')
+    lastIdxs2 = numpy.searchsorted(starts2, ends1, side='left')
+    numOverlaps = numpy.maximum(lastIdxs2 - firstIdxs2, 0)
+
+    idxs1 = numpy.repeat(numpy.arange(len(starts1)), numOverlaps)
+    idxs2 = numpy.arange(numOverlaps.sum()) - numpy.repeat(numpy.cumsum(numOverlaps) - numOverlaps, numOverlaps) + \
+            numpy.repeat(firstIdxs2, numOverlaps)
+
+    intersectStarts = numpy.maximum(starts1[idxs1], starts2[idxs2])
+    intersectEnds = numpy.minimum(ends1[idxs1], ends2[idxs2])
+    nonEmpty = intersectStarts < intersectEnds
+    return intersectStarts[nonEmpty], intersectEnds[nonEmpty]
+
 class BoundingRegionUserBinSource(object):
+    '''
+    The bounding regions of one track, or the intersection of the bounding
+    regions of two tracks. The regions are computed as arrays per chromosome
+    and cached per genome and track pair, for the MAX_CACHED_REGION_ARRAYS
+    most recently used pairs.
+    '''
+    MAX_CACHED_REGION_ARRAYS = 16
+    _regionArraysCache = OrderedDict()
+    
     def __init__(self, genome, trackName1, trackName2=None):
         assert trackName1 is not None
         assert genome is not None
@@ -31,73 +63,84 @@ class BoundingRegionUserBinSource(object):
         return brShelve
         
     def __iter__(self):
+        for chr, starts, ends in self._getRegionArrays():
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                yield GenomeRegion(self.genome, chr, start, end)
+    
+    def _getCacheKey(self, brShelve1, brShelve2):
+        return (self.genome,) + tuple(((tuple(trackName), os.path.getmtime(brShelve.getFileName())) \
+                                       if brShelve is not None else None) \
+                                      for trackName, brShelve in [(self._trackName1, brShelve1), \
+                                                                  (self._trackName2, brShelve2)])
+    
+    def _getRegionArrays(self):
         brShelve1 = self._getBoundingRegionShelve(self._trackName1)
         brShelve2 = self._getBoundingRegionShelve(self._trackName2)
         
-        allBrsAreWholeChrs1 = self._commonAllBoundingRegionsAreWholeChr(brShelve1) \
-            if brShelve1 is not None else False
-        allBrsAreWholeChrs2 = self._commonAllBoundingRegionsAreWholeChr(brShelve2) \
-            if brShelve2 is not None else False
-
-        for chr in GenomeInfo.getExtendedChrList(self.genome):
-            if brShelve1 is None:
-                yield GenomeRegion(self.genome, chr, 0, GenomeInfo.getChrLen(self.genome, chr))
-            else:
-                brList1 = brShelve1.getAllBoundingRegionsForChr(chr)
-
-                if brShelve2 is None or \
-                    (allBrsAreWholeChrs2 and not allBrsAreWholeChrs1):
-                    for reg in brList1:
-                        yield reg
-                else:
-                    brList2 = brShelve2.getAllBoundingRegionsForChr(chr)
-                    if allBrsAreWholeChrs1 and not allBrsAreWholeChrs2:
-                        for reg in brList2:
-                            yield reg
-                    else:
-                        for reg in self.getAllIntersectingRegions(self.genome, chr, brList1, brList2):
-                            yield reg
+        cache = self._regionArraysCache
+        cacheKey = self._getCacheKey(brShelve1, brShelve2)
+        if cacheKey in cache:
+            regionArrays = cache.pop(cacheKey)
+        else:
+            regionArrays = self._calcRegionArrays(brShelve1, brShelve2)
+            while len(cache) >= self.MAX_CACHED_REGION_ARRAYS:
+                cache.popitem(last=False)
+        cache[cacheKey] = regionArrays
+        return regionArrays
     
     @classmethod
-    def getAllIntersectingRegions(cls, genome, chr, regList1, regList2):
-        regTuples1 = [(reg.start, reg.end) for reg in regList1]
-        regTuples2 = [(reg.start, reg.end) for reg in regList2]
+    def clearRegionArraysCache(cls):
+        cls._regionArraysCache.clear()
+    
+    def _calcRegionArrays(self, brShelve1, brShelve2):
+        chrList = GenomeInfo.getExtendedChrList(self.genome)
+        chrTable = GenomeInfo.getChrTable(self.genome)
         
-        if len(regTuples1) == 0 or len(regTuples2) == 0:
-            return []
+        if brShelve1 is None:
+            return [(chr, numpy.array([0]), numpy.array([chrTable.getChrLen(chr)])) for chr in chrList]
         
-        starts1, ends1 = zip(*regTuples1)
-        starts2, ends2 = zip(*regTuples2)
-        starts = starts1 + starts2
-        ends = ends1 + ends2
+        brArrays1 = [brShelve1.getBoundingRegionArraysForChr(chr) for chr in chrList]
+        if brShelve2 is None:
+            return [(chr, starts, ends) for chr, (starts, ends) in zip(chrList, brArrays1)]
         
-        borderArray = numpy.array(ends + starts)
-        intersectionArray = numpy.array([-1 for e in ends] + [1 for s in starts])
+        brArrays2 = [brShelve2.getBoundingRegionArraysForChr(chr) for chr in chrList]
+        allBrsAreWholeChrs1 = self._allAreWholeChrs(chrList, brArrays1)
+        allBrsAreWholeChrs2 = self._allAreWholeChrs(chrList, brArrays2)
         
-        del regTuples1, regTuples2, starts1, starts2, starts, ends1, ends2, ends
-        # Use merge sort, as it is stable
-        sortedIndex = borderArray.argsort(kind='merge')
-        borderArray = borderArray[sortedIndex]
-        intersectionArray = intersectionArray[sortedIndex]
+        if allBrsAreWholeChrs2 and not allBrsAreWholeChrs1:
+            return [(chr, starts, ends) for chr, (starts, ends) in zip(chrList, brArrays1)]
+        if allBrsAreWholeChrs1 and not allBrsAreWholeChrs2:
+            return [(chr, starts, ends) for chr, (starts, ends) in zip(chrList, brArrays2)]
         
-        intersectStartIndex = numpy.add.accumulate(intersectionArray) == 2
-        intersectStarts = borderArray[intersectStartIndex]
-        intersectEnds = borderArray[1:][intersectStartIndex[:-1]]
+        return [(chr,) + getIntersectingRegionArrays(starts1, ends1, starts2, ends2) \
+                for chr, (starts1, ends1), (starts2, ends2) in zip(chrList, brArrays1, brArrays2)]
+    
+    def _allAreWholeChrs(self, chrList, brArrays):
+        chrTable = GenomeInfo.getChrTable(self.genome)
+        return all(((starts == 0) & (ends == chrTable.getChrLen(chr))).all() \
+                   for chr, (starts, ends) in zip(chrList, brArrays))
+    
+    @classmethod
+    def getAllIntersectingRegions(cls, genome, chr, regList1, regList2):
+        starts1, ends1 = cls._getRegionArraysFromList(regList1)
+        starts2, ends2 = cls._getRegionArraysFromList(regList2)
         
-        assert len(intersectStarts) == len(intersectEnds)
+        intersectStarts, intersectEnds = getIntersectingRegionArrays(starts1, ends1, starts2, ends2)
         return [GenomeRegion(genome, chr, start, end) \
-                for start, end in zip(intersectStarts, intersectEnds)]
+                for start, end in zip(intersectStarts.tolist(), intersectEnds.tolist())]
     
-    def  __len__(self):
-        return sum(1 for i in self)
+    @staticmethod
+    def _getRegionArraysFromList(regList):
+        regTuples = [(reg.start, reg.end) for reg in regList]
+        return numpy.array([start for start, end in regTuples], dtype='int64'), \
+               numpy.array([end for start, end in regTuples], dtype='int64')
     
-    def _commonAllBoundingRegionsAreWholeChr(self, brShelve):
-        for chr in GenomeInfo.getExtendedChrList(self.genome):
-            for reg in brShelve.getAllBoundingRegionsForChr(chr):
-                if not reg.isWholeChr():
-                    return False
-        return True
+    def  __len__(self):
+        return sum(len(starts) for chr, starts, ends in self._getRegionArrays())
     
     def allBoundingRegionsAreWholeChr(self):
-        return all(self._commonAllBoundingRegionsAreWholeChr(x) for x in 
-                   [self._brShelve1] + ([self._brShelve2] if self._brShelve2 is not None else []))
+        brShelve1 = self._getBoundingRegionShelve(self._trackName1)
+        brShelve2 = self._getBoundingRegionShelve(self._trackName2)
+        chrList = GenomeInfo.getExtendedChrList(self.genome)
+        return all(self._allAreWholeChrs(chrList, [brShelve.getBoundingRegionArraysForChr(chr) for chr in chrList]) \
+                   for brShelve in [brShelve1, brShelve2] if brShelve is not None)
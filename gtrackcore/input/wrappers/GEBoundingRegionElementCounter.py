@@ -1,57 +1,112 @@
+import numpy
+
+from array import array
+from collections import OrderedDict
+
 from gtrackcore.input.wrappers.GESourceWrapper import GESourceWrapper
 from gtrackcore.util.CustomExceptions import ShouldNotOccurError
 
-class GEBoundingRegionElementCounter(GESourceWrapper):    
+def countElementsInRegions(brStarts, brEnds, starts=None, ends=None, numElements=0):
+    '''
+    Returns the number of elements contained in each of the bounding regions
+    of a chromosome, given as sorted, non-overlapping arrays of starts and ends.
+    The elements are found using searchsorted on the element starts (or ends,
+    if the elements have no starts). Elements without coordinates are all
+    counted in the first bounding region.
+    '''
+    numBrs = len(brStarts)
+    if starts is not None:
+        idxs = numpy.searchsorted(brStarts, starts, side='right') - 1
+    elif ends is not None:
+        idxs = numpy.searchsorted(brEnds, ends, side='left')
+    else:
+        return numpy.array([numElements] + [0] * (numBrs - 1), dtype='int64')
+
+    validIdxs = numpy.clip(idxs, 0, numBrs - 1)
+    contained = (idxs >= 0) & (idxs < numBrs)
+    if starts is not None:
+        contained &= starts >= brStarts[validIdxs]
+    if ends is not None:
+        contained &= ends <= brEnds[validIdxs]
+    if not contained.all():
+        raise ShouldNotOccurError('Element is not contained in any of the bounding regions')
+
+    return numpy.bincount(idxs, minlength=numBrs)
+
+
+class GEBoundingRegionElementCounter(GESourceWrapper):
+    '''
+    Counts the number of elements in each of the bounding regions. While
+    iterating, the element starts and ends are only collected, per
+    consecutive chromosome. The elements are assigned to the bounding regions
+    in a vectorized way when the iteration is finished.
+    '''
+
     def __init__(self, geSource, boundingRegionTuples):
         GESourceWrapper.__init__(self, geSource)
         self._brTuples = boundingRegionTuples
         self._finishedCounting = False
-    
+
     def __iter__(self):
         if len(self._brTuples) == 0:
             self._finishedCounting = True
             return self._geSource.__iter__()
         else:
+            prefixList = self._geSource.getPrefixList()
+            self._hasStart = 'start' in prefixList
+            self._hasEnd = 'end' in prefixList
+
             self._geIter = self._geSource.__iter__()
-            self._brIter = self._brTuples.__iter__()
-            self._brTuples = []
+            self._chrGroups = []
+            self._curGenome = self._curChr = self._curStarts = self._curEnds = None
             self._finishedCounting = False
             return self
-    
+
     def next(self):
         try:
             el = self._geIter.next()
-            
-            while len(self._brTuples) == 0 or not self._contains(self._brTuples[-1].region, el):
-                try:
-                    self._getNextBrTuple()
-                except StopIteration:
-                    raise ShouldNotOccurError
-            
-            self._brTuples[-1].elCount += 1
-            return el
-        
         except StopIteration:
-            try:
-                while True:    
-                    self._getNextBrTuple()
-            except StopIteration:
-                pass
-            
+            self._countElements()
             self._finishedCounting = True
             raise
-            
-    def _getNextBrTuple(self):
-        self._brTuples.append( self._brIter.next() )
-        self._brTuples[-1].elCount = 0
-        
-    def _contains(self, br, el):
-        if [br.genome, br.chr] != [el.genome, el.chr]:
-            return False            
-
-        return False if (el.start is not None and br.start > el.start) or \
-                        (el.end is not None and br.end < el.end) else True
-        
+
+        if self._curChr != el.chr or self._curGenome != el.genome or len(self._chrGroups) == 0:
+            self._startChrGroup(el.genome, el.chr)
+
+        if self._hasStart:
+            self._curStarts.append(el.start)
+        if self._hasEnd:
+            self._curEnds.append(el.end)
+        self._chrGroups[-1][4] += 1
+        return el
+
+    def _startChrGroup(self, genome, chr):
+        self._curGenome, self._curChr = genome, chr
+        self._curStarts, self._curEnds = array('l'), array('l')
+        self._chrGroups.append([genome, chr, self._curStarts, self._curEnds, 0])
+
+    def _countElements(self):
+        brIdxsPerChr = OrderedDict()
+        for i, brTuple in enumerate(self._brTuples):
+            brTuple.elCount = 0
+            brIdxsPerChr.setdefault((brTuple.region.genome, brTuple.region.chr), []).append(i)
+
+        for genome, chr, starts, ends, numElements in self._chrGroups:
+            if (genome, chr) not in brIdxsPerChr:
+                raise ShouldNotOccurError('Element is not contained in any of the bounding regions')
+
+            brIdxs = brIdxsPerChr[(genome, chr)]
+            brStarts = numpy.array([self._brTuples[i].region.start for i in brIdxs])
+            brEnds = numpy.array([self._brTuples[i].region.end for i in brIdxs])
+            sortOrder = numpy.argsort(brStarts, kind='mergesort')
+
+            counts = countElementsInRegions(brStarts[sortOrder], brEnds[sortOrder], \
+                                            numpy.frombuffer(starts, dtype=starts.typecode) if self._hasStart else None, \
+                                            numpy.frombuffer(ends, dtype=ends.typecode) if self._hasEnd else None, \
+                                            numElements)
+            for i, count in zip(sortOrder, counts):
+                self._brTuples[brIdxs[i]].elCount += int(count)
+
     def getBoundingRegionTuples(self):
         assert self._finishedCounting
         return self._brTuples
@@ -0,0 +1,255 @@
+import numpy
+
+from copy import copy
+
+from gtrackcore.input.wrappers.GERegionBoundaryFilter import BoundaryRegionIndex
+from gtrackcore.input.wrappers.GESourceWrapper import GESourceWrapper
+from gtrackcore.track.memmap.CategoricalArray import CategoricalArray
+from gtrackcore.util.CustomExceptions import AbstractClassError, NotSupportedError
+
+class ColumnBatch(object):
+    '''
+    Columns (numpy arrays, one per prefix) of a batch of elements from the
+    same chromosome. Used as input to ColumnFilter.getMask().
+    '''
+
+    def __init__(self, genome, chr, columns):
+        self.genome = genome
+        self.chr = chr
+        self._columns = columns
+
+    def __getitem__(self, prefix):
+        return self._columns[prefix]
+
+    def __contains__(self, prefix):
+        return prefix in self._columns
+
+    def __len__(self):
+        return len(self._columns.values()[0]) if self._columns else 0
+
+
+class ColumnFilter(object):
+    '''
+    Abstract filter expression, evaluated as a boolean mask over a ColumnBatch.
+    Filters are combined with the operators '&', '|' and '~', so that any
+    number of filters are evaluated in a single pass over the data.
+    '''
+    REQUIRED_PREFIXES = []
+
+    def getRequiredPrefixes(self):
+        return list(self.REQUIRED_PREFIXES)
+
+    def getMask(self, batch):
+        raise AbstractClassError
+
+    def __and__(self, other):
+        return AndFilter(self, other)
+
+    def __or__(self, other):
+        return OrFilter(self, other)
+
+    def __invert__(self):
+        return NotFilter(self)
+
+
+class _CombinedFilter(object):
+    OPERATOR = None
+
+    def __init__(self, *filters):
+        self._filters = filters
+
+    def getRequiredPrefixes(self):
+        prefixes = []
+        for filter in self._filters:
+            prefixes += [prefix for prefix in filter.getRequiredPrefixes() if prefix not in prefixes]
+        return prefixes
+
+    def __repr__(self):
+        return '(' + (' %s ' % self.OPERATOR).join(repr(filter) for filter in self._filters) + ')'
+
+
+class AndFilter(_CombinedFilter, ColumnFilter):
+    OPERATOR = '&'
+
+    def getMask(self, batch):
+        mask = numpy.ones(len(batch), dtype='bool8')
+        for filter in self._filters:
+            mask &= filter.getMask(batch)
+        return mask
+
+
+class OrFilter(_CombinedFilter, ColumnFilter):
+    OPERATOR = '|'
+
+    def getMask(self, batch):
+        mask = numpy.zeros(len(batch), dtype='bool8')
+        for filter in self._filters:
+            mask |= filter.getMask(batch)
+        return mask
+
+
+class NotFilter(ColumnFilter):
+    def __init__(self, filter):
+        self._filter = filter
+
+    def getRequiredPrefixes(self):
+        return self._filter.getRequiredPrefixes()
+
+    def getMask(self, batch):
+        return ~self._filter.getMask(batch)
+
+    def __repr__(self):
+        return '~' + repr(self._filter)
+
+
+class CategoryFilter(ColumnFilter):
+    '''
+    Keeps elements with a value in the list of categories. If not strict,
+    elements with a value containing any of the categories as a substring are
+    kept (as in GECategoryFilter). For dictionary-encoded values, the filter
+    is evaluated once per category and the mask is looked up by the codes.
+    '''
+    REQUIRED_PREFIXES = ['val']
+
+    def __init__(self, categories, strict=True):
+        self._categories = sorted(set(categories))
+        self._strict = strict
+
+    def getMask(self, batch):
+        vals = batch['val']
+        if isinstance(vals, CategoricalArray):
+            return self._getMask(vals.categories)[numpy.asarray(vals.codes[0:len(vals)])]
+        return self._getMask(numpy.asarray(vals))
+
+    def _getMask(self, vals):
+        if self._strict:
+            return numpy.in1d(vals, self._categories)
+
+        mask = numpy.zeros(len(vals), dtype='bool8')
+        for category in self._categories:
+            mask |= numpy.char.find(vals, category) >= 0
+        return mask
+
+    def __repr__(self):
+        return 'CategoryFilter(%s, strict=%s)' % (self._categories, self._strict)
+
+
+class ValueRangeFilter(ColumnFilter):
+    'Keeps elements with minVal <= value <= maxVal. Missing values (nan) are filtered out.'
+    REQUIRED_PREFIXES = ['val']
+
+    def __init__(self, minVal=None, maxVal=None):
+        self._minVal = minVal
+        self._maxVal = maxVal
+
+    def getMask(self, batch):
+        vals = numpy.asarray(batch['val'])
+        if vals.ndim > 1:
+            raise NotSupportedError('Value range filters are not supported for vector values.')
+
+        with numpy.errstate(invalid='ignore'):
+            mask = vals == vals
+            if self._minVal is not None:
+                mask &= vals >= self._minVal
+            if self._maxVal is not None:
+                mask &= vals <= self._maxVal
+        return mask
+
+    def __repr__(self):
+        return 'ValueRangeFilter(%s, %s)' % (self._minVal, self._maxVal)
+
+
+class StrandFilter(ColumnFilter):
+    'Keeps elements with the given strand (True, False or BINARY_MISSING_VAL).'
+    REQUIRED_PREFIXES = ['strand']
+
+    def __init__(self, strand):
+        self._strand = int(strand)
+
+    def getMask(self, batch):
+        return numpy.asarray(batch['strand']).astype('int8') == self._strand
+
+    def __repr__(self):
+        return 'StrandFilter(%s)' % self._strand
+
+
+class RegionFilter(ColumnFilter):
+    'Keeps segments that are fully contained in any of the regions (as in GERegionBoundaryFilter).'
+    REQUIRED_PREFIXES = ['start', 'end']
+
+    def __init__(self, regions):
+        self._regions = list(regions)
+        self._index = BoundaryRegionIndex(self._regions)
+
+    def getMask(self, batch):
+        return self._index.getContainedMask(batch.genome, batch.chr, \
+                                            numpy.asarray(batch['start']), numpy.asarray(batch['end']))
+
+    def __repr__(self):
+        return 'RegionFilter(%s)' % ', '.join(region.strShort() for region in self._regions)
+
+
+class GEColumnFilter(GESourceWrapper):
+    '''
+    Filters the elements of a geSource according to a ColumnFilter expression.
+    The elements are read in batches from the same chromosome and the
+    filter is evaluated once per batch on the columns it requires.
+    '''
+    BATCH_SIZE = 4096
+
+    def __init__(self, geSource, columnFilter):
+        GESourceWrapper.__init__(self, geSource)
+        self._columnFilter = columnFilter
+        self._geIter = None
+        self._batch = []
+        self._batchIndex = 0
+        self._nextEl = None
+
+    def __iter__(self):
+        self = copy(self)
+
+        prefixList = self._geSource.getPrefixList()
+        missing = [prefix for prefix in self._columnFilter.getRequiredPrefixes() if prefix not in prefixList]
+        if missing:
+            raise NotSupportedError('Filter %s requires the following missing columns: %s' \
+                                    % (repr(self._columnFilter), ', '.join(missing)))
+
+        self._geIter = self._geSource.__iter__()
+        self._batch = []
+        self._batchIndex = 0
+        self._nextEl = None
+        return self
+
+    def next(self):
+        while self._batchIndex >= len(self._batch):
+            self._readBatch()
+        self._batchIndex += 1
+        return self._batch[self._batchIndex - 1]
+
+    def _readBatch(self):
+        # Elements are copied, as some geSources reuse the same element object
+        if self._nextEl is None:
+            self._nextEl = self._geIter.next().getCopy()
+
+        batch = [self._nextEl]
+        genome, chr = self._nextEl.genome, self._nextEl.chr
+        self._nextEl = None
+        for i in xrange(self.BATCH_SIZE - 1):
+            try:
+                el = self._geIter.next().getCopy()
+            except StopIteration:
+                break
+            if el.genome != genome or el.chr != chr:
+                self._nextEl = el
+                break
+            batch.append(el)
+
+        columns = dict((prefix, numpy.array([getattr(el, prefix) for el in batch])) \
+                       for prefix in self._columnFilter.getRequiredPrefixes())
+        mask = self._columnFilter.getMask(ColumnBatch(genome, chr, columns))
+
+        self._batch = [el for el, keep in zip(batch, mask) if keep]
+        self._batchIndex = 0
+
+    def __len__(self):
+        return sum(1 for i in self)
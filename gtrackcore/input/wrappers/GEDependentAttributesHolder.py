@@ -1,3 +1,4 @@
+from gtrackcore.input.core.GenomeElementSourceSniffer import GenomeElementSourceSniffer
 from gtrackcore.input.wrappers.GESourceWrapper import GESourceWrapper, PausedAtCountsGESourceWrapper
 from gtrackcore.util.CustomExceptions import InvalidFormatError, NotIteratedYetError
 
@@ -35,8 +36,11 @@ class GEDependentAttributesHolder(GESourceWrapper):
         return self._boundingRegionTuples
     
     def _initOtherDependentAttrs(self):
-        self._valDim = self._geSource.getValDim()
-        self._edgeWeightDim = self._geSource.getEdgeWeightDim()
+        #Dimensions that are only known after parsing data lines (type=vector) are
+        #found from a sample, and are confirmed when the iteration has finished.
+        sniffer = GenomeElementSourceSniffer(self._geSource)
+        self._valDim = sniffer.getValDim()
+        self._edgeWeightDim = sniffer.getEdgeWeightDim()
         self._anyWarnings = self._geSource.anyWarnings()
         self._lastWarning = self._geSource.getLastWarning()
 
@@ -122,25 +122,27 @@ class GEOverlapClustererBase(GESourceWrapper):
                 return curValsList[0] + '|...'
     
     def _getMissingValue(self, prefix):
-        if prefix == 'val':
-            valDataType = self._geSource.getValDataType()
-            if valDataType in ['float32', 'float64', 'float128']:
-                return numpy.nan
-            elif valDataType in ['int32', 'int64']:
-                return 0
-            elif valDataType == 'int8':
-                return BINARY_MISSING_VAL
-            elif valDataType == 'bool8':
-                return True
-            elif valDataType == 'S1':
-                return ''
-            elif valDataType[0] == 'S':
-                return ''
-        elif prefix == 'strand':
+        return getMissingValue(prefix, self._geSource.getValDataType())
+
+def getMissingValue(prefix, valDataType):
+    if prefix == 'val':
+        if valDataType in ['float32', 'float64', 'float128']:
+            return numpy.nan
+        elif valDataType in ['int32', 'int64']:
+            return 0
+        elif valDataType == 'int8':
             return BINARY_MISSING_VAL
-        else:
+        elif valDataType == 'bool8':
+            return True
+        elif valDataType == 'S1':
             return ''
-        
+        elif valDataType[0] == 'S':
+            return ''
+    elif prefix == 'strand':
+        return BINARY_MISSING_VAL
+    else:
+        return ''
+
 class GEOverlapClusterer_Segment(GEOverlapClustererBase):
     def _overlapsPrev(self, el):
         return el.start < self._prevEl.end
@@ -1,17 +1,60 @@
+import numpy
+
+from bisect import bisect_right
+
 from gtrackcore.input.wrappers.GEFilter import GEFilter
 
+class BoundaryRegionIndex(object):
+    '''
+    Per-chromosome index of boundary regions, sorted by start, with the
+    cumulative maximum of the region ends. An element is contained in a
+    boundary region if the maximal end of the regions starting at or before
+    the element start is at least the element end.
+    '''
+
+    def __init__(self, regionIter):
+        regionsPerChr = {}
+        for region in regionIter:
+            regionsPerChr.setdefault((region.genome, region.chr), []).append((region.start, region.end))
+
+        self._starts = {}
+        self._maxEnds = {}
+        for key, regions in regionsPerChr.iteritems():
+            regions.sort()
+            self._starts[key] = [start for start, end in regions]
+            self._maxEnds[key] = numpy.maximum.accumulate([end for start, end in regions]).tolist()
+
+    def __contains__(self, key):
+        return key in self._starts
+
+    def contains(self, genome, chr, start, end):
+        key = (genome, chr)
+        if key not in self._starts:
+            return False
+
+        i = bisect_right(self._starts[key], start)
+        return i > 0 and self._maxEnds[key][i-1] >= end
+
+    def getContainedMask(self, genome, chr, starts, ends):
+        'Vectorized version of contains(), returning a boolean array for arrays of element starts and ends.'
+        key = (genome, chr)
+        if key not in self._starts:
+            return numpy.zeros(len(starts), dtype='bool8')
+
+        regionStarts = numpy.array(self._starts[key])
+        maxEnds = numpy.array(self._maxEnds[key])
+        indexes = numpy.searchsorted(regionStarts, starts, side='right') - 1
+        return (indexes >= 0) & (maxEnds[numpy.maximum(indexes, 0)] >= ends)
+
+
 class GERegionBoundaryFilter(GEFilter):
     def __init__(self, geSource, regionBoundaryIter):
         GEFilter.__init__(self, geSource)
-        self._boundaryRegions = {}
-        for region in regionBoundaryIter:
-            if not region.chr in self._boundaryRegions:
-                self._boundaryRegions[region.chr] = []
-            self._boundaryRegions[region.chr].append(region)
-    
+        self._boundaryRegionIndex = BoundaryRegionIndex(regionBoundaryIter)
+
     def next(self):
-        nextEl = self._geIter.next() 
-        while nextEl.chr not in self._boundaryRegions or \
-            not True in [r.contains(nextEl) for r in self._boundaryRegions[nextEl.chr]]:
+        index = self._boundaryRegionIndex
+        nextEl = self._geIter.next()
+        while not index.contains(nextEl.genome, nextEl.chr, nextEl.start, nextEl.end):
             nextEl = self._geIter.next()
         return nextEl
@@ -1,31 +1,156 @@
+import cPickle
+import numpy
+import tempfile
+
+from array import array
 from copy import copy
 
 from gtrackcore.input.wrappers.GESourceWrapper import GESourceWrapper
 
+_MIN_POS = numpy.iinfo('int64').min
+
+def _getCodes(values):
+    'Integer codes that sort in the same order as the values (None first, as in Python 2 comparisons).'
+    codeDict = dict((val, i) for i, val in enumerate(sorted(set(values))))
+    return numpy.array([codeDict[val] for val in values], dtype='int32')
+
+def _getPositions(values):
+    return numpy.array([(val if val is not None else _MIN_POS) for val in values], dtype='int64')
+
+def getSortOrder(elements):
+    'Returns the indexes of the elements sorted by genome, chr, start and end, keeping the order of equal elements.'
+    if len(elements) == 0:
+        return numpy.zeros(0, dtype='int64')
+
+    return numpy.lexsort((_getPositions([el.end for el in elements]), \
+                          _getPositions([el.start for el in elements]), \
+                          _getCodes([el.chr for el in elements]), \
+                          _getCodes([el.genome for el in elements])))
+
+class _CodeArray(object):
+    'Compact array of integer codes for a column with few distinct values, e.g. genome or chr.'
+    def __init__(self):
+        self._codes = array('i')
+        self._codeDict = {}
+
+    def append(self, val):
+        code = self._codeDict.get(val)
+        if code is None:
+            code = self._codeDict[val] = len(self._codeDict)
+        self._codes.append(code)
+
+    def getSortableCodes(self):
+        'Returns the codes renumbered so that they sort in the same order as the values.'
+        ranks = numpy.zeros(len(self._codeDict), dtype='int32')
+        for rank, val in enumerate(sorted(self._codeDict)):
+            ranks[self._codeDict[val]] = rank
+        return ranks[numpy.array(self._codes, dtype='int32')]
+
+class _ElementRecordFile(object):
+    '''
+    Elements pickled in their original order to a temporary file. Only the
+    sort keys of each element (genome and chr codes, start and end) and the
+    offset of its record are kept in memory, as compact arrays.
+    '''
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._genomeCodes = _CodeArray()
+        self._chrCodes = _CodeArray()
+        self._starts = array('l')
+        self._ends = array('l')
+        self._offsets = array('l')
+
+    def append(self, el):
+        self._genomeCodes.append(el.genome)
+        self._chrCodes.append(el.chr)
+        self._starts.append(el.start if el.start is not None else _MIN_POS)
+        self._ends.append(el.end if el.end is not None else _MIN_POS)
+        self._offsets.append(self._file.tell())
+        cPickle.dump(el, self._file, cPickle.HIGHEST_PROTOCOL)
+
+    def iterSorted(self):
+        order = numpy.lexsort((numpy.array(self._ends, dtype='int64'), \
+                               numpy.array(self._starts, dtype='int64'), \
+                               self._chrCodes.getSortableCodes(), \
+                               self._genomeCodes.getSortableCodes()))
+        recordFile, offsets = self._file, self._offsets
+        for i in order.tolist():
+            recordFile.seek(offsets[i])
+            yield cPickle.load(recordFile)
+
+    def close(self):
+        self._file.close()
+
 class GESorter(GESourceWrapper):
+    '''
+    Sorts the elements of a geSource by genome, chr, start and end, using
+    numpy.lexsort on arrays of the sort keys. Up to MAX_ELEMENTS_IN_MEMORY
+    elements are sorted in memory and kept for later iterations. If there are
+    more elements, all elements are instead spilled unsorted to a temporary
+    record file, keeping only compact arrays of the sort keys and record
+    offsets in memory. The records are then read in sorted order.
+    '''
+    MAX_ELEMENTS_IN_MEMORY = 100000
+
     def __init__(self, geSource):
         GESourceWrapper.__init__(self, geSource)
         self._geIter = None
         self._sortedElements = None
-        
+        self._numElements = None
+
     def __iter__(self):
         if True in [attrs in self._geSource.getPrefixList() for attrs in ['start', 'end']]:
-            if self._sortedElements is None:
-                #self._sortedElements = [deepcopy(el) for el in self._geSource]
-                self._sortedElements = [el.getCopy() for el in self._geSource]
-                self._sortedElements.sort(key=lambda el: [el.genome, el.chr, el.start, el.end])
-                
-            self._geIter = self._sortedElements.__iter__()
-            return copy(self)
+            if self._sortedElements is not None:
+                geIter = self._sortedElements.__iter__()
+            else:
+                geIter = self._sortedElementsIter()
+
+            self = copy(self)
+            self._geIter = geIter
+            return self
         else:
-            return self._geSource.__iter__()        
-    
+            return self._geSource.__iter__()
+
     def next(self):
         el = self._geIter.next()
         return el
-        
+
+    @staticmethod
+    def _sortRun(elements):
+        return [elements[i] for i in getSortOrder(elements)]
+
+    def _sortedElementsIter(self):
+        recordFile = None
+        try:
+            elements = []
+            numElements = 0
+            for el in self._geSource:
+                numElements += 1
+                if recordFile is not None:
+                    recordFile.append(el)
+                    continue
+
+                elements.append(el.getCopy())
+                if len(elements) >= self.MAX_ELEMENTS_IN_MEMORY:
+                    recordFile = _ElementRecordFile()
+                    for el in elements:
+                        recordFile.append(el)
+                    elements = []
+
+            self._numElements = numElements
+            if recordFile is None:
+                self._sortedElements = self._sortRun(elements)
+                for el in self._sortedElements:
+                    yield el
+            else:
+                for el in recordFile.iterSorted():
+                    yield el
+        finally:
+            if recordFile is not None:
+                recordFile.close()
+
     def __len__(self):
-        if self._sortedElements is None:
+        if self._numElements is None:
             return sum(1 for el in self)
         else:
-            return len(self._sortedElements)
\ No newline at end of file
+            return self._numElements
@@ -146,6 +146,23 @@ class PrefixListGESourceWrapper(ListGESourceWrapper):
     def getPrefixList(self):
         return self._prefixList
         
+class RegionGESourceWrapper(GESourceWrapper):
+    def __init__(self, geSource, regionList):
+        GESourceWrapper.__init__(self, geSource)
+        self._regionList = regionList
+
+    def __iter__(self):
+        self._geIter = self._iterRegions()
+        return copy(self)
+
+    def _iterRegions(self):
+        for region in self._regionList:
+            for ge in self._geSource.iterRegion(region):
+                yield ge
+
+    def next(self):
+        return self._geIter.next()
+
 class ElementModifierGESourceWrapper(GESourceWrapper, GenomeElementSource):
     def __new__(cls, *args, **kwArgs):
         return object.__new__(cls)
@@ -0,0 +1,93 @@
+import numpy
+
+from gtrackcore.util.CustomExceptions import ArgumentValueError, InvalidFormatError
+
+class ChrTable(object):
+    '''
+    Precomputed lookup table of the chromosomes (sequences) of a genome. Each
+    chromosome is given an integer code, which indexes the array of chromosome
+    lengths. Instances are cached per genome by GenomeInfo.getChrTable().
+    '''
+
+    def __init__(self, genome, chrList, chrLengths):
+        self.genome = genome
+        self.chrList = tuple(chrList)
+        self.chrLengths = numpy.array(chrLengths, dtype='int64')
+        self._chrToCode = dict((chr, code) for code, chr in enumerate(self.chrList))
+        self._chrToLen = dict(zip(self.chrList, chrLengths))
+
+    def __contains__(self, chr):
+        return chr in self._chrToCode
+
+    def __len__(self):
+        return len(self.chrList)
+
+    def isValidChr(self, chr):
+        return chr in self._chrToCode
+
+    def getCode(self, chr):
+        try:
+            return self._chrToCode[chr]
+        except KeyError:
+            raise ArgumentValueError("Error: chromosome '%s' is not part of genome '%s'." % (chr, self.genome))
+
+    def getChrLen(self, chr):
+        try:
+            return self._chrToLen[chr]
+        except KeyError:
+            raise ArgumentValueError("Error: chromosome '%s' is not part of genome '%s'." % (chr, self.genome))
+
+    def lookupChrLen(self, chr):
+        'Returns the length of the chromosome, or None if the chromosome is not part of the genome.'
+        return self._chrToLen.get(chr)
+
+    def getChrCodes(self, chrs):
+        'Returns an array of chromosome codes for a sequence of chromosome names, with -1 for unknown chromosomes.'
+        chrToCode = self._chrToCode
+        return numpy.fromiter((chrToCode.get(chr, -1) for chr in chrs), dtype='int32', count=len(chrs))
+
+    def checkValidCoords(self, chrs, starts, ends=None):
+        '''
+        Batch version of the coordinate checks of GenomeElementSource. The
+        chromosomes may be given as names or as codes (integer array). Raises
+        InvalidFormatError for the first invalid coordinate. Returns a boolean
+        array which is True for elements positioned on a valid chromosome.
+        '''
+        chrs = numpy.asarray(chrs)
+        codes = chrs if chrs.dtype.kind in 'iu' else self.getChrCodes(chrs)
+        validChrs = (codes >= 0) & (codes < len(self.chrList))
+        maxChrLens = numpy.iinfo('int64').max
+        chrLens = numpy.where(validChrs, self.chrLengths[numpy.where(validChrs, codes, 0)], maxChrLens) \
+                  if len(self.chrList) > 0 else numpy.repeat(maxChrLens, len(codes))
+
+        starts = numpy.asarray(starts, dtype='int64')
+        i = self._getFirstIndex(starts < 0)
+        if i is not None:
+            raise InvalidFormatError('Error: start position is negative: %s' % starts[i])
+
+        i = self._getFirstIndex(starts > chrLens)
+        if i is not None:
+            raise InvalidFormatError('Error: start position is larger than the size of chromosome "%s" (%s > %s)' % \
+                                     (self.chrList[codes[i]], starts[i], chrLens[i]))
+
+        if ends is not None:
+            ends = numpy.asarray(ends, dtype='int64')
+            i = self._getFirstIndex(ends < 0)
+            if i is not None:
+                raise InvalidFormatError('Error: end position is negative: %s' % ends[i])
+
+            i = self._getFirstIndex(ends - 1 > chrLens)
+            if i is not None:
+                raise InvalidFormatError('Error: end position is larger than the size of chromosome "%s" (%s > %s)' % \
+                                         (self.chrList[codes[i]], ends[i] - 1, chrLens[i]))
+
+            i = self._getFirstIndex((ends <= starts) & ~((starts == 1) & (ends == 1)))
+            if i is not None:
+                raise InvalidFormatError('Error: end position (end-exclusive) is smaller than or equal to start position: %d <= %d' % \
+                                         (ends[i], starts[i]))
+        return validChrs
+
+    @staticmethod
+    def _getFirstIndex(boolArray):
+        indexes = numpy.flatnonzero(boolArray)
+        return indexes[0] if len(indexes) > 0 else None
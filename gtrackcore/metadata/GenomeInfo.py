@@ -12,6 +12,8 @@ from gtrackcore.util.CustomExceptions import ArgumentValueError #, NotSupportedE
 #
 ##class GenomeTools
 class GenomeInfo(object):
+    _chrTables = {}
+
 #    _chrLengths = {}
 #    _genomeChrLists = {}
 #    _genomeExtChrLists = {}
@@ -246,9 +248,21 @@ class GenomeInfo(object):
             result[chrom] = cls.getChrLen(genome, chrom)
         return result
 
+    @classmethod
+    def getChrTable(cls, genome):
+        "Returns a precomputed lookup table of the chromosome codes and lengths of the genome."
+        try:
+            return cls._chrTables[genome]
+        except KeyError:
+            from gtrackcore.metadata.ChrTable import ChrTable
+            chrList = cls.getExtendedChrList(genome)
+            chrTable = ChrTable(genome, chrList, [cls._getChrLenFromGenomeDefs(genome, chr) for chr in chrList])
+            cls._chrTables[genome] = chrTable
+            return chrTable
+
     @classmethod
     def isValidChr(cls, genome, chr):
-        return chr in cls.getExtendedChrList(genome)
+        return cls.getChrTable(genome).isValidChr(chr)
 #        # Removed this, as chromosome mismatch now only displays a warning:
 #        #
 #        #return chr in cls.getExtendedChrList(genome) or \
@@ -272,6 +286,10 @@ class GenomeInfo(object):
     def getChrLen(cls, genome, chr):
         assert genome is not None
         assert chr is not None
+        return cls.getChrTable(genome).getChrLen(chr)
+
+    @classmethod
+    def _getChrLenFromGenomeDefs(cls, genome, chr):
         # For the unit-tests
         if genome.lower() == 'testgenome':
             if chr == 'chr21':
@@ -10,8 +10,6 @@ from gtrackcore.core.Config import Config
 from gtrackcore.track.format.TrackFormat import TrackFormatReq
 from gtrackcore.util.CommonFunctions import strWithStdFormatting, ensurePathExists
 from gtrackcore.util.CustomExceptions import ShouldNotOccurError
-from gtrackcore.util.HtmlCore import HtmlCore
-from gtrackcore.util.TextCore import TextCore
 
 METADATA_FILES_PATH = Config.METADATA_FILES_PATH
 
@@ -113,6 +111,8 @@ class TrackInfo(object):
         self.numValCategories = None
         self.numClusteredValCategories = None
         self.numEdgeWeightCategories = None
+        self.fixedLengths = {}
+        self.fixedGapSizes = {}
         self.timeOfPreProcessing = None
         self.preProcVersion = ''
 
@@ -184,6 +184,9 @@ class TrackInfo(object):
         core.image(tfAbbrev, style='width: 300px', embed=True)
         
     def allInfo(self, printEmpty=False, htmlOutput=True):
+        from gtrackcore.util.HtmlCore import HtmlCore
+        from gtrackcore.util.TextCore import TextCore
+        
         core = HtmlCore() if htmlOutput else TextCore()
         isDense = self._isDenseTrack()
         
@@ -205,6 +208,9 @@ class TrackInfo(object):
         return self.mainInfo(printEmpty) + unicode(core)
 
     def mainInfo(self, printEmpty=False, htmlOutput=True):
+        from gtrackcore.util.HtmlCore import HtmlCore
+        from gtrackcore.util.TextCore import TextCore
+        
         coreCls = HtmlCore if htmlOutput else TextCore
         core = coreCls()
         isDense = self._isDenseTrack()
@@ -1,21 +1,25 @@
+import numpy
+
 from collections import defaultdict
 from functools import partial
 
 from gtrackcore.input.core.GenomeElementSource import BoundingRegionTuple
+from gtrackcore.input.core.GenomeElementSourceSniffer import GenomeElementSourceSniffer, \
+                                                             getStrPrefixes, getStrLen
 from gtrackcore.input.adapters.TrackGenomeElementSource import TrackGenomeElementSource
+from gtrackcore.input.adapters.ClusteredTrackGenomeElementSource import ClusteredTrackGenomeElementSource
 from gtrackcore.input.wrappers.GESourceWrapper import BrTuplesGESourceWrapper
 from gtrackcore.input.wrappers.GEOverlapClusterer import GEOverlapClusterer
 from gtrackcore.input.wrappers.GEBoundingRegionElementCounter import GEBoundingRegionElementCounter
 from gtrackcore.input.wrappers.GEDependentAttributesHolder import GEDependentAttributesHolder
 from gtrackcore.track.format.TrackFormat import TrackFormat
-from gtrackcore.util.CommonFunctions import flatten
-from gtrackcore.util.CommonConstants import RESERVED_PREFIXES
 from gtrackcore.util.CommonClasses import OrderedDefaultDict
 from gtrackcore.util.CustomExceptions import NotSupportedError
 
 class GESourceManager(object):
     def __init__(self, geSource):
         self._geSource = self._decorateGESource(geSource)
+        self._sniffer = GenomeElementSourceSniffer(geSource)
         self._boundingRegionsAndGEsCorrespond = None
 
         self._areValsCategorical = TrackFormat.createInstanceFromGeSource(geSource).getValTypeName() == 'Category'
@@ -34,13 +38,7 @@ class GESourceManager(object):
         return GEDependentAttributesHolder(geSource)
 
     def _getMaxStrLensKeys(self):
-        prefixSet = set(self._geSource.getPrefixList())
-
-        return (['val'] if 'val' in prefixSet and self._geSource.getValDataType() == 'S' else []) + \
-               (['id'] if 'id' in prefixSet else []) + \
-               (['edges'] if 'edges' in prefixSet else []) + \
-               (['weights'] if 'weights' in prefixSet and self._geSource.getEdgeWeightDataType() == 'S' else []) + \
-               [x for x in prefixSet if x not in RESERVED_PREFIXES]
+        return getStrPrefixes(self._geSource)
 
     @staticmethod
     def _initMaxStrLens(keys):
@@ -51,42 +49,57 @@ class GESourceManager(object):
             prevPrintWarnings = self._geSource.getPrintWarnings()
             self._geSource.setPrintWarnings(False)
 
-            if self._geSource.isSliceSource():
-                if len(self._getMaxStrLensKeys()):
-                    raise NotImplementedError('Dimension calculation not yet implemented for slice-based GenomeElementSources.')
-
-                prefixList = self._geSource.getPrefixList()
-                for el in self._geSource:
-                    chr = el.chr
-                    self._numElements[chr] += len(getattr(el, prefixList[0]))
+            if self._geSource.isSliceSource() or self._sniffer.isExhaustive():
+                self._calcStatistics(self._geSource, calcMaxStrLens=True)
             else:
-                for el in self._geSource:
-                    chr = el.chr
-                    self._numElements[chr] += 1
+                # For larger sources, the string lengths are only sampled, as
+                # OutputFile widens the string arrays if longer strings are
+                # written. Only element counts are collected in this pass.
+                self._calcStatistics(self._geSource, calcMaxStrLens=False)
+                sampledMaxStrLens = self._sniffer.getMaxStrLens()
+                for chr in self._numElements:
+                    self._maxStrLens[chr] = dict(sampledMaxStrLens)
+
+            self._geSource.setPrintWarnings(prevPrintWarnings)
+            self._hasCalculatedStats = True
+
+    def _calcStatistics(self, geIter, calcMaxStrLens):
+        if self._geSource.isSliceSource():
+            prefixList = self._geSource.getPrefixList()
+            for el in geIter:
+                chr = el.chr
+                self._numElements[chr] += len(getattr(el, prefixList[0]))
 
-                    if el.isBlankElement:
-                        continue
+                if self._areValsCategorical:
+                    self._valCategories |= set(numpy.unique(el.val))
 
-                    if self._areValsCategorical:
-                        self._valCategories.add(el.val)
+                for prefix in self._maxStrLens[chr]:
+                    self._maxStrLens[chr][prefix] = \
+                            max( self._maxStrLens[chr][prefix], getattr(el, prefix).dtype.itemsize )
+        else:
+            for el in geIter:
+                chr = el.chr
+                self._numElements[chr] += 1
 
-                    if self._areEdgeWeightsCategorical:
-                        self._edgeWeightCategories |= set(el.weights)
+                if el.isBlankElement:
+                    continue
 
+                if self._areValsCategorical:
+                    self._valCategories.add(el.val)
+
+                if self._areEdgeWeightsCategorical:
+                    self._edgeWeightCategories |= set(el.weights)
+
+                if el.edges is not None:
+                    self._maxNumEdges[chr] = max(self._maxNumEdges[chr], len(el.edges))
+
+                if calcMaxStrLens:
                     for prefix in self._maxStrLens[chr]:
                         content = getattr(el, prefix, None)
 
                         if content is not None:
                             self._maxStrLens[chr][prefix] = \
-                                    max( self._maxStrLens[chr][prefix], \
-                                         max(1, len(content)) if isinstance(content, basestring) else \
-                                            max([1] + [len(x) for x in flatten(content)]) )
-
-                            if prefix == 'edges':
-                                self._maxNumEdges[chr] = max(self._maxNumEdges[chr], len(el.edges))
-
-            self._geSource.setPrintWarnings(prevPrintWarnings)
-            self._hasCalculatedStats = True
+                                    max( self._maxStrLens[chr][prefix], max(1, getStrLen(content)) )
 
     def getGESource(self):
         return self._geSource
@@ -101,8 +114,9 @@ class GESourceManager(object):
             from gtrackcore.metadata.GenomeInfo import GenomeInfo
 
             geChrList = self.getAllChrs()
+            chrTable = GenomeInfo.getChrTable(self._geSource.genome)
             boundingRegionTuples = [BoundingRegionTuple( \
-                                     GenomeRegion(chr=chr, start=0, end=GenomeInfo.getChrLen(self._geSource.genome, chr)), \
+                                     GenomeRegion(chr=chr, start=0, end=chrTable.getChrLen(chr)), \
                                      self.getNumElementsForChr(chr) ) \
                                     for chr in geChrList]
             self._boundingRegionsAndGEsCorrespond = False
@@ -189,6 +203,9 @@ class OverlapClusteringGESourceManager(GESourceManager):
         self._brTuplesForClusteredElements = None
 
     def _decorateGESource(self, geSource):
+        if ClusteredTrackGenomeElementSource.supportsGESource(geSource):
+            return ClusteredTrackGenomeElementSource(geSource.genome, geSource.getTrackName(), \
+                                                     [br.region for br in self._origBrTuples])
         return GEBoundingRegionElementCounter(GEOverlapClusterer(geSource), \
                                               self._origBrTuples)
 
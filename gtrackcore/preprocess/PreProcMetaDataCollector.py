@@ -44,6 +44,8 @@ class PreProcMetaDataCollector(object):
         self._boundingRegionTuples = defaultdict(list)
         self._valCategories = defaultdict(set)
         self._edgeWeightCategories = defaultdict(set)
+        self._fixedLengths = {}
+        self._fixedGapSizes = {}
         
         self.__dict__.update(existingAttrs)
                     
@@ -86,6 +88,10 @@ class PreProcMetaDataCollector(object):
         self._valCategories[allowOverlaps] |= valCategories
         self._edgeWeightCategories[allowOverlaps] |= edgeWeightCategories
         
+    def updateFixedLengthAndGapSize(self, allowOverlaps, fixedLength, fixedGapSize):
+        self._fixedLengths[allowOverlaps] = fixedLength
+        self._fixedGapSizes[allowOverlaps] = fixedGapSize
+        
     def flagChrsAsPreProcessed(self, allowOverlaps, chrList):
         for chr in chrList:
             self._preProcChrs[allowOverlaps][chr] = None
@@ -124,6 +130,9 @@ class PreProcMetaDataCollector(object):
     def overlapRuleHasBeenFinalized(self, allowOverlaps):
         return allowOverlaps in self._overlapRulesFinalized
         
+    def getFixedLengthAndGapSize(self, allowOverlaps):
+        return self._fixedLengths.get(allowOverlaps), self._fixedGapSizes.get(allowOverlaps)
+        
     def getTrackFormat(self):
         return TrackFormat.createInstanceFromPrefixList(self._prefixList, \
                                                         self._valDataType, \
@@ -185,6 +194,9 @@ class PreProcMetaDataCollector(object):
         if True in self._edgeWeightCategories:
             ti.numEdgeWeightCategories = len(self._edgeWeightCategories[True])
         
+        ti.fixedLengths = dict(self._fixedLengths)
+        ti.fixedGapSizes = dict(self._fixedGapSizes)
+        
         ti.id = self._id
         ti.timeOfPreProcessing = datetime.datetime.now()
     
@@ -80,6 +80,9 @@ class PreProcessTracksJob(object):
                             self._status = 'Trying to remove chromosome folders'
                             PreProcessUtils.removeChrMemmapFolders(self._genome, trackName, allowOverlaps)
 
+                            self._status = 'Trying to calculate fixed length and gap size of elements'
+                            PreProcessUtils.calcAndStoreFixedLengthAndGapSize(self._genome, trackName, allowOverlaps)
+
                         self._status = 'Trying to check whether 3D data is correct'
                         PreProcessUtils.checkIfEdgeIdsExist(self._genome, trackName, allowOverlaps)
                         PreProcessUtils.checkUndirectedEdges(self._genome, trackName, allowOverlaps)
@@ -132,6 +132,24 @@ class PreProcessUtils(object):
             raise ShouldNotOccurError("Error: The total element count for all bounding regions is not equal to the total number of genome elements. %s != %s" % \
                                       (brShelve.getTotalElementCount(), collector.getNumElements(allowOverlaps)) )
     
+    @staticmethod
+    def calcAndStoreFixedLengthAndGapSize(genome, trackName, allowOverlaps):
+        '''
+        Stores whether all elements have the same length and gap size, so that
+        this is not calculated from all elements of the extracted regions when
+        extracting the track (see TrackGenomeElementSource).
+        '''
+        from gtrackcore.input.adapters.TrackGenomeElementSource import TrackGenomeElementSource
+
+        collector = PreProcMetaDataCollector(genome, trackName)
+        boundingRegions = [br.region for br in sorted(collector.getBoundingRegionTuples(allowOverlaps))]
+        if collector.getTrackFormat().reprIsDense() or len(boundingRegions) == 0:
+            return
+
+        trackGESource = TrackGenomeElementSource(genome, trackName, boundingRegions, \
+                                                 allowOverlaps=allowOverlaps, printWarnings=False)
+        collector.updateFixedLengthAndGapSize(allowOverlaps, *trackGESource.findFixedLengthAndGapSizeOfAllElements())
+    
     @staticmethod
     def removeChrMemmapFolders(genome, trackName, allowOverlaps):
         chrList = PreProcMetaDataCollector(genome, trackName).getPreProcessedChrs(allowOverlaps)
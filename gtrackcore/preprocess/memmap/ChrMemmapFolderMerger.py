@@ -4,7 +4,9 @@ import shutil
 import sys
 
 from gtrackcore.preprocess.PreProcMetaDataCollector import PreProcMetaDataCollector
-from gtrackcore.track.memmap.CommonMemmapFunctions import createMemmapFileFn, parseMemmapFileFn, findEmptyVal
+from gtrackcore.track.memmap.CategoricalArray import CategoricalArray, shouldDictionaryEncode
+from gtrackcore.track.memmap.CommonMemmapFunctions import createMemmapFileFn, parseMemmapFileFn, findEmptyVal, \
+                                                          createCategoricalFileFns
 from gtrackcore.track.memmap.TrackSource import TrackSource
 from gtrackcore.util.CommonFunctions import createDirPath
 from gtrackcore.util.CustomExceptions import EmptyGESourceError
@@ -55,6 +57,21 @@ class ChrMemmapFolderMerger(object):
         
         return np.r_[a1, a2]
         
+    @staticmethod
+    def _writeArray(fn, array):
+        f = np.memmap(fn, dtype=array.dtype, mode='w+', shape=array.shape)
+        f[:] = array
+        f.flush()
+        del f
+    
+    @staticmethod
+    def _writeCategoricalArray(path, arrayName, array):
+        categoricalArray = CategoricalArray.encode(array)
+        codesFn, tableFn = createCategoricalFileFns(path, arrayName, str(categoricalArray.codes.dtype), \
+                                                    str(categoricalArray.categories.dtype))
+        ChrMemmapFolderMerger._writeArray(codesFn, categoricalArray.codes)
+        ChrMemmapFolderMerger._writeArray(tableFn, categoricalArray.categories)
+    
     @staticmethod
     def _existingChrIter(path, chrList):
         for chr in chrList:
@@ -93,12 +110,13 @@ class ChrMemmapFolderMerger(object):
                 
                 del chrTrackData[arrayName]
             
-            mergedFn = createMemmapFileFn(path, arrayName, elementDim, dtypeDim, str(mergedArray.dtype))
-            
-            f = np.memmap(mergedFn, dtype=mergedArray.dtype, mode='w+', shape=mergedArray.shape)
-            f[:] = mergedArray
-            f.flush()
-            del f
+            # String arrays with few distinct values (e.g. categorical values)
+            # are stored as integer codes and a per-track category table
+            if shouldDictionaryEncode(mergedArray):
+                ChrMemmapFolderMerger._writeCategoricalArray(path, arrayName, mergedArray)
+            else:
+                mergedFn = createMemmapFileFn(path, arrayName, elementDim, dtypeDim, str(mergedArray.dtype))
+                ChrMemmapFolderMerger._writeArray(mergedFn, mergedArray)
             del mergedArray
                     
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ from stat import S_IRWXU, S_IRWXG, S_IROTH
 from gtrackcore.preprocess.memmap.GEParseFunctions import getStart, getEnd, getStrand, getVal, getId, getEdges, \
                                                       getWeights, getNone, GetExtra, \
                                                       writeNoSlice, writeSliceFromFront
+from gtrackcore.input.core.GenomeElementSourceSniffer import getStrLen
 from gtrackcore.track.memmap.CommonMemmapFunctions import createMemmapFileFn, findEmptyVal, calcShapeFromMemmapFileFn
 from gtrackcore.util.CommonFunctions import product
 from gtrackcore.util.CustomExceptions import ShouldNotOccurError, InvalidFormatError
@@ -55,8 +56,15 @@ class OutputFile(object):
         # Example: weights.3.4.float64 contains, per element, at most 3 vectors
         #          of 4 numbers each. The shape is (n,3,4) for n elements.
         
+        self._path = path
+        self._prefix = prefix
         self._fn = createMemmapFileFn(path, prefix, self._elementDim, self._dataTypeDim, self._dataType)
+        self._origFn = self._fn
         self._index = 0
+
+        # The string length of string arrays is widened if longer strings
+        # than anticipated by maxStrLens are written.
+        self._strLen = np.dtype(self._dataType).itemsize if self._dataType.startswith('S') else None
         
         shape = [size] + \
                  ([max(1, self._elementDim)] if self._elementDim is not None else []) + \
@@ -88,6 +96,9 @@ class OutputFile(object):
         return len(self._contents)
     
     def close(self):
+        if self._fn != self._origFn and os.path.exists(self._origFn):
+            os.remove(self._origFn)
+
         memmapFile = np.memmap(self._fn, dtype=self._dataType, mode='w+', shape=self._contents.shape)
         memmapFile[:] = self._contents
         memmapFile.flush()
@@ -96,9 +107,21 @@ class OutputFile(object):
         self._contents = None
 
     def writeElement(self, genomeElement):
+        if self._strLen is not None:
+            content = self._parseFunc(genomeElement)
+            if content is not None:
+                strLen = getStrLen(content)
+                if strLen > self._strLen:
+                    self._widen(strLen)
         self._writeFunc(self._contents, self._index, genomeElement, self._parseFunc)
         self._index += 1
 
+    def _widen(self, strLen):
+        self._strLen = strLen
+        self._dataType = 'S' + str(strLen)
+        self._contents = self._contents.astype(self._dataType)
+        self._fn = createMemmapFileFn(self._path, self._prefix, self._elementDim, self._dataTypeDim, self._dataType)
+
     def write(self, value):
         self._contents[self._index] = value
         self._index += 1
@@ -108,8 +131,12 @@ class OutputFile(object):
         assert self._writeFunc == writeNoSlice
 
         slice = self._parseFunc(genomeElement)
-        assert slice.dtype == np.dtype(self._dataType), \
-            'Datatypes do not match: %s != %s' % (str(slice.dtype), self._dataType)
+        if self._strLen is not None and slice.dtype.kind == 'S':
+            if slice.dtype.itemsize > self._strLen:
+                self._widen(slice.dtype.itemsize)
+        else:
+            assert slice.dtype == np.dtype(self._dataType), \
+                'Datatypes do not match: %s != %s' % (str(slice.dtype), self._dataType)
         
         self._contents[self._index:self._index+len(slice)] = slice
         self._index += len(slice)
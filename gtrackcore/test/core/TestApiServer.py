@@ -0,0 +1,98 @@
+import os
+import sys
+import socket
+import threading
+import unittest
+
+from cStringIO import StringIO
+from tempfile import mkdtemp
+
+from gtrackcore.core.ApiServer import ApiServer, forwardToApiServer
+from gtrackcore.test.common.TestWithGeSourceData import TestWithGeSourceData
+
+class TestApiServer(TestWithGeSourceData):
+    GENOME = 'TestGenome'
+    TRACK_NAME = ['TestApiServer', 'segments']
+
+    def setUp(self):
+        self._tempDir = mkdtemp()
+        self._socketPath = os.path.join(self._tempDir, 'api.sock')
+        self._server = ApiServer(self._socketPath)
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def tearDown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._removeAllTrackData(self.TRACK_NAME[:1])
+        os.system('rm -Rf ' + self._tempDir)
+
+    def _forward(self, command, *args):
+        prevStdout, prevStderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = StringIO(), StringIO()
+        try:
+            succeeded = forwardToApiServer(command, args, socketPath=self._socketPath)
+            return succeeded, sys.stdout.getvalue()
+        finally:
+            sys.stdout, sys.stderr = prevStdout, prevStderr
+
+    def _importTrack(self, lines, baseFn='testfile.bed'):
+        fn = os.path.join(self._tempDir, baseFn)
+        with open(fn, 'w') as bedFile:
+            bedFile.write('\n'.join(lines))
+        succeeded, output = self._forward('importFile', fn, self.GENOME, ':'.join(self.TRACK_NAME))
+        self.assertTrue(succeeded)
+
+    def _getNumElements(self):
+        succeeded, output = self._forward('getTrackViewSummary', self.GENOME, ':'.join(self.TRACK_NAME), 'chr21:1-1000')
+        self.assertTrue(succeeded)
+        return int(output.splitlines()[-1].split()[-1])
+
+    def testForwardCommands(self):
+        self._importTrack(['chr21\t10\t20', 'chr21\t100\t200'])
+        self.assertEqual(2, self._getNumElements())
+
+        #Files of reimported tracks are not taken from the cache
+        self._importTrack(['chr21\t10\t20'])
+        self.assertEqual(1, self._getNumElements())
+
+    def testErrors(self):
+        self.assertFalse(self._forward('getTrackViewSummary', self.GENOME)[0])
+        self.assertFalse(self._forward('noSuchCommand')[0])
+        self.assertEqual(None, forwardToApiServer('listAvailableGenomes', [], \
+                                                  socketPath=os.path.join(self._tempDir, 'missing.sock')))
+
+    def testNonAsciiArgumentsAndOutput(self):
+        self._importTrack(['chr21\t10\t20'], baseFn='\xc3\xa6.bed')
+        self.assertEqual(1, self._getNumElements())
+
+        def _printUnicode():
+            print u'\xe6'
+        self._server._funcList['printUnicode'] = _printUnicode
+        self.assertEqual((True, '\xc3\xa6\n'), self._forward('printUnicode'))
+
+    def testInvalidReply(self):
+        socketPath = os.path.join(self._tempDir, 'silent.sock')
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(socketPath)
+        listener.listen(1)
+        thread = threading.Thread(target=lambda: listener.accept()[0].close())
+        thread.start()
+        try:
+            prevStderr = sys.stderr
+            sys.stderr = StringIO()
+            try:
+                self.assertEqual(False, forwardToApiServer('listAvailableGenomes', [], socketPath=socketPath))
+            finally:
+                sys.stderr = prevStderr
+        finally:
+            thread.join()
+            listener.close()
+
+    def runTest(self):
+        pass
+    
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import subprocess
+import unittest
+
+from tempfile import mkdtemp
+
+class TestImportTime(unittest.TestCase):
+    ENTRY_MODULES = ['gtrackcore.core.Api', 'gtrackcore.track.core.Track', 'gtrackcore.extract.TrackExtractor']
+    LAZILY_IMPORTED_MODULES = ['hotshot', 'profile', 'pstats', 'urllib', 'logging.handlers', \
+                               'gtrackcore.third_party.decorator', 'gtrackcore.util.HtmlCore', \
+                               'gtrackcore.util.TextCore', 'gtrackcore.extract.fileformats.GtrackComposer', \
+                               'gtrackcore.input.fileformats.GtrackGenomeElementSource']
+    #Generous, so that only severe regressions fail on slow machines
+    MAX_IMPORT_SECONDS = 5.0
+
+    def _runInFreshInterpreter(self, code):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output([sys.executable, '-c', code], env=env)
+        return json.loads(output.splitlines()[-1])
+
+    def testImportTime(self):
+        for module in self.ENTRY_MODULES:
+            importTime, loadedModules = self._runInFreshInterpreter( \
+                'import sys, time, json\n' + \
+                't = time.time()\n' + \
+                'import %s\n' % module + \
+                't = time.time() - t\n' + \
+                'print json.dumps([t, sorted(sys.modules)])')
+
+            self.assertTrue(importTime < self.MAX_IMPORT_SECONDS, \
+                            'Importing %s took %.3f seconds' % (module, importTime))
+            self.assertEqual([], [x for x in self.LAZILY_IMPORTED_MODULES if x in loadedModules])
+
+    def testConfigIsOnlyWrittenOnRequest(self):
+        tempDir = mkdtemp()
+        try:
+            for writeConfig in [False, True]:
+                configFn = os.path.join(tempDir, 'gtrackcore_config_%s' % writeConfig)
+                self._runInFreshInterpreter( \
+                    'import json\n' + \
+                    'from gtrackcore.core.Config import Config\n' + \
+                    'Config.initialize(configFileName=%s, dataDir=%s, writeConfig=%s)\n' % \
+                        (repr(configFn), repr(tempDir), writeConfig) + \
+                    'print json.dumps(Config.COMP_BIN_SIZE)')
+                self.assertEqual(writeConfig, os.path.exists(configFn))
+        finally:
+            os.system('rm -Rf ' + tempDir)
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
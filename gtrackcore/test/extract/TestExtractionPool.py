@@ -0,0 +1,82 @@
+import os
+import unittest
+
+from tempfile import mkdtemp
+from zipfile import ZipFile
+
+from gtrackcore.extract.ExtractionPool import ExtractionPool
+from gtrackcore.extract.TrackExtractor import TrackExtractor
+from gtrackcore.preprocess.PreProcessTracksJob import PreProcessAllTracksJob
+from gtrackcore.test.common.TestWithGeSourceData import TestWithGeSourceData
+from gtrackcore.track.core.GenomeRegion import GenomeRegion
+from gtrackcore.util.CommonFunctions import createOrigPath, ensurePathExists
+
+def _square(x):
+    return x * x
+
+class TestExtractionPool(TestWithGeSourceData):
+    GENOME = 'TestGenome'
+    TRACK_NAME = ['TestExtractionPool', 'segments']
+
+    def setUp(self):
+        self._tempDir = mkdtemp()
+
+    def tearDown(self):
+        self._removeAllTrackData(self.TRACK_NAME)
+        os.system('rm -Rf ' + self._tempDir)
+
+    def testRun(self):
+        progress = []
+        pool = ExtractionPool(numWorkers=2, progressCallback=lambda *args: progress.append(args))
+        self.assertEqual([1, 4, 9, 16], list(pool.run(_square, [1, 2, 3, 4])))
+        self.assertEqual([(1, 4, 1), (2, 4, 2), (3, 4, 3), (4, 4, 4)], progress)
+
+    def testJobsInFlightAreBounded(self):
+        class MockPool(object):
+            def __init__(self):
+                self.numSubmitted = 0
+            def apply_async(self, func, args):
+                self.numSubmitted += 1
+                return MockResult(func(*args))
+        class MockResult(object):
+            def __init__(self, result):
+                self._result = result
+            def get(self):
+                return self._result
+
+        pool = MockPool()
+        numYielded = 0
+        for result in ExtractionPool._iterBoundedResults(pool, _square, range(10), 3):
+            self.assertEqual(numYielded * numYielded, result)
+            numYielded += 1
+            self.assertTrue(pool.numSubmitted - numYielded <= 3)
+        self.assertEqual(10, numYielded)
+
+    def testExtractToZipFile(self):
+        fn = createOrigPath(self.GENOME, self.TRACK_NAME, 'testfile.bed')
+        ensurePathExists(fn)
+        with open(fn, 'w') as bedFile:
+            bedFile.write('\n'.join(['chr21\t10\t20', 'chr21\t500\t600', 'chrM\t100\t200']))
+        PreProcessAllTracksJob(self.GENOME, self.TRACK_NAME, username='Test').process()
+
+        regions = [GenomeRegion(self.GENOME, 'chr21', 0, 1000), GenomeRegion(self.GENOME, 'chrM', 0, 50), \
+                   GenomeRegion(self.GENOME, 'chrM', 0, 1000)]
+        contentsList = []
+        for numWorkers in [1, 3]:
+            zipFn = os.path.join(self._tempDir, '%s.zip' % numWorkers)
+            TrackExtractor.extractOneTrackManyToRegionFilesInOneZipFile(self.TRACK_NAME, regions, zipFn, \
+                                                                        fileFormatName='BED', numWorkers=numWorkers)
+            zipFile = ZipFile(zipFn)
+            contentsList.append([(name, zipFile.read(name)) for name in zipFile.namelist()])
+
+        self.assertEqual(contentsList[0], contentsList[1])
+        #The temporary files are removed
+        self.assertEqual(['1.zip', '3.zip'], sorted(os.listdir(self._tempDir)))
+        self.assertEqual(['chr21_1-1000.bed', 'chrM_1-1000.bed'], [name for name, contents in contentsList[0]])
+        self.assertTrue('\t500\t600' in contentsList[0][0][1])
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import gzip
+import struct
+import unittest
+
+from multiprocessing.pool import ThreadPool
+from tempfile import mkdtemp
+from shutil import rmtree
+
+from gtrackcore.extract.fileformats.CompressedOutputFile import BlockGzipFile, BgzfFile, openOutputFile
+from gtrackcore.util.CustomExceptions import ArgumentValueError
+
+class SmallBlockGzipFile(BlockGzipFile):
+    BLOCK_SIZE = 10000
+
+class TestCompressedOutputFile(unittest.TestCase):
+    def setUp(self):
+        self._tempDir = mkdtemp()
+        self._fn = os.path.join(self._tempDir, 'out.gz')
+        self._contents = ''.join('chr%i\t%i\t%i\n' % (i % 3, i, i + 10) for i in xrange(20000))
+
+    def tearDown(self):
+        rmtree(self._tempDir)
+
+    def _writeInPieces(self, outFile):
+        for i in xrange(0, len(self._contents), 777):
+            outFile.write(self._contents[i:i+777])
+        outFile.close()
+
+    def _readGzip(self):
+        gzFile = gzip.open(self._fn)
+        contents = gzFile.read()
+        gzFile.close()
+        return contents
+
+    def testBlockGzipFile(self):
+        for numThreads in [1, 4]:
+            self._writeInPieces(SmallBlockGzipFile(self._fn, numThreads=numThreads))
+            self.assertEqual(self._contents, self._readGzip())
+
+    def testBgzfFile(self):
+        self._writeInPieces(BgzfFile(self._fn, numThreads=3))
+        self.assertEqual(self._contents, self._readGzip())
+
+        data = open(self._fn, 'rb').read()
+        indexData = open(self._fn + '.gzi', 'rb').read()
+        numEntries = struct.unpack('<Q', indexData[:8])[0]
+        offsets = [struct.unpack('<QQ', indexData[8+16*i:24+16*i]) for i in xrange(numEntries)]
+        self.assertEqual(len(self._contents) / BgzfFile.BLOCK_SIZE, numEntries)
+
+        for compressedOffset, uncompressedOffset in offsets:
+            self.assertEqual('\x1f\x8b\x08\x04', data[compressedOffset:compressedOffset+4])
+            self.assertEqual(BgzfFile.BLOCK_SIZE * (offsets.index((compressedOffset, uncompressedOffset)) + 1), \
+                             uncompressedOffset)
+        self.assertEqual(28, len(data) - data.rindex('\x1f\x8b\x08\x04'))
+
+    def testEmptyFile(self):
+        for compression in ['gzip', 'bgzf']:
+            openOutputFile(self._fn, compression).close()
+            self.assertTrue(os.path.getsize(self._fn) > 0)
+            self.assertEqual('', self._readGzip())
+
+    def testSharedPool(self):
+        pool = ThreadPool(2)
+        try:
+            for i in range(2):
+                self._writeInPieces(SmallBlockGzipFile(self._fn, pool=pool))
+                self.assertEqual(self._contents, self._readGzip())
+        finally:
+            pool.terminate()
+
+    def testUnsupportedCompression(self):
+        self.assertRaises(ArgumentValueError, openOutputFile, self._fn, 'lzma')
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
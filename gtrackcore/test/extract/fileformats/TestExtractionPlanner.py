@@ -0,0 +1,48 @@
+import unittest
+
+from gtrackcore.extract.fileformats.ExtractionPlanner import ExtractionPlanner
+from gtrackcore.input.core.GenomeElement import GenomeElement
+
+class CountingGESource(object):
+    def __init__(self, geList):
+        self._geList = geList
+        self.numIterations = 0
+
+    def __iter__(self):
+        self.numIterations += 1
+        return self._geList.__iter__()
+
+class TestExtractionPlanner(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def testElementStatistics(self):
+        geSource = CountingGESource([GenomeElement(None, 'chr21', 10, 20, val=5), \
+                                     GenomeElement('TestGenome', 'chr21', 30, 40, val=900), \
+                                     GenomeElement(None, 'chr21', 50, 60, val=-1)])
+        planner = ExtractionPlanner(geSource)
+
+        self.assertTrue(planner.anyElementHasGenome())
+        self.assertEqual((-1, 900), planner.getValRange())
+        self.assertFalse(planner.allValsAreInRange(0, 1000))
+        self.assertTrue(planner.allValsAreInRange(-1, 1000))
+        self.assertFalse(planner.isEmpty())
+        self.assertEqual(1, geSource.numIterations)
+
+    def testNonNumberValues(self):
+        planner = ExtractionPlanner([GenomeElement('TestGenome', 'chr21', 10, 20, val=5), \
+                                     GenomeElement('TestGenome', 'chr21', 30, 40)])
+        self.assertEqual(None, planner.getValRange())
+        self.assertFalse(planner.allValsAreInRange(0, 1000))
+
+    def testEmpty(self):
+        planner = ExtractionPlanner([])
+        self.assertTrue(planner.isEmpty())
+        self.assertFalse(planner.anyElementHasGenome())
+        self.assertTrue(planner.allValsAreInRange(0, 1000))
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import sys
+import numpy
 import unittest
 
+from cStringIO import StringIO
 from tempfile import NamedTemporaryFile
 
 import gtrackcore.test
@@ -11,6 +13,7 @@ from gtrackcore.extract.fileformats.BedGraphComposer import BedGraphComposer
 from gtrackcore.extract.fileformats.WigComposer import WigComposer
 from gtrackcore.extract.fileformats.GffComposer import GffComposer
 from gtrackcore.extract.fileformats.FastaComposer import FastaComposer
+from gtrackcore.extract.fileformats.FileFormatComposer import FileFormatComposer
 from gtrackcore.input.adapters.TrackGenomeElementSource import TrackGenomeElementSource
 from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
 from gtrackcore.input.userbins.UserBinSource import GlobalBinSource
@@ -22,6 +25,17 @@ from gtrackcore.test.common.TestWithGeSourceData import TestWithGeSourceData
 
 PreProcessAllTracksJob.PASS_ON_EXCEPTIONS = True
 
+class LineComposer(FileFormatComposer):
+    def __init__(self, numLines, failAtLine=None):
+        self._numLines = numLines
+        self._failAtLine = failAtLine
+
+    def _compose(self, out):
+        for i in xrange(self._numLines):
+            if i == self._failAtLine:
+                raise ValueError('Error in line %i' % i)
+            print >>out, 'line', i
+
 class TestFileFormatComposers(TestWithGeSourceData, TestCaseWithImprovedAsserts):
     GENOME = 'TestGenome'
     TRACK_NAME_PREFIX = ['TestGenomeElementSource']
@@ -98,6 +112,55 @@ class TestFileFormatComposers(TestWithGeSourceData, TestCaseWithImprovedAsserts)
     def testFastaFromTrackComposer(self):
         self._commonTestComposer(withTrackGESource=True, composerCls=FastaComposer, suffix='fasta')
 
+    def testColumnFormatting(self):
+        composer = object.__new__(BedGraphComposer)
+        vals = numpy.array([1.5, numpy.nan, -3, 1e10])
+        self.assertEqual([composer._commonFormatNumberVal(val) for val in vals], \
+                         composer._commonFormatNumberColumn(vals))
+        self.assertEqual(['1', '.', '0'], composer._commonFormatBinaryColumn(numpy.array([1, -1, 0], dtype='int8')))
+
+        out = StringIO()
+        composer._writeColumns(out, [['chr1', 'chr1'], [10, 20], ['a', 'b']])
+        self.assertEqual('chr1\t10\ta\nchr1\t20\tb\n', out.getvalue())
+
+    def testGtrackColumnFormatting(self):
+        composer = object.__new__(StdGtrackComposer)
+        composer._headerDict = {'value type': 'number', 'value dimension': 'scalar'}
+
+        phrases = numpy.array(['a b', 'x#y', 'z\tw', '', 'v;.'])
+        self.assertEqual(['a b', 'x%23y', 'z%09w', '', 'v;.'], composer._formatPhraseColumn(phrases, '#\t'))
+        self.assertEqual(['a b', 'x%23y', 'z%09w', '', 'v%3B%2E'], composer._formatPhraseColumn(phrases, '#.,;=\t'))
+
+        for valueType, vals in [('number', numpy.array([1.5, numpy.nan, -3])), \
+                                ('number', numpy.array([1, 0, -3], dtype='int32')), \
+                                ('binary', numpy.array([1, -1, 0], dtype='int8')), \
+                                ('category', numpy.array(['a', '', 'b,c']))]:
+            composer._headerDict['value type'] = valueType
+            formatValue = composer._getValueFormatter()
+            self.assertEqual([formatValue(val) for val in vals], \
+                             [str(x) for x in composer._getValueColumnFormatter()(vals)])
+
+    def testFastaSequenceLines(self):
+        composer = object.__new__(FastaComposer)
+        for seqLen in [0, 5, 60, 130]:
+            seq = ''.join('ACGT'[i % 4] for i in range(seqLen))
+            out = StringIO()
+            composer._composeSequenceLines(out, seq)
+            self.assertEqual(''.join(seq[i:i+60] + '\n' for i in range(0, seqLen, 60)), out.getvalue())
+
+    def testIterComposed(self):
+        composer = LineComposer(1000)
+        for chunkSize in [1, 100, 100000]:
+            chunks = list(composer.iterComposed(chunkSize=chunkSize, maxQueuedChunks=1))
+            self.assertEqual(composer.returnComposed(), ''.join(chunks))
+            self.assertTrue(all(len(chunk) >= chunkSize for chunk in chunks[:-1]))
+
+        self.assertRaises(ValueError, list, LineComposer(1000, failAtLine=500).iterComposed(chunkSize=100))
+
+        chunkIter = composer.iterComposed(chunkSize=100, maxQueuedChunks=1)
+        self.assertTrue(chunkIter.next().startswith('line 0\n'))
+        chunkIter.close()
+
     def _commonTestComposer(self, withTrackGESource, composerCls, suffix):
         geSourceTest = self._commonSetup()
 
@@ -0,0 +1,68 @@
+import os
+import unittest
+
+from tempfile import NamedTemporaryFile
+
+from gtrackcore.gtrack.FullInfoDict import IdFullInfoDict, TupleFullInfoDict, removeKeyIndexes
+from gtrackcore.input.core.GenomeElement import GenomeElement
+from gtrackcore.input.fileformats.GtrackGenomeElementSource import GtrackGenomeElementSource
+from gtrackcore.util.CustomExceptions import InvalidFormatError
+
+class TestFullInfoDict(unittest.TestCase):
+    def setUp(self):
+        self._dbFile = NamedTemporaryFile(suffix='.gtrack')
+        self._dbFile.write('\n'.join( \
+           ['##track type: points',
+            '\t'.join(['###seqid', 'start', 'other', 'id']),
+            '\t'.join(['chrM', '300', 'b', 'B']),
+            '\t'.join(['chrM', '100', 'a', 'A']),
+            '\t'.join(['chr21', '100', 'c', 'C']),
+            '\t'.join(['chr21', '100', 'd', 'D'])]))
+        self._dbFile.flush()
+
+        self._dbGESource = GtrackGenomeElementSource(self._dbFile.name, 'TestGenome')
+        self._columns = self._dbGESource.getPrefixList()
+
+    def tearDown(self):
+        removeKeyIndexes(self._dbFile.name)
+        self._dbFile.close()
+
+    def testIdLookup(self):
+        fullInfoDict = IdFullInfoDict(self._dbGESource, self._columns)
+        self.assertEqual(4, len(fullInfoDict))
+
+        self.assertEqual('a', fullInfoDict.get(GenomeElement('TestGenome', id='A'))['other'])
+        self.assertEqual(300, fullInfoDict[GenomeElement('TestGenome', id='B')]['start'])
+        self.assertEqual(None, fullInfoDict.get(GenomeElement('TestGenome', id='AA')))
+        self.assertTrue(GenomeElement('TestGenome', id='D') in fullInfoDict)
+        self.assertFalse(GenomeElement('TestGenome', id='E') in fullInfoDict)
+
+        records = fullInfoDict.getBatch([GenomeElement('TestGenome', id=id) for id in ['B', 'X', 'A']])
+        self.assertEqual(['b', None, 'a'], [rec['other'] if rec is not None else None for rec in records])
+
+    def testPositionLookup(self):
+        fullInfoDict = TupleFullInfoDict(self._dbGESource, self._columns)
+
+        self.assertEqual('A', fullInfoDict.get(GenomeElement('TestGenome', 'chrM', 100))['id'])
+        self.assertEqual(None, fullInfoDict.get(GenomeElement('TestGenome', 'chrM', 200)))
+        self.assertRaises(InvalidFormatError, fullInfoDict.get, GenomeElement('TestGenome', 'chr21', 100))
+
+    def testIndexIsReused(self):
+        fullInfoDict = IdFullInfoDict(self._dbGESource, self._columns)
+        indexDir = fullInfoDict.getIndexDirName()
+        self.assertTrue(os.path.exists(indexDir))
+        #Nothing is stored next to the database file
+        self.assertEqual([os.path.basename(self._dbFile.name)], \
+                         [fn for fn in os.listdir(os.path.dirname(self._dbFile.name)) \
+                          if fn.startswith(os.path.basename(self._dbFile.name))])
+
+        mtime = os.path.getmtime(os.sep.join([indexDir, 'keys.npy']))
+        fullInfoDict = IdFullInfoDict(self._dbGESource, self._columns)
+        self.assertEqual(mtime, os.path.getmtime(os.sep.join([indexDir, 'keys.npy'])))
+        self.assertEqual('b', fullInfoDict.get(GenomeElement('TestGenome', id='B'))['other'])
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,11 +2,19 @@ import unittest
 
 from tempfile import NamedTemporaryFile
 
+from gtrackcore.gtrack.FullInfoDict import removeKeyIndexes
 from gtrackcore.gtrack.GtrackComplementer import complementGtrackFileAndReturnContents
 from gtrackcore.test.common.Asserts import TestCaseWithImprovedAsserts
 from gtrackcore.util.CustomExceptions import InvalidFormatError
  
 class TestGtrackComplementer(TestCaseWithImprovedAsserts):
+    def setUp(self):
+        self._tempFiles = []
+
+    def tearDown(self):
+        for f in self._tempFiles:
+            removeKeyIndexes(f.name)
+
     def testUsingElementId(self):
         contents1 = '\n'.join(\
            ['##track type: valued segments',
@@ -136,6 +144,7 @@ class TestGtrackComplementer(TestCaseWithImprovedAsserts):
         f = NamedTemporaryFile(suffix='.gtrack')
         f.write(contents)
         f.seek(0)
+        self._tempFiles.append(f)
         return f
         
     def runTest(self):
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+
+from gtrackcore.core.Config import Config
+from gtrackcore.input.adapters.ClusteredTrackGenomeElementSource import ArrayOverlapClusterer
+from gtrackcore.util.CommonConstants import BINARY_MISSING_VAL
+
+class TestArrayOverlapClusterer(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def _assertArrays(self, expected, array):
+        self.assertEqual(expected, array.tolist())
+
+    def testSegments(self):
+        starts = np.array([0, 2, 9, 10, 20, 20, 30], dtype='int32')
+        ends = np.array([10, 5, 15, 12, 20, 20, 40], dtype='int32')
+        clusterer = ArrayOverlapClusterer(starts, ends)
+
+        self.assertEqual(4, clusterer.getNumClusters())
+        self._assertArrays([0, 20, 20, 30], clusterer.getStarts(starts))
+        self._assertArrays([15, 20, 20, 40], clusterer.getEnds(ends))
+
+        clusterer = ArrayOverlapClusterer(np.array([], dtype='int32'), np.array([], dtype='int32'))
+        self.assertEqual(0, clusterer.getNumClusters())
+
+    def testPoints(self):
+        starts = np.array([0, 10, 10, 11], dtype='int32')
+        clusterer = ArrayOverlapClusterer(starts)
+
+        self.assertEqual(3, clusterer.getNumClusters())
+        self._assertArrays([0, 10, 11], clusterer.getStarts(starts))
+
+    def testContents(self):
+        clusterer = ArrayOverlapClusterer(np.array([0, 0, 0, 20, 20, 30]), np.array([10, 10, 10, 30, 30, 40]))
+
+        vals = clusterer.getEqualOrMissing(np.array([3.0, 3.0, 3.0, 3.0, 4.0, 5.0]), np.nan)
+        self.assertEqual([3.0, 5.0], vals[[0, 2]].tolist())
+        self.assertTrue(np.isnan(vals[1]))
+
+        strands = clusterer.getEqualOrMissing(np.array([1, 1, 1, 0, 1, 0], dtype='int8'), BINARY_MISSING_VAL)
+        self._assertArrays([1, BINARY_MISSING_VAL, 0], strands)
+
+        vals = clusterer.getEqualOrMissing(np.array([[3, 4], [3, 4], [3, 4], [3, 4], [4, 4], [1, 2]]), 0)
+        self._assertArrays([[3, 4], [0, 0], [1, 2]], vals)
+
+        self._assertArrays(['a', 'a|b', 'c'], \
+            clusterer.getConcatenated(np.array(['a', 'a', 'a', 'b', 'a', 'c']), sortContents=True))
+        self._assertArrays(['a', 'b|a', 'c'], \
+            clusterer.getConcatenated(np.array(['a', 'a', 'a', 'b', 'a', 'c']), sortContents=False))
+
+        numEls = Config.MAX_CONCAT_LEN_FOR_OVERLAPPING_ELS
+        clusterer = ArrayOverlapClusterer(np.zeros(numEls, dtype='int32'), np.ones(numEls, dtype='int32'))
+        self._assertArrays(['b|...'], clusterer.getConcatenated(np.array(['b'] + ['a'] * (numEls-1)), sortContents=False))
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
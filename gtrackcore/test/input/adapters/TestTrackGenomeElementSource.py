@@ -0,0 +1,43 @@
+import unittest
+
+from gtrackcore.input.adapters.TrackGenomeElementSource import TrackGenomeElementSource
+from gtrackcore.metadata.TrackInfo import TrackInfo
+from gtrackcore.preprocess.PreProcessTracksJob import PreProcessAllTracksJob
+from gtrackcore.test.common.TestWithGeSourceData import TestWithGeSourceData
+from gtrackcore.track.core.GenomeRegion import GenomeRegion
+from gtrackcore.util.CommonFunctions import createOrigPath, ensurePathExists
+
+class TestTrackGenomeElementSource(TestWithGeSourceData):
+    GENOME = 'TestGenome'
+    TRACK_NAME = ['TestTrackGenomeElementSource', 'fixedGaps']
+
+    def setUp(self):
+        fn = createOrigPath(self.GENOME, self.TRACK_NAME, 'testfile.bed')
+        ensurePathExists(fn)
+        with open(fn, 'w') as bedFile:
+            bedFile.write('\n'.join('chr21\t%s\t%s' % (start, start + 10) for start in range(0, 300, 15)))
+        PreProcessAllTracksJob(self.GENOME, self.TRACK_NAME, username='Test').process()
+
+    def tearDown(self):
+        self._removeAllTrackData(self.TRACK_NAME[:1])
+
+    def testStoredFixedLengthAndGapSize(self):
+        ti = TrackInfo(self.GENOME, self.TRACK_NAME)
+        self.assertEqual(10, ti.fixedLengths[False])
+        self.assertEqual(5, ti.fixedGapSizes[False])
+
+        for start, end, fixedLength, fixedGapSize in [(0, 1000, 10, 5), (15, 100, 10, 5), (3, 100, 1, 0), (15, 95, 1, 0), \
+                                                      (26, 100, 10, 0), (20, 100, 1, 0), (0, 5, 5, 0), (400, 500, 1, 0)]:
+            regions = [GenomeRegion(self.GENOME, 'chr21', start, end)]
+            geSource = TrackGenomeElementSource(self.GENOME, self.TRACK_NAME, regions, printWarnings=False)
+            self.assertEqual((fixedLength, fixedGapSize), (geSource.getFixedLength(), geSource.getFixedGapSize()))
+
+            geSource = TrackGenomeElementSource(self.GENOME, self.TRACK_NAME, regions, printWarnings=False)
+            geSource._getStoredFixedLengthAndGapSize = lambda: (None, None)
+            self.assertEqual((fixedLength, fixedGapSize), (geSource.getFixedLength(), geSource.getFixedGapSize()))
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
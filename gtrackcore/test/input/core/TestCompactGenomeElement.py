@@ -0,0 +1,103 @@
+import copy
+import cPickle
+import unittest
+
+from gtrackcore.input.core.CompactGenomeElement import CompactGenomeElement, GenomeElementSchema
+from gtrackcore.input.core.GenomeElement import GenomeElement
+from gtrackcore.track.core.GenomeRegion import GenomeRegion
+from gtrackcore.util.CustomExceptions import NotSupportedError
+
+class TestCompactGenomeElement(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def testAssignAndRetrieve(self):
+        e = CompactGenomeElement('TestGenome', start=5, val=1.0, extra={'a':1,'b':2}, orderedExtraKeys=['a','b'])
+        self.assertEqual(e.genome, 'TestGenome')
+        self.assertEqual(e.chr, None)
+        self.assertEqual(e.start, 5)
+        self.assertEqual(e.end, None)
+        self.assertEqual(e.val, 1.0)
+        self.assertEqual(e.strand, None)
+        self.assertEqual(e.a, 1)
+        self.assertEqual(e.b, 2)
+        self.assertEqual(e.extra, {'a':1,'b':2})
+        self.assertEqual(e.orderedExtraKeys, ['a', 'b'])
+
+        e = CompactGenomeElement('TestGenome', a=1)
+        e.b = 2
+        e.chr = 'chr21'
+        self.assertEqual(e.chr, 'chr21')
+        self.assertEqual(e.a, 1)
+        self.assertEqual(e.b, 2)
+        self.assertEqual(e.extra, {'a':1,'b':2})
+        self.assertEqual(e.orderedExtraKeys, ['a', 'b'])
+
+        self.assertRaises(AttributeError, lambda : e.nonExisting)
+        self.assertEqual(None, getattr(e, 'nonExisting', None))
+
+    def testSharedSchema(self):
+        schema = GenomeElementSchema()
+        e1 = CompactGenomeElement('TestGenome', schema=schema)
+        e2 = CompactGenomeElement('TestGenome', schema=schema)
+        e1.a = 1
+        e2.b = 2
+        e2.a = 3
+
+        self.assertEqual(['a', 'b'], schema.orderedExtraKeys)
+        self.assertEqual(['a'], e1.orderedExtraKeys)
+        self.assertEqual(['a', 'b'], e2.orderedExtraKeys)
+        self.assertRaises(AttributeError, lambda : e1.b)
+        self.assertEqual({'a':3, 'b':2}, e2.extra)
+
+    def testAssignExtra(self):
+        schema = GenomeElementSchema()
+        e = CompactGenomeElement('TestGenome', schema=schema, a='x')
+        e.extra = {'b': 'y'}
+        self.assertEqual({'b': 'y'}, e.extra)
+        self.assertEqual(['b'], e.orderedExtraKeys)
+        self.assertRaises(AttributeError, lambda : e.a)
+        self.assertEqual(['a', 'b'], schema.orderedExtraKeys)
+
+        #The extra dict is a snapshot
+        e.extra['b'] = 'z'
+        self.assertEqual('y', e.b)
+
+        e.extra = None
+        self.assertEqual({}, e.extra)
+        self.assertRaises(NotSupportedError, setattr, e, 'orderedExtraKeys', ['a'])
+
+    def testGetCopy(self):
+        e = CompactGenomeElement('TestGenome', 'chr21', 10, 100, a=1)
+        eCopy = e.getCopy()
+        eCopy.a = 2
+        eCopy.start = 20
+
+        self.assertEqual((10, 1), (e.start, e.a))
+        self.assertEqual((20, 2), (eCopy.start, eCopy.a))
+        self.assertTrue(e.getSchema() is eCopy.getSchema())
+
+        self.assertRaises(NotSupportedError, copy.copy, e)
+        self.assertEqual(e, copy.deepcopy(e))
+        self.assertEqual(e, cPickle.loads(cPickle.dumps(e, cPickle.HIGHEST_PROTOCOL)))
+
+    def testCompatibility(self):
+        e = CompactGenomeElement('TestGenome', 'chr21', 10, 100, 1.0, True, id='x', a='1')
+        ge = GenomeElement('TestGenome', 'chr21', 10, 100, 1.0, True, id='x', a='1')
+
+        self.assertEqual(ge, e)
+        self.assertEqual(e, ge)
+        self.assertEqual(ge, e.toGenomeElement())
+        self.assertEqual(str(ge), str(e))
+        self.assertEqual(ge.toStr(), e.toStr())
+        self.assertEqual(90, len(e))
+
+        self.assertTrue(GenomeRegion('TestGenome', 'chr21', 0, 200).contains(e))
+        self.assertTrue(e.overlaps(CompactGenomeElement('TestGenome', 'chr21', 90, 110)))
+        self.assertFalse(e.overlaps(CompactGenomeElement('TestGenome', 'chr21', 100, 110)))
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
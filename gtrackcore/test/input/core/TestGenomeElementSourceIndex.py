@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
+from gtrackcore.input.core.GenomeElementSourceIndex import GenomeElementSourceIndex, getIndexFileName
+from gtrackcore.input.wrappers.GESourceWrapper import RegionGESourceWrapper
+from gtrackcore.track.core.GenomeRegion import GenomeRegion
+from gtrackcore.util.CustomExceptions import NotSupportedError
+
+class TestGenomeElementSourceIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmpDir = tempfile.mkdtemp()
+        self._binSize = GenomeElementSourceIndex.BIN_SIZE
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpDir)
+
+    def _createFile(self, contents, suffix='bed'):
+        fn = os.path.join(self._tmpDir, 'test.' + suffix)
+        with open(fn, 'w') as f:
+            f.write(contents)
+        return fn
+
+    def _getSortedBedContents(self):
+        binSize = self._binSize
+        chr21Regions = sorted([(i*binSize/2, i*binSize/2 + 100) for i in xrange(20)] + \
+                              [(2*binSize - 10, 6*binSize)])
+        lines = ['track name=test'] + \
+                ['chr21\t%s\t%s' % region for region in chr21Regions] + \
+                ['chrM\t%s\t%s' % (i*10, i*10 + 5) for i in xrange(10)]
+        return os.linesep.join(lines) + os.linesep
+
+    def _assertRegion(self, geSource, region):
+        expected = [(ge.chr, ge.start, ge.end) for ge in geSource \
+                    if ge.chr == region.chr and ge.start < region.end and ge.end > region.start]
+        self.assertEqual(expected, [(ge.chr, ge.start, ge.end) for ge in geSource.iterRegion(region)])
+
+    def testIterRegion(self):
+        fn = self._createFile(self._getSortedBedContents())
+        geSource = GenomeElementSource(fn, genome='TestGenome')
+        self.assertTrue(geSource.isIndexable())
+
+        binSize = self._binSize
+        for start, end in [(0, 10), (0, binSize), (binSize/2 + 50, binSize/2 + 51), (binSize - 1, 3*binSize), \
+                           (3*binSize, 4*binSize), (5*binSize, 100*binSize), (200*binSize, 300*binSize)]:
+            self._assertRegion(geSource, GenomeRegion('TestGenome', 'chr21', start, end))
+
+        self._assertRegion(geSource, GenomeRegion('TestGenome', 'chrM', 12, 42))
+        self.assertEqual([], list(geSource.iterRegion(GenomeRegion('TestGenome', 'chr1', 0, binSize))))
+
+        self.assertTrue(os.path.exists(getIndexFileName(fn)))
+
+    def testStoredIndex(self):
+        fn = self._createFile(self._getSortedBedContents())
+        index = GenomeElementSourceIndex(GenomeElementSource(fn, genome='TestGenome'))
+        self.assertFalse(index.isUpToDate())
+        index.create()
+
+        storedIndex = GenomeElementSourceIndex(GenomeElementSource(fn, genome='TestGenome'))
+        self.assertTrue(storedIndex.isUpToDate())
+        self.assertEqual(sorted(['chr21', 'chrM']), sorted(storedIndex.getChrs()))
+        self.assertEqual(index.getOffset('chr21', 3*self._binSize), storedIndex.getOffset('chr21', 3*self._binSize))
+
+        with open(fn, 'a') as f:
+            f.write('chrM\t1000\t1010' + os.linesep)
+        self.assertFalse(GenomeElementSourceIndex(GenomeElementSource(fn, genome='TestGenome')).isUpToDate())
+
+    def testUnsortedFile(self):
+        fn = self._createFile('chr21\t100\t200\nchr21\t10\t20\n')
+        geSource = GenomeElementSource(fn, genome='TestGenome')
+        self.assertRaises(NotSupportedError, geSource.getIndex)
+
+        fn = self._createFile('chr21\t10\t20\nchrM\t10\t20\nchr21\t100\t200\n')
+        geSource = GenomeElementSource(fn, genome='TestGenome')
+        self.assertRaises(NotSupportedError, geSource.getIndex)
+
+    def testRegionGESourceWrapper(self):
+        fn = self._createFile('chr21\t10\t20\t1.0\nchr21\t30\t40\t2.0\nchrM\t10\t20\t3.0\n', suffix='bedgraph')
+        regions = [GenomeRegion('TestGenome', 'chr21', 15, 35), GenomeRegion('TestGenome', 'chrM', 0, 5)]
+        geSource = RegionGESourceWrapper(GenomeElementSource(fn, genome='TestGenome'), regions)
+
+        self.assertEqual([('chr21', 10, 20, 1.0), ('chr21', 30, 40, 2.0)], \
+                         [(ge.chr, ge.start, ge.end, ge.val) for ge in geSource])
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
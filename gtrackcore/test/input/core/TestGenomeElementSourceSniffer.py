@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from gtrackcore.input.core.GenomeElement import GenomeElement
+from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
+from gtrackcore.input.core.GenomeElementSourceSniffer import GenomeElementSourceSniffer, sniffFileSuffix
+from gtrackcore.input.fileformats.BedGenomeElementSource import BedGenomeElementSource
+from gtrackcore.input.fileformats.BedGraphGenomeElementSource import BedGraphGenomeElementSource
+from gtrackcore.input.fileformats.GffGenomeElementSource import GffGenomeElementSource
+from gtrackcore.input.fileformats.GtrackGenomeElementSource import GtrackGenomeElementSource
+from gtrackcore.input.wrappers.GEDependentAttributesHolder import GEDependentAttributesHolder
+from gtrackcore.preprocess.memmap.OutputFile import OutputFile
+from gtrackcore.util.CustomExceptions import NotSupportedError
+
+class TestGenomeElementSourceSniffer(unittest.TestCase):
+    def setUp(self):
+        self._tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpDir)
+
+    def _createFile(self, lines, fn='test'):
+        fn = os.path.join(self._tmpDir, fn)
+        with open(fn, 'w') as f:
+            f.write(os.linesep.join(lines) + os.linesep)
+        return fn
+
+    def testSniffFileSuffix(self):
+        for suffix, geSourceCls, lines in \
+            [('bed', BedGenomeElementSource, ['chr21\t10\t20\tname1', 'chr21\t30\t40\tname2']),
+             ('bedgraph', BedGraphGenomeElementSource, ['chr21\t10\t20\t1.5', 'chr21\t30\t40\t-2']),
+             ('bedgraph', BedGraphGenomeElementSource, ['track type=bedGraph', 'chr21\t10\t20\t1.5']),
+             ('gff', GffGenomeElementSource, ['chr21\tsrc\tgene\t11\t20\t.\t+\t.\tID=a']),
+             ('gtrack', GtrackGenomeElementSource, ['##gtrack version: 1.0', '###seqid\tstart\tend', 'chr21\t10\t20']),
+             ('fa', None, ['>chrM', 'ACGT'])]:
+            fn = self._createFile(lines)
+            self.assertEqual(suffix, sniffFileSuffix(fn))
+            if geSourceCls is not None:
+                self.assertEqual(geSourceCls, type(GenomeElementSource(fn, genome='TestGenome')))
+
+        fn = self._createFile(['some text'])
+        self.assertEqual(None, sniffFileSuffix(fn))
+        self.assertRaises(NotSupportedError, GenomeElementSource, fn, genome='TestGenome')
+
+    def testSample(self):
+        fn = self._createFile(['chr21\t10\t20\ta', 'chr21\t30\t40\tbb', 'chrM\t10\t20\tccccc'], fn='test.bed')
+        geSource = GenomeElementSource(fn, genome='TestGenome')
+
+        sniffer = GenomeElementSourceSniffer(geSource, sampleSize=2)
+        self.assertFalse(sniffer.isExhaustive())
+        self.assertEqual(2, len(sniffer.getSample()))
+        self.assertEqual({'name': 2}, dict(sniffer.getMaxStrLens()))
+
+        sniffer = GenomeElementSourceSniffer(geSource, sampleSize=3)
+        self.assertTrue(sniffer.isExhaustive())
+        self.assertEqual({'name': 5}, dict(sniffer.getMaxStrLens()))
+
+    def testValDimFromSample(self):
+        fn = self._createFile(['##track type: function', '##value dimension: vector', '###value',
+                               '####seqid=chrM; start=10; end=12', '4.5,1', '-3.7,2'], fn='test.gtrack')
+        geSource = GenomeElementSource(fn, genome='TestGenome')
+        self.assertEqual(None, geSource.getValDim())
+        self.assertEqual(2, GEDependentAttributesHolder(geSource).getValDim())
+
+    def testWidenOutputFile(self):
+        outputFile = OutputFile(self._tmpDir, 'id', 2, maxStrLens={'id': 2})
+        outputFile.writeElement(GenomeElement('TestGenome', id='ab'))
+        outputFile.writeElement(GenomeElement('TestGenome', id='abcd'))
+        outputFile.close()
+
+        self.assertEqual(['id.S4'], os.listdir(self._tmpDir))
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
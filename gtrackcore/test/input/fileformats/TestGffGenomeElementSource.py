@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
+from gtrackcore.input.fileformats.FastaGenomeElementSource import FastaGenomeElementSource
+from gtrackcore.input.fileformats.GffGenomeElementSource import GffGenomeElementSource
+from gtrackcore.util.CustomExceptions import InvalidFormatError
+
+class TestGffGenomeElementSource(unittest.TestCase):
+    def setUp(self):
+        self._tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpDir)
+
+    def _createFile(self, lines, suffix='gff3'):
+        fn = os.path.join(self._tmpDir, 'test.' + suffix)
+        with open(fn, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        return fn
+
+    def _getDataLines(self, numLines):
+        lines = ['##gff-version 3']
+        for i in xrange(numLines):
+            attributes = ['ID=gene%s' % i, 'Name=My%%3Bgene%s' % i, 'Note=x', 'Parent=gene0', '']
+            lines.append('\t'.join(['chr21', 'src', 'gene', str(10*i + 1), str(10*i + 5), str(i), '+-.'[i % 3], '0', \
+                                    ';'.join(attributes[i % 5:])]))
+            if i % 100 == 0:
+                lines.append('# comment')
+        return lines
+
+    def _getElementTuples(self, geIter):
+        return [(ge.chr, ge.start, ge.end, ge.val, ge.strand, ge.id, tuple(ge.orderedExtraKeys), ge.extra) \
+                for ge in geIter]
+
+    def _getLineByLineElementTuples(self, geSource):
+        geIter = geSource._getIterWithFile()
+        geList = []
+        while True:
+            try:
+                ge = GenomeElementSource.next(geIter)
+            except StopIteration:
+                break
+            geList.append(ge)
+        return self._getElementTuples(geList)
+
+    def testBatchParsing(self):
+        numLines = 3 * GffGenomeElementSource.MAX_BATCH_SIZE + 17
+        fn = self._createFile(self._getDataLines(numLines))
+        geSource = GenomeElementSource(fn, genome='TestGenome')
+
+        elTuples = self._getElementTuples(geSource)
+        self.assertEqual(numLines, len(elTuples))
+        self.assertEqual(self._getLineByLineElementTuples(geSource), elTuples)
+
+        self.assertEqual(('chr21', 10, 15, 1.0, False, None, ('source', 'type', 'phase', 'attributes', 'name'), \
+                          {'source': 'src', 'type': 'gene', 'phase': '0', 'name': 'My;gene1', \
+                           'attributes': 'Name=My;gene1;Note=x;Parent=gene0;'}), elTuples[1])
+        self.assertEqual('gene0', elTuples[0][5])
+
+    def testInvalidLines(self):
+        lines = self._getDataLines(10)
+        lines[3] = lines[3].replace('chr21', 'chrUnknown')
+        fn = self._createFile(lines)
+        geSource = GenomeElementSource(fn, genome='TestGenome', printWarnings=False)
+
+        geIter = iter(geSource)
+        self.assertEqual(9, len(self._getElementTuples(iter(geIter.next, None))))
+        self.assertTrue(geIter.anyWarnings())
+
+        cols = lines[3].split('\t')
+        cols[0], cols[3] = 'chr21', '0'
+        lines[3] = '\t'.join(cols)
+        fn = self._createFile(lines)
+        sys_stdout = os.sys.stdout
+        os.sys.stdout = open(os.devnull, 'w')
+        try:
+            self.assertRaises(InvalidFormatError, list, GenomeElementSource(fn, genome='TestGenome'))
+        finally:
+            os.sys.stdout = sys_stdout
+
+    def testOnlyFailingLinesAreParsedLineByLine(self):
+        numLines = 2 * GffGenomeElementSource.MAX_BATCH_SIZE
+        lines = self._getDataLines(numLines)
+        lines[-10] = lines[-10].replace('chr21', 'chrUnknown')
+        lines[-5] = lines[-5].replace('\tsrc\t', '\tbadSrc\t')
+        fn = self._createFile(lines)
+        geIter = iter(GenomeElementSource(fn, genome='TestGenome', printWarnings=False))
+
+        parsedLines = []
+        origNext, origParseColumns = geIter._next, geIter._parseDataLinesAsColumns
+        def _next(line):
+            parsedLines.append(line)
+            return origNext(line)
+        def _parseDataLinesAsColumns(dataLines):
+            if any('badSrc' in line for line in dataLines):
+                raise InvalidFormatError('Simulated error')
+            return origParseColumns(dataLines)
+        geIter._next, geIter._parseDataLinesAsColumns = _next, _parseDataLinesAsColumns
+
+        self.assertEqual(numLines - 1, len(self._getElementTuples(iter(geIter.next, None))))
+        self.assertTrue(lines[-10] in parsedLines)
+        self.assertTrue(lines[-5] in parsedLines)
+        self.assertTrue(len(parsedLines) <= 1 + GffGenomeElementSource.MIN_BATCH_SIZE)
+
+    def testIdAndNameOnlyExtractedWhenInPrefixList(self):
+        for firstLine, assertPrefixes in [(1, ['name']), (2, [])]:
+            lines = [line for line in self._getDataLines(10) if not line.startswith('#')]
+            fn = self._createFile(lines[firstLine:])
+            geSource = GenomeElementSource(fn, genome='TestGenome')
+            self.assertEqual(assertPrefixes, [x for x in geSource.getPrefixList() if x in ['id', 'name']])
+
+            geList = list(geSource)
+            self.assertEqual(10 - firstLine, len(geList))
+            self.assertEqual([], [ge.id for ge in geList if ge.id is not None])
+            self.assertEqual('name' in assertPrefixes, any(hasattr(ge, 'name') for ge in geList))
+
+    def testFastaSection(self):
+        lines = self._getDataLines(10) + ['##FASTA', '>chr21', 'ACGT', 'AC', '>chrM', 'GG']
+        fn = self._createFile(lines)
+        geSource = GenomeElementSource(fn, genome='TestGenome')
+
+        self.assertEqual(10, len(list(geSource)))
+
+        fastaSource = geSource.getFastaGenomeElementSource()
+        self.assertTrue(isinstance(fastaSource, FastaGenomeElementSource))
+        self.assertEqual([('chr21', 'ACGT'), ('chr21', 'AC'), ('chrM', 'GG')], \
+                         [(ge.chr, ''.join(ge.val)) for ge in fastaSource])
+
+        fn = self._createFile(self._getDataLines(10))
+        self.assertEqual(None, GenomeElementSource(fn, genome='TestGenome').getFastaGenomeElementSource())
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from gtrackcore.input.userbins.AutoBinner import AutoBinner
+from gtrackcore.track.core.GenomeRegion import GenomeRegion
+
+class TestAutoBinner(unittest.TestCase):
+    def setUp(self):
+        self.regions = [GenomeRegion('TestGenome', 'chr21', 100, 350), \
+                        GenomeRegion('TestGenome', 'chr21', 1000, 1100), \
+                        GenomeRegion('TestGenome', 'chrM', 16500, None)]
+
+    def _getExpectedBins(self, regions, binLen):
+        bins = []
+        for region in regions:
+            end = region.end if region.end is not None else 16571
+            for start in range(region.start, end, binLen):
+                bins.append(GenomeRegion(region.genome, region.chr, start, min(start + binLen, end)))
+        return bins
+
+    def testBins(self):
+        binner = AutoBinner(self.regions, 100, genome='TestGenome')
+        expected = self._getExpectedBins(self.regions, 100)
+
+        self.assertEqual(len(expected), len(binner))
+        self.assertEqual(expected, list(binner))
+        self.assertEqual(expected, list(binner))
+        self.assertEqual(2, len(binner.getBinSet().getChrBinsList()))
+
+    def testIndexing(self):
+        binner = AutoBinner(self.regions, 100, genome='TestGenome')
+        expected = self._getExpectedBins(self.regions, 100)
+
+        self.assertEqual(expected[0], binner[0])
+        self.assertEqual(expected[4], binner[4])
+        self.assertEqual(expected[-1], binner[-1])
+        self.assertRaises(IndexError, binner.__getitem__, len(expected))
+
+        for start, stop in [(0, 3), (2, 6), (1, len(expected)), (3, 3), (5, 2)]:
+            self.assertEqual(expected[start:stop], list(binner[start:stop]))
+            self.assertEqual(len(expected[start:stop]), len(binner[start:stop]))
+
+    def testWholeRegions(self):
+        binner = AutoBinner(self.regions, None, genome='TestGenome')
+        self.assertEqual(['chr21:101-350', 'chr21:1001-1100', 'chrM:16501-16571'], [str(bin) for bin in binner])
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
@@ -27,6 +27,32 @@ class TestBoundingRegionUserBinSource(TestCaseWithImprovedAsserts):
         self._assertIntersect([[3,6],[6,7]], 'chr21', [[2,6],[6,7]], [[3,8]])
         self._assertIntersect([[5,6],[7,8],[9,10]], 'chr21', [[5,10]], [[0,6],[7,8],[9,10]])
         self._assertIntersect([[0,10]], 'chr21', [[0,10]], [[0,10]])
+        self._assertIntersect([], 'chr21', [[0,6]], [[6,8]])
+        self._assertIntersect([[1,2],[4,5],[6,7],[9,10]], 'chr21', [[0,2],[4,7],[9,12]], [[1,5],[6,10]])
+    
+    def testRegionArraysCacheIsBounded(self):
+        calcTrackNames = []
+        class MockBoundingRegionUserBinSource(BoundingRegionUserBinSource):
+            MAX_CACHED_REGION_ARRAYS = 2
+            def _getBoundingRegionShelve(self, trackName):
+                return None
+            def _getCacheKey(self, brShelve1, brShelve2):
+                return tuple(self._trackName1)
+            def _calcRegionArrays(self, brShelve1, brShelve2):
+                calcTrackNames.append(self._trackName1)
+                return []
+        
+        MockBoundingRegionUserBinSource.clearRegionArraysCache()
+        try:
+            for trackName in [['a'], ['b'], ['a'], ['c'], ['a'], ['b']]:
+                len(MockBoundingRegionUserBinSource('TestGenome', trackName))
+            self.assertEqual([['a'], ['b'], ['c'], ['b']], calcTrackNames)
+            self.assertEqual([('a',), ('b',)], MockBoundingRegionUserBinSource._regionArraysCache.keys())
+            
+            MockBoundingRegionUserBinSource.clearRegionArraysCache()
+            self.assertEqual(0, len(BoundingRegionUserBinSource._regionArraysCache))
+        finally:
+            MockBoundingRegionUserBinSource.clearRegionArraysCache()
     
     def runTest(self):
         pass
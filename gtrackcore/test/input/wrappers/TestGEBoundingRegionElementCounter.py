@@ -1,8 +1,11 @@
 import unittest
 
-from gtrackcore.input.wrappers.GEBoundingRegionElementCounter import GEBoundingRegionElementCounter
+import numpy
+
+from gtrackcore.input.wrappers.GEBoundingRegionElementCounter import GEBoundingRegionElementCounter, countElementsInRegions
 from gtrackcore.test.common.Asserts import assertBoundingRegions, TestCaseWithImprovedAsserts
 from gtrackcore.util.CommonConstants import BINARY_MISSING_VAL
+from gtrackcore.util.CustomExceptions import ShouldNotOccurError
 
 class TestGEBoundingRegionElementCounter(TestCaseWithImprovedAsserts):
     def setUp(self):
@@ -45,6 +48,15 @@ class TestGEBoundingRegionElementCounter(TestCaseWithImprovedAsserts):
                              [['A', 'chr1', 0, 2, None], ['A', 'chr2', 0, 1, None]], \
                              [['A', 'chr1', None, None, {'val':0.0}], ['A', 'chr1', None, None, {'val':1.0}], ['A', 'chr2', None, None, {'val':2.0}]])
     
+    def testCountElementsInRegions(self):
+        brStarts, brEnds = numpy.array([0, 100, 500]), numpy.array([100, 200, 1000])
+        self.assertListsOrDicts([2, 0, 3], countElementsInRegions(brStarts, brEnds, numpy.array([0, 50, 500, 600, 900]), \
+                                                                  numpy.array([10, 100, 510, 610, 1000])))
+        self.assertListsOrDicts([1, 1, 0], countElementsInRegions(brStarts, brEnds, numpy.array([99, 100])))
+        self.assertListsOrDicts([1, 2, 0], countElementsInRegions(brStarts, brEnds, ends=numpy.array([100, 150, 200])))
+        self.assertRaises(ShouldNotOccurError, countElementsInRegions, brStarts, brEnds, \
+                          numpy.array([150]), numpy.array([250]))
+    
     def runTest(self):
         pass
         self.testCountElements()
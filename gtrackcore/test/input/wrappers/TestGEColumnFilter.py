@@ -0,0 +1,67 @@
+import unittest
+
+import numpy
+
+from functools import partial
+
+from gtrackcore.input.wrappers.GEColumnFilter import GEColumnFilter, ColumnBatch, CategoryFilter, \
+                                                    ValueRangeFilter, StrandFilter, RegionFilter
+from gtrackcore.test.common.Asserts import assertDecorator
+from gtrackcore.track.core.GenomeRegion import GenomeRegion
+
+class TestGEColumnFilter(unittest.TestCase):
+    def setUp(self):
+        pass
+
+    def _assertFilter(self, columnFilter, filteredList, unfilteredList, valDataType='float64'):
+        assertDecorator(partial(GEColumnFilter, columnFilter=columnFilter), \
+                        self.assertEqual, filteredList, unfilteredList, valDataType=valDataType)
+
+    def testCategoryFilter(self):
+        self._assertFilter(CategoryFilter(['A', 'C']), \
+                           [['TestGenome','chr21',3,8,{'val':'A'}], ['TestGenome','chrM',3,8,{'val':'C'}]], \
+                           [['TestGenome','chr21',3,8,{'val':'A'}], ['TestGenome','chr21',9,12,{'val':'B'}], \
+                            ['TestGenome','chrM',3,8,{'val':'C'}]], valDataType='S')
+        self._assertFilter(CategoryFilter(['A'], strict=False), \
+                           [['TestGenome','chr21',3,8,{'val':'AB'}]], \
+                           [['TestGenome','chr21',3,8,{'val':'AB'}], ['TestGenome','chr21',9,12,{'val':'B'}]], \
+                           valDataType='S')
+
+    def testCombinedFilters(self):
+        unfilteredList = [['TestGenome','chr21',3,8,{'val':1.0, 'strand':True}], \
+                          ['TestGenome','chr21',9,12,{'val':numpy.nan, 'strand':True}], \
+                          ['TestGenome','chr21',20,30,{'val':3.0, 'strand':False}], \
+                          ['TestGenome','chrM',3,8,{'val':5.0, 'strand':True}]]
+        region = GenomeRegion('TestGenome', 'chr21', 0, 25)
+
+        self._assertFilter(ValueRangeFilter(0.5, 4.0), [unfilteredList[0], unfilteredList[2]], unfilteredList)
+        self._assertFilter(ValueRangeFilter(0.5, 4.0) & StrandFilter(True), [unfilteredList[0]], unfilteredList)
+        self._assertFilter(~StrandFilter(True) | RegionFilter([region]), [unfilteredList[0], unfilteredList[2]], \
+                           [unfilteredList[0]] + unfilteredList[2:])
+
+    def testBatches(self):
+        unfilteredList = [['TestGenome','chr21',i,i+1,{'val':float(i % 3)}] for i in range(10)] + \
+                         [['TestGenome','chrM',i,i+1,{'val':float(i % 3)}] for i in range(10)]
+        columnFilter = ValueRangeFilter(maxVal=0)
+        filteredList = [el for el in unfilteredList if el[4]['val'] == 0]
+
+        prevBatchSize = GEColumnFilter.BATCH_SIZE
+        GEColumnFilter.BATCH_SIZE = 4
+        try:
+            self._assertFilter(columnFilter, filteredList, unfilteredList)
+        finally:
+            GEColumnFilter.BATCH_SIZE = prevBatchSize
+
+    def testMask(self):
+        batch = ColumnBatch('TestGenome', 'chr21', {'start': numpy.array([0, 10, 20]), \
+                                                    'end': numpy.array([5, 15, 25]), \
+                                                    'val': numpy.array(['a', 'b', 'c'])})
+        columnFilter = CategoryFilter(['a', 'b']) & ~RegionFilter([GenomeRegion('TestGenome', 'chr21', 8, 30)])
+        self.assertEqual(['val', 'start', 'end'], columnFilter.getRequiredPrefixes())
+        self.assertEqual([True, False, False], columnFilter.getMask(batch).tolist())
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
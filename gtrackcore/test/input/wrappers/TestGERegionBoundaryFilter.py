@@ -1,10 +1,13 @@
 import unittest
 
+import numpy
+
 from functools import partial
 
-from gtrackcore.input.wrappers.GERegionBoundaryFilter import GERegionBoundaryFilter
+from gtrackcore.input.wrappers.GERegionBoundaryFilter import GERegionBoundaryFilter, BoundaryRegionIndex
 from gtrackcore.input.userbins.UserBinSource import GlobalBinSource
 from gtrackcore.test.common.Asserts import assertDecorator
+from gtrackcore.track.core.GenomeRegion import GenomeRegion
 
 class TestGERegionBoundaryFilter(unittest.TestCase):
     def setUp(self):
@@ -23,6 +26,22 @@ class TestGERegionBoundaryFilter(unittest.TestCase):
                            [['TestGenome','chr21',2,5],['TestGenome','chrTest',3,8]])
         self._assertFilter([['TestGenome','chrM',3,8]], \
                            [['TestGenome','chr21',-2,5],['TestGenome','chrM',3,8]])
-        
+
+    def testBoundaryRegionIndex(self):
+        index = BoundaryRegionIndex([GenomeRegion('TestGenome', 'chr21', 100, 200), \
+                                     GenomeRegion('TestGenome', 'chr21', 0, 50), \
+                                     GenomeRegion('TestGenome', 'chr21', 10, 20), \
+                                     GenomeRegion('TestGenome', 'chrM', 0, 10)])
+        elements = [(0, 50), (10, 40), (45, 55), (60, 70), (100, 200), (150, 201), (150, 160)]
+        expected = [True, True, False, False, True, False, True]
+
+        self.assertEqual(expected, [index.contains('TestGenome', 'chr21', start, end) for start, end in elements])
+        self.assertEqual(expected, index.getContainedMask('TestGenome', 'chr21', \
+                                                          numpy.array([start for start, end in elements]), \
+                                                          numpy.array([end for start, end in elements])).tolist())
+        self.assertFalse(index.contains('Test', 'chr21', 0, 10))
+        self.assertFalse(index.contains('TestGenome', 'chr1', 0, 10))
+        self.assertEqual([False], index.getContainedMask('TestGenome', 'chr1', numpy.array([0]), numpy.array([10])).tolist())
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
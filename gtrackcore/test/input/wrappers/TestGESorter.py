@@ -1,6 +1,9 @@
+import random
 import unittest
 
+from gtrackcore.input.core.GenomeElement import GenomeElement
 from gtrackcore.input.wrappers.GESorter import GESorter
+from gtrackcore.input.wrappers.GESourceWrapper import PrefixListGESourceWrapper
 from gtrackcore.test.common.Asserts import assertDecorator
 
 class TestGESorter(unittest.TestCase):
@@ -29,6 +32,37 @@ class TestGESorter(unittest.TestCase):
         self._assertSort([['A','chr1',None,5],['A','chr1',None,8]], [['A','chr1',None,8],['A','chr1',None,5]])
 
         self._assertSort([['B','chr2',None,None],['A','chr1',None,None]], [['B','chr2',None,None],['A','chr1',None,None]])
+    
+    def testSortSpilled(self):
+        prevMaxElements = GESorter.MAX_ELEMENTS_IN_MEMORY
+        GESorter.MAX_ELEMENTS_IN_MEMORY = 2
+        try:
+            self._assertSort([['A','chr1',2,5],['A','chr1',2,8],['A','chr1',3,4],['A','chr2',1,2],['B','chr1',0,1]], \
+                             [['B','chr1',0,1],['A','chr1',3,4],['A','chr2',1,2],['A','chr1',2,8],['A','chr1',2,5]])
+            self._assertSort([['A','chr1',2,None,{'val':1.0}],['A','chr1',2,None,{'val':2.0}],['A','chr1',2,None,{'val':3.0}]], \
+                             [['A','chr1',2,None,{'val':1.0}],['A','chr1',2,None,{'val':2.0}],['A','chr1',2,None,{'val':3.0}]])
+        finally:
+            GESorter.MAX_ELEMENTS_IN_MEMORY = prevMaxElements
+    
+    def testSpilledSortEqualsInMemorySort(self):
+        random.seed(0)
+        geList = [GenomeElement(random.choice(['A', 'B']), random.choice(['chr1', 'chr2', None]), \
+                                random.choice([None, random.randint(0, 100)]), random.randint(0, 100), \
+                                val=float(i)) for i in range(200)]
+        inMemoryList = list(GESorter(PrefixListGESourceWrapper(None, geList, [], ['start', 'end', 'val'])))
+        
+        prevMaxElements = GESorter.MAX_ELEMENTS_IN_MEMORY
+        GESorter.MAX_ELEMENTS_IN_MEMORY = 10
+        try:
+            sorter = GESorter(PrefixListGESourceWrapper(None, geList, [], ['start', 'end', 'val']))
+            spilledList = list(sorter)
+        finally:
+            GESorter.MAX_ELEMENTS_IN_MEMORY = prevMaxElements
+        
+        self.assertEqual(inMemoryList, spilledList)
+        self.assertEqual(200, len(sorter))
+        #Elements are not kept in memory after spilling
+        self.assertEqual(None, sorter._sortedElements)
         
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+import unittest
+import numpy
+
+from gtrackcore.metadata.GenomeInfo import GenomeInfo
+from gtrackcore.util.CustomExceptions import ArgumentValueError, InvalidFormatError
+
+class TestChrTable(unittest.TestCase):
+    def setUp(self):
+        self._chrTable = GenomeInfo.getChrTable('TestGenome')
+
+    def testLookup(self):
+        self.assertTrue(self._chrTable is GenomeInfo.getChrTable('TestGenome'))
+        self.assertEqual(('chr21', 'chrM'), self._chrTable.chrList)
+        self.assertEqual([46944323, 16571], list(self._chrTable.chrLengths))
+
+        self.assertTrue(self._chrTable.isValidChr('chrM'))
+        self.assertFalse(self._chrTable.isValidChr('chr1'))
+        self.assertEqual(1, self._chrTable.getCode('chrM'))
+        self.assertEqual(16571, self._chrTable.getChrLen('chrM'))
+        self.assertEqual(None, self._chrTable.lookupChrLen('chr1'))
+        self.assertRaises(ArgumentValueError, self._chrTable.getChrLen, 'chr1')
+
+        self.assertEqual(16571, GenomeInfo.getChrLen('TestGenome', 'chrM'))
+        self.assertRaises(ArgumentValueError, GenomeInfo.getChrLen, 'TestGenome', 'chr1')
+
+    def testGetChrCodes(self):
+        self.assertEqual([0, -1, 1, 0], list(self._chrTable.getChrCodes(['chr21', 'chr1', 'chrM', 'chr21'])))
+
+    def testCheckValidCoords(self):
+        validChrs = self._chrTable.checkValidCoords(['chr21', 'chr1', 'chrM'], [0, 10**10, 16570], [10, 10**10+1, 16571])
+        self.assertEqual([True, False, True], list(validChrs))
+
+        validChrs = self._chrTable.checkValidCoords(numpy.array([0, 1]), [0, 16570])
+        self.assertEqual([True, True], list(validChrs))
+
+        for chrs, starts, ends in [(['chr21'], [-1], None),
+                                   (['chrM'], [16572], None),
+                                   (['chr21'], [0], [-1]),
+                                   (['chrM'], [0], [16573]),
+                                   (['chr21', 'chr21'], [0, 10], [10, 10])]:
+            self.assertRaises(InvalidFormatError, self._chrTable.checkValidCoords, chrs, starts, ends)
+
+        self._chrTable.checkValidCoords(['chr21'], [1], [1])
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
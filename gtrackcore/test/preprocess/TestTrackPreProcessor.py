@@ -216,22 +216,22 @@ class TestGESourceTracksPreprocessing(TestTrackPreProcessor):
 
     def testPreProcessBed(self):
         self._preProcess(['BedGenomeElementSource'], \
-        noOverlapsFileCount=14, \
-        withOverlapsFileCount=14, \
+        noOverlapsFileCount=17, \
+        withOverlapsFileCount=18, \
         noOverlapsChrElCount={'chr21':242, 'chrM':11}, \
         withOverlapsChrElCount={'chr21':828, 'chrM':11})
 
     def testPreProcessBedPoint(self):
         self._preProcess(['PointBedGenomeElementSource'], \
-        noOverlapsFileCount=7, \
-        withOverlapsFileCount=7, \
+        noOverlapsFileCount=8, \
+        withOverlapsFileCount=8, \
         noOverlapsChrElCount={'chr21':139, 'chrM':8}, \
         withOverlapsChrElCount={'chr21':139, 'chrM':8})
 
     def testPreProcessBedCategory(self):
         self._preProcess(['BedCategoryGenomeElementSource'], \
-        noOverlapsFileCount=6, \
-        withOverlapsFileCount=6, \
+        noOverlapsFileCount=7, \
+        withOverlapsFileCount=7, \
         noOverlapsChrElCount={'chr21':38, 'chrM':0}, \
         withOverlapsChrElCount={'chr21':87, 'chrM':0})
 
@@ -252,8 +252,8 @@ class TestGESourceTracksPreprocessing(TestTrackPreProcessor):
 
     def testPreProcessGff(self):
         self._preProcess(['GffGenomeElementSource'], \
-        noOverlapsFileCount=12, \
-        withOverlapsFileCount=12, \
+        noOverlapsFileCount=16, \
+        withOverlapsFileCount=16, \
         noOverlapsChrElCount={'chr21':3076, 'chrM':0}, \
         withOverlapsChrElCount={'chr21':5260, 'chrM':0})
 
@@ -0,0 +1,117 @@
+import os
+import json
+import tarfile
+import unittest
+
+from cStringIO import StringIO
+from tempfile import mkdtemp
+
+from gtrackcore.extract.TrackExtractor import TrackExtractor
+from gtrackcore.metadata.TrackInfo import TrackInfo
+from gtrackcore.preprocess.PreProcessTracksJob import PreProcessAllTracksJob
+from gtrackcore.test.common.TestWithGeSourceData import TestWithGeSourceData
+from gtrackcore.track.core.GenomeRegion import GenomeRegion
+from gtrackcore.track.hierarchy.ProcTrackOptions import ProcTrackOptions
+from gtrackcore.track.hierarchy.TrackBundle import exportTrackBundle, importTrackBundle, readBundleManifest
+from gtrackcore.util.CommonFunctions import createOrigPath, ensurePathExists
+from gtrackcore.util.CustomExceptions import InvalidFormatError
+
+class TestTrackBundle(TestWithGeSourceData):
+    GENOME = 'TestGenome'
+    TRACK_NAME = ['TestTrackBundle', 'segments']
+    IMPORTED_TRACK_NAME = ['TestTrackBundle', 'imported']
+
+    def setUp(self):
+        self._tempDir = mkdtemp()
+
+        fn = createOrigPath(self.GENOME, self.TRACK_NAME, 'testfile.bed')
+        ensurePathExists(fn)
+        with open(fn, 'w') as bedFile:
+            bedFile.write('\n'.join(['chr21\t10\t20', 'chr21\t15\t600', 'chrM\t100\t200']))
+        PreProcessAllTracksJob(self.GENOME, self.TRACK_NAME, username='Test').process()
+
+        self._bundleFn = os.path.join(self._tempDir, 'segments.bundle')
+        exportTrackBundle(self.GENOME, self.TRACK_NAME, self._bundleFn)
+
+    def tearDown(self):
+        self._removeAllTrackData(self.TRACK_NAME[:1])
+        os.system('rm -Rf ' + self._tempDir)
+
+    def _extract(self, trackName, allowOverlaps):
+        fn = os.path.join(self._tempDir, '_'.join(trackName) + str(allowOverlaps) + '.bed')
+        TrackExtractor.extract(trackName, [GenomeRegion(self.GENOME, 'chr21', 0, 1000)], fn, \
+                               fileFormatName='BED', allowOverlaps=allowOverlaps)
+        #The track line contains the track name
+        return open(fn).readlines()[1:]
+
+    def testExportAndImport(self):
+        manifest = readBundleManifest(self._bundleFn)
+        self.assertEqual(self.TRACK_NAME, manifest['trackName'])
+        self.assertTrue(any(x['name'].startswith('withOverlaps/') for x in manifest['files']))
+
+        self.assertEqual(self.IMPORTED_TRACK_NAME, importTrackBundle(self._bundleFn, self.IMPORTED_TRACK_NAME))
+        self.assertTrue(ProcTrackOptions.isValidTrack(self.GENOME, self.IMPORTED_TRACK_NAME))
+        self.assertEqual(TrackInfo(self.GENOME, self.TRACK_NAME).origElCount, \
+                         TrackInfo(self.GENOME, self.IMPORTED_TRACK_NAME).origElCount)
+
+        for allowOverlaps in [False, True]:
+            self.assertEqual(self._extract(self.TRACK_NAME, allowOverlaps), \
+                             self._extract(self.IMPORTED_TRACK_NAME, allowOverlaps))
+
+    def testChecksumMismatch(self):
+        corruptFn = os.path.join(self._tempDir, 'corrupt.bundle')
+        bundle = tarfile.open(self._bundleFn)
+        corruptBundle = tarfile.open(corruptFn, 'w')
+        for member in bundle.getmembers():
+            contents = bundle.extractfile(member).read()
+            if member.name.startswith('noOverlaps/start'):
+                contents = '\xff' + contents[1:]
+            corruptBundle.addfile(member, StringIO(contents))
+        corruptBundle.close()
+        bundle.close()
+
+        self.assertRaises(InvalidFormatError, importTrackBundle, corruptFn, self.IMPORTED_TRACK_NAME)
+        self.assertFalse(ProcTrackOptions.isValidTrack(self.GENOME, self.IMPORTED_TRACK_NAME))
+
+    def _writeBundleWithChangedManifest(self, changeManifest):
+        changedFn = os.path.join(self._tempDir, 'changed.bundle')
+        bundle = tarfile.open(self._bundleFn)
+        changedBundle = tarfile.open(changedFn, 'w')
+        for member in bundle.getmembers():
+            contents = bundle.extractfile(member).read()
+            if member.name == 'MANIFEST.json':
+                manifest = json.loads(contents)
+                changeManifest(manifest)
+                contents = json.dumps(manifest)
+                member.size = len(contents)
+            changedBundle.addfile(member, StringIO(contents))
+        changedBundle.close()
+        bundle.close()
+        return changedFn
+
+    def testTrackInfoIsNotEvaluated(self):
+        def _addExpression(manifest):
+            manifest['trackInfo']['description'] = "__import__('os').system('false')"
+            manifest['trackInfo']['origElCount'] = "__import__('os').getpid()"
+        changedFn = self._writeBundleWithChangedManifest(_addExpression)
+        self.assertRaises(InvalidFormatError, importTrackBundle, changedFn, self.IMPORTED_TRACK_NAME)
+
+        def _addUnknownAttr(manifest):
+            manifest['trackInfo']['__class__'] = 'str'
+        changedFn = self._writeBundleWithChangedManifest(_addUnknownAttr)
+        self.assertRaises(InvalidFormatError, importTrackBundle, changedFn, self.IMPORTED_TRACK_NAME)
+        self.assertFalse(ProcTrackOptions.isValidTrack(self.GENOME, self.IMPORTED_TRACK_NAME))
+
+    def testIllegalFileNames(self):
+        for name in ['start.int32', 'noOverlaps/../start.int32', '/tmp/start.int32', \
+                     'noOverlaps/sub/start.int32', '../noOverlaps', 'noOverlaps/..']:
+            def _renameFirstFile(manifest):
+                manifest['files'][0]['name'] = name
+            changedFn = self._writeBundleWithChangedManifest(_renameFirstFile)
+            self.assertRaises(InvalidFormatError, importTrackBundle, changedFn, self.IMPORTED_TRACK_NAME)
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy
+
+from gtrackcore.input.wrappers.GEColumnFilter import ColumnBatch, CategoryFilter
+from gtrackcore.test.common.Asserts import TestCaseWithImprovedAsserts
+from gtrackcore.track.memmap.CategoricalArray import CategoricalArray, shouldDictionaryEncode, getCodeDataType
+
+class TestCategoricalArray(TestCaseWithImprovedAsserts):
+    def setUp(self):
+        self.array = numpy.array(['exon', 'intron', 'exon', 'utr', 'exon', 'intron'])
+
+    def testEncode(self):
+        categoricalArray = CategoricalArray.encode(self.array)
+        self.assertListsOrDicts(['exon', 'intron', 'utr'], categoricalArray.categories)
+        self.assertListsOrDicts([0, 1, 0, 2, 0, 1], categoricalArray.codes)
+        self.assertEqual(numpy.dtype('uint8'), categoricalArray.codes.dtype)
+        self.assertEqual(self.array.dtype, categoricalArray.dtype)
+        self.assertEqual((6,), categoricalArray.shape)
+        self.assertListsOrDicts(self.array, categoricalArray.decode())
+        self.assertListsOrDicts(self.array, numpy.asarray(categoricalArray))
+
+    def testSlicing(self):
+        categoricalArray = CategoricalArray.encode(self.array)
+        self.assertEqual('utr', categoricalArray[3])
+        self.assertTrue(isinstance(categoricalArray[1:4], CategoricalArray))
+        self.assertListsOrDicts(self.array[1:4], categoricalArray[1:4].decode())
+        self.assertListsOrDicts(self.array[2:][1:2], categoricalArray[2:][1:2].decode())
+
+        mask = self.array != 'exon'
+        self.assertListsOrDicts(self.array[mask], categoricalArray[mask].decode())
+        self.assertListsOrDicts(list(self.array), [x for x in categoricalArray])
+
+    def testShouldDictionaryEncode(self):
+        self.assertTrue(shouldDictionaryEncode(numpy.array(['exon', 'intron'] * 10)))
+        self.assertFalse(shouldDictionaryEncode(numpy.array([str(i) for i in xrange(1000, 1020)])))
+        self.assertFalse(shouldDictionaryEncode(numpy.array(['a', 'b'] * 10)))
+        self.assertFalse(shouldDictionaryEncode(numpy.array([1.0, 2.0] * 10)))
+
+        self.assertEqual('uint8', getCodeDataType(256))
+        self.assertEqual('uint16', getCodeDataType(257))
+        self.assertEqual('int32', getCodeDataType(70000))
+
+    def testCategoryFilterOnCodes(self):
+        categoricalArray = CategoricalArray.encode(self.array)
+        for columnFilter in [CategoryFilter(['utr', 'intron']), CategoryFilter(['tr'], strict=False)]:
+            self.assertListsOrDicts(columnFilter.getMask(ColumnBatch('TestGenome', 'chr21', {'val': self.array})), \
+                                    columnFilter.getMask(ColumnBatch('TestGenome', 'chr21', {'val': categoricalArray})))
+
+    def runTest(self):
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
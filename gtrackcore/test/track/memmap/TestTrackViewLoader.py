@@ -105,6 +105,25 @@ class TestTrackViewLoader(TestCaseWithImprovedAsserts):
         self._assertTrackViewLoading_Segments(trackData, [], 300, 300)
         self._assertTrackViewLoading_Segments(trackData, [], 400, 400)
         
+    def testLoadTrackView_ColumnFilter(self):
+        from gtrackcore.input.wrappers.GEColumnFilter import ValueRangeFilter, StrandFilter
+        trackData = TrackData({'start' : [10, 210, 260, 410],\
+                               'end' : [20, 240, 310, 710],\
+                               'val' : [1.0, 2.0, 3.0, 4.0],\
+                               'strand' : [1, 0, 1, 1],\
+                               'leftIndex' : [0, 1, 1, 1, 3, 3, 3, 3, 4],\
+                               'rightIndex' : [1, 1, 3, 3, 4, 4, 4, 4, 4]})
+        
+        trackView = self.trackViewLoader.loadTrackView(trackData, GenomeRegion(genome='TestGenome', start=0, end=900), \
+                                                       'crop', False, columnFilter=ValueRangeFilter(1.5) & StrandFilter(True))
+        self.assertListsOrDicts([260, 410], [el.start() for el in trackView])
+        self.assertListsOrDicts([3.0, 4.0], [el.val() for el in trackView])
+        
+        trackView = self.trackViewLoader.loadTrackView(trackData, GenomeRegion(genome='TestGenome', start=200, end=300), \
+                                                       'crop', False, columnFilter=StrandFilter(True))
+        self.assertListsOrDicts([60], [el.start() for el in trackView])
+        self.assertListsOrDicts([100], [el.end() for el in trackView])
+        
     def runTest(self):
         self.testLoadTrackView_Numbers()
     
@@ -25,10 +25,12 @@ class Track(object):
         self._trackFormatReq = NeutralTrackFormatReq()
         self.formatConverters = None
         self._trackId = None
+        self._columnFilter = None
         
     def _getRawTrackView(self, region, borderHandling, allowOverlaps):
         trackData = self._trackSource.getTrackData(self.trackName, region.genome, region.chr, allowOverlaps)
-        return self._trackViewLoader.loadTrackView(trackData, region, borderHandling, allowOverlaps, self.trackName)
+        return self._trackViewLoader.loadTrackView(trackData, region, borderHandling, allowOverlaps, self.trackName, \
+                                                   columnFilter=self._columnFilter)
     
     def getTrackView(self, region):
         allowOverlaps = self._trackFormatReq.allowOverlaps()
@@ -60,6 +62,13 @@ class Track(object):
             raise IncompatibleTracksError(str(prevFormatReq ) + \
                                           ' is incompatible with additional ' + str(requestedTrackFormat))
     
+    def setColumnFilter(self, columnFilter):
+        'Filter expression (see GEColumnFilter) applied to the preprocessed arrays when loading track views.'
+        self._columnFilter = columnFilter
+    
+    def _getColumnFilterKey(self):
+        return (repr(self._columnFilter),) if self._columnFilter is not None else ()
+    
     def setFormatConverter(self, converterClassName):
         assert( self.formatConverters is None )
         if converterClassName is not None:        
@@ -75,7 +84,7 @@ class Track(object):
             
         return hash((tuple(self.trackName), self._trackId, getClassName(self.formatConverters[0]), \
                      self.formatConverters[0].VERSION, self._trackFormatReq.allowOverlaps(), \
-                     self._trackFormatReq.borderHandling()))
+                     self._trackFormatReq.borderHandling()) + self._getColumnFilterKey())
 
 class PlainTrack(Track):
     def __new__(cls, trackName):
@@ -99,7 +108,7 @@ class PlainTrack(Track):
             self._trackId = TrackInfo(genome, self.trackName).id
             
         return hash((tuple(self.trackName), self._trackId, self._trackFormatReq.allowOverlaps(), \
-                     self._trackFormatReq.borderHandling()))
+                     self._trackFormatReq.borderHandling()) + self._getColumnFilterKey())
 
 class VirtualMinimalTrack(Track):
     def __new__(cls):
@@ -4,6 +4,7 @@ import numpy
 from collections import OrderedDict
 
 from gtrackcore.core.LogSetup import logMessage
+from gtrackcore.track.memmap.CategoricalArray import CategoricalArray
 from gtrackcore.track.memmap.SmartMemmap import SmartMemmap
 from gtrackcore.util.CommonConstants import RESERVED_PREFIXES
 from gtrackcore.util.CustomExceptions import ShouldNotOccurError, NotSupportedError
@@ -16,7 +17,7 @@ def inferValType(valList, shapeOffset=0):
         return False
     elif type(valList) in [list,tuple]:
         return 'number'
-    elif isinstance(valList, numpy.ndarray) or isinstance(valList, SmartMemmap):    
+    elif isinstance(valList, numpy.ndarray) or isinstance(valList, SmartMemmap) or isinstance(valList, CategoricalArray):    
         if len(valList.shape) == 2 + shapeOffset and valList.shape[1 + shapeOffset] == 2 and valList.dtype == numpy.dtype('float128'):
             return 'mean_sd'
         elif any(valList.dtype == numpy.dtype(x) for x in ['float32', 'float64', 'float128']):
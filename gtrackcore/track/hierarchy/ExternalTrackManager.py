@@ -155,6 +155,12 @@ class ExternalTrackManager:
     def getGESource(fullFn, fileSuffix, extTrackName=None, genome=None, printWarnings=False):
         from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
         return GenomeElementSource(fullFn, suffix=fileSuffix, forPreProcessor=True, genome=genome, trackName=extTrackName, external=True, printWarnings=printWarnings)
+
+    @staticmethod
+    def getGESourceInRegions(fullFn, fileSuffix, regionList, extTrackName=None, genome=None, printWarnings=False):
+        from gtrackcore.input.wrappers.GESourceWrapper import RegionGESourceWrapper
+        geSource = ExternalTrackManager.getGESource(fullFn, fileSuffix, extTrackName=extTrackName, genome=genome, printWarnings=printWarnings)
+        return RegionGESourceWrapper(geSource, regionList)
     
     #@staticmethod
     #def preProcess(fullFn, extTrackName, fileSuffix, genome, raiseIfAnyWarnings=False):
@@ -0,0 +1,249 @@
+import os
+import json
+import shutil
+import tarfile
+import hashlib
+import time
+
+from datetime import datetime
+from cStringIO import StringIO
+from tempfile import mkdtemp
+
+from gtrackcore.metadata.TrackInfo import TrackInfo
+from gtrackcore.util.CompBinManager import CompBinManager
+from gtrackcore.util.CommonFunctions import createDirPath, ensurePathExists
+from gtrackcore.util.CustomExceptions import InvalidFormatError, NotSupportedError
+
+BUNDLE_VERSION = '1.0'
+MANIFEST_NAME = 'MANIFEST.json'
+OVERLAP_DIR_NAMES = {False: 'noOverlaps', True: 'withOverlaps'}
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+#The TrackInfo attributes stored in the manifest, by type. Other attributes are not exported, and
+#make a manifest invalid on import.
+_TRACK_INFO_STR_ATTRS = ['description', 'displayConvConf', 'methods', 'credits', 'reference', 'restrictions', \
+                         'version', 'quality', 'hbContact', 'cellType', 'lastUpdatedBy', 'fileType', \
+                         'trackFormatName', 'markType', 'weightType', 'preProcVersion']
+_TRACK_INFO_BOOL_ATTRS = ['cellTypeSpecific', 'private']
+_TRACK_INFO_OPTIONAL_BOOL_ATTRS = ['undirectedEdges']
+_TRACK_INFO_OPTIONAL_INT_ATTRS = ['id', 'subTrackCount', 'origElCount', 'clusteredElCount', 'numValCategories', \
+                                  'numClusteredValCategories', 'numEdgeWeightCategories']
+_TRACK_INFO_OPTIONAL_DATETIME_ATTRS = ['timeOfPreProcessing', 'timeOfLastUpdate']
+_TRACK_INFO_PER_OVERLAP_RULE_ATTRS = ['fixedLengths', 'fixedGapSizes']
+
+#
+# A track bundle is a tar archive of the preprocessed files of a single track (the memmaps and the
+# bounding region shelve of each overlap rule), followed by a manifest with the TrackInfo metadata
+# and the SHA-1 checksum of each file. Importing a bundle places the files and stores the metadata,
+# without parsing or preprocessing.
+#
+
+class _HashingReader(object):
+    def __init__(self, fileObj):
+        self._fileObj = fileObj
+        self.sha1 = hashlib.sha1()
+
+    def read(self, size=-1):
+        data = self._fileObj.read(size)
+        self.sha1.update(data)
+        return data
+
+def _getTrackFileNames(genome, trackName, allowOverlaps):
+    'Returns the preprocessed files of the track itself, excluding subtracks.'
+    dirPath = createDirPath(trackName, genome, allowOverlaps=allowOverlaps)
+    if not os.path.exists(dirPath):
+        return []
+    return sorted(fn for fn in os.listdir(dirPath) if os.path.isfile(os.path.join(dirPath, fn)))
+
+def _getTrackInfoAttrs(ti):
+    attrs = {}
+    for attr in _TRACK_INFO_STR_ATTRS + _TRACK_INFO_BOOL_ATTRS + \
+                _TRACK_INFO_OPTIONAL_BOOL_ATTRS + _TRACK_INFO_OPTIONAL_INT_ATTRS:
+        attrs[attr] = getattr(ti, attr)
+    for attr in _TRACK_INFO_OPTIONAL_DATETIME_ATTRS:
+        val = getattr(ti, attr)
+        attrs[attr] = val.strftime(DATETIME_FORMAT) if val is not None else None
+    for attr in _TRACK_INFO_PER_OVERLAP_RULE_ATTRS:
+        attrs[attr] = dict((OVERLAP_DIR_NAMES[allowOverlaps], val) for allowOverlaps, val in getattr(ti, attr).iteritems())
+    return attrs
+
+def _parseTrackInfoAttrs(attrs):
+    'Returns the TrackInfo attributes of a manifest, checking the names and types of all values.'
+    def _invalid(attr):
+        return InvalidFormatError('Error: invalid TrackInfo attribute in track bundle manifest: %s' % attr)
+
+    def _checkOptional(attr, val, types):
+        if val is not None and (type(val) not in types):
+            raise _invalid(attr)
+        return val
+
+    if not isinstance(attrs, dict):
+        raise _invalid('trackInfo')
+
+    parsed = {}
+    for attr, val in attrs.iteritems():
+        if attr in _TRACK_INFO_STR_ATTRS:
+            if not isinstance(val, basestring):
+                raise _invalid(attr)
+            parsed[attr] = val.encode('utf-8') if isinstance(val, unicode) else val
+        elif attr in _TRACK_INFO_BOOL_ATTRS:
+            if type(val) != bool:
+                raise _invalid(attr)
+            parsed[attr] = val
+        elif attr in _TRACK_INFO_OPTIONAL_BOOL_ATTRS:
+            parsed[attr] = _checkOptional(attr, val, [bool])
+        elif attr in _TRACK_INFO_OPTIONAL_INT_ATTRS:
+            parsed[attr] = _checkOptional(attr, val, [int, long])
+        elif attr in _TRACK_INFO_OPTIONAL_DATETIME_ATTRS:
+            if _checkOptional(attr, val, [unicode, str]) is not None:
+                try:
+                    val = datetime.strptime(val, DATETIME_FORMAT)
+                except ValueError:
+                    raise _invalid(attr)
+            parsed[attr] = val
+        elif attr in _TRACK_INFO_PER_OVERLAP_RULE_ATTRS:
+            if not isinstance(val, dict):
+                raise _invalid(attr)
+            parsed[attr] = {}
+            for allowOverlaps, overlapDirName in OVERLAP_DIR_NAMES.iteritems():
+                if overlapDirName in val:
+                    parsed[attr][allowOverlaps] = _checkOptional(attr, val.pop(overlapDirName), [int, long])
+            if len(val) > 0:
+                raise _invalid(attr)
+        else:
+            raise _invalid(attr)
+    return parsed
+
+def _parseFileName(name):
+    '''
+    Returns allowOverlaps and the file name of a bundle entry named
+    <overlap dir>/<file name>, raising InvalidFormatError for any other name.
+    '''
+    parts = name.split('/') if isinstance(name, basestring) else []
+    if len(parts) != 2 or parts[1] in ['', '.', '..'] or os.sep in parts[1] or \
+            parts[0] not in OVERLAP_DIR_NAMES.values():
+        raise InvalidFormatError('Error: illegal file name in track bundle: %s' % name)
+    allowOverlaps = [key for key, val in OVERLAP_DIR_NAMES.iteritems() if val == parts[0]][0]
+    return allowOverlaps, str(parts[1])
+
+def exportTrackBundle(genome, trackName, bundleFn):
+    ti = TrackInfo(genome, trackName)
+    if not ti.isValid():
+        raise NotSupportedError('Track "%s" of genome "%s" has not been preprocessed.' % (':'.join(trackName), genome))
+
+    manifest = {'bundleVersion': BUNDLE_VERSION,
+                'genome': genome,
+                'trackName': trackName,
+                'compBinSize': CompBinManager.getIndexBinSize(),
+                'trackInfo': _getTrackInfoAttrs(ti),
+                'files': []}
+
+    ensurePathExists(bundleFn)
+    bundle = tarfile.open(bundleFn, 'w')
+    try:
+        for allowOverlaps in [False, True]:
+            dirPath = createDirPath(trackName, genome, allowOverlaps=allowOverlaps)
+            for fn in _getTrackFileNames(genome, trackName, allowOverlaps):
+                arcName = '/'.join([OVERLAP_DIR_NAMES[allowOverlaps], fn])
+                tarInfo = bundle.gettarinfo(os.path.join(dirPath, fn), arcName)
+                with open(os.path.join(dirPath, fn), 'rb') as dataFile:
+                    reader = _HashingReader(dataFile)
+                    bundle.addfile(tarInfo, reader)
+                manifest['files'].append({'name': arcName, 'size': tarInfo.size, 'sha1': reader.sha1.hexdigest()})
+
+        if len(manifest['files']) == 0:
+            raise NotSupportedError('No preprocessed files found for track "%s" of genome "%s".' % (':'.join(trackName), genome))
+
+        manifestData = json.dumps(manifest, indent=1, sort_keys=True)
+        tarInfo = tarfile.TarInfo(MANIFEST_NAME)
+        tarInfo.size = len(manifestData)
+        tarInfo.mtime = time.time()
+        bundle.addfile(tarInfo, StringIO(manifestData))
+    finally:
+        bundle.close()
+
+def readBundleManifest(bundleFn):
+    bundle = tarfile.open(bundleFn, 'r')
+    try:
+        return _readManifest(bundle)
+    finally:
+        bundle.close()
+
+def _readManifest(bundle):
+    try:
+        manifest = json.loads(bundle.extractfile(MANIFEST_NAME).read())
+    except (KeyError, ValueError), e:
+        raise InvalidFormatError('Error: not a valid track bundle, unable to read manifest: %s' % e)
+
+    if not isinstance(manifest, dict):
+        raise InvalidFormatError('Error: not a valid track bundle, the manifest is not a JSON object')
+    if manifest.get('bundleVersion') != BUNDLE_VERSION:
+        raise InvalidFormatError('Error: unsupported track bundle version: %s' % manifest.get('bundleVersion'))
+
+    if not isinstance(manifest.get('genome'), basestring) or not isinstance(manifest.get('trackName'), list) or \
+            not all(isinstance(x, basestring) for x in manifest['trackName']) or \
+            not isinstance(manifest.get('files'), list) or \
+            not all(isinstance(x, dict) and 'name' in x and 'sha1' in x for x in manifest['files']):
+        raise InvalidFormatError('Error: not a valid track bundle, the manifest is missing or has invalid fields')
+
+    manifest['trackName'] = [x.encode('utf-8') for x in manifest['trackName']]
+    manifest['genome'] = manifest['genome'].encode('utf-8')
+    return manifest
+
+def importTrackBundle(bundleFn, trackName=None):
+    '''
+    Imports a track bundle, replacing any preprocessed files of the track.
+    The track is stored under the original track name, unless trackName is
+    given. Returns the track name. Raises InvalidFormatError if any of the
+    files do not match the manifest checksums, in which case no files are
+    replaced.
+    '''
+    bundle = tarfile.open(bundleFn, 'r')
+    try:
+        manifest = _readManifest(bundle)
+        genome = manifest['genome']
+        if trackName is None:
+            trackName = manifest['trackName']
+
+        trackInfoAttrs = _parseTrackInfoAttrs(manifest['trackInfo'])
+
+        if manifest['compBinSize'] != CompBinManager.getIndexBinSize():
+            raise NotSupportedError('Error: track bundle was created with COMP_BIN_SIZE %s, not %s' % \
+                                    (manifest['compBinSize'], CompBinManager.getIndexBinSize()))
+
+        tempDirs = {}
+        try:
+            for fileInfo in manifest['files']:
+                allowOverlaps, fn = _parseFileName(fileInfo['name'])
+
+                if allowOverlaps not in tempDirs:
+                    dirPath = createDirPath(trackName, genome, allowOverlaps=allowOverlaps)
+                    ensurePathExists(dirPath + os.sep)
+                    #Files are extracted next to their final location, so that they can be moved in place
+                    tempDirs[allowOverlaps] = mkdtemp(prefix='.bundle', dir=dirPath)
+
+                try:
+                    reader = _HashingReader(bundle.extractfile(str(fileInfo['name'])))
+                except KeyError:
+                    raise InvalidFormatError('Error: file "%s" is missing from track bundle' % fileInfo['name'])
+                with open(os.path.join(tempDirs[allowOverlaps], fn), 'wb') as outFile:
+                    shutil.copyfileobj(reader, outFile)
+                if reader.sha1.hexdigest() != fileInfo['sha1']:
+                    raise InvalidFormatError('Error: checksum mismatch for file "%s" in track bundle' % fileInfo['name'])
+
+            for allowOverlaps, tempDir in tempDirs.iteritems():
+                dirPath = createDirPath(trackName, genome, allowOverlaps=allowOverlaps)
+                for fn in _getTrackFileNames(genome, trackName, allowOverlaps):
+                    os.unlink(os.path.join(dirPath, fn))
+                for fn in os.listdir(tempDir):
+                    os.rename(os.path.join(tempDir, fn), os.path.join(dirPath, fn))
+        finally:
+            for tempDir in tempDirs.values():
+                shutil.rmtree(tempDir, ignore_errors=True)
+    finally:
+        bundle.close()
+
+    ti = TrackInfo(genome, trackName)
+    ti.__dict__.update(trackInfoAttrs)
+    ti.store()
+    return trackName
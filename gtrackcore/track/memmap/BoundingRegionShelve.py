@@ -1,3 +1,4 @@
+import numpy
 import os
 
 from collections import namedtuple, OrderedDict
@@ -38,6 +39,9 @@ class BoundingRegionShelve(object):
         
     def fileExists(self):
         return os.path.exists(self._fn)
+    
+    def getFileName(self):
+        return self._fn
 
     def storeBoundingRegions(self, boundingRegionTuples, genomeElementChrList, sparse):
         assert sparse in [False, True]
@@ -85,8 +89,9 @@ class BoundingRegionShelve(object):
         
         if sparse:
             totBinCount = 0
+            chrTable = GenomeInfo.getChrTable(self._genome)
             for chr in tempContents:
-                chrLen = GenomeInfo.getChrLen(self._genome, chr)
+                chrLen = chrTable.getChrLen(chr)
                 numBinsInChr = CompBinManager.getNumOfBins(GenomeRegion(start=0, end=chrLen))
                 for key in tempContents[chr].keys():
                     startBinIdx = totBinCount
@@ -203,6 +208,21 @@ class BoundingRegionShelve(object):
             for brInfo in brInfosForChr:
                 yield GenomeRegion(self._genome, chr, brInfo.start, brInfo.end)
                 
+    def getBoundingRegionArraysForChr(self, chr):
+        'Returns arrays of the starts and ends of the bounding regions of the chromosome.'
+        self._updateContentsIfNecessary(chr)
+        
+        if chr in self._contents:
+            brInfoHolder = self._contents[chr]
+            if isinstance(brInfoHolder, dict):
+                brInfosForChr = brInfoHolder.values()
+            else:
+                brInfosForChr = brInfoHolder.brInfos
+            return numpy.array([brInfo.start for brInfo in brInfosForChr], dtype='int64'), \
+                   numpy.array([brInfo.end for brInfo in brInfosForChr], dtype='int64')
+        else:
+            return numpy.zeros(0, dtype='int64'), numpy.zeros(0, dtype='int64')
+    
     def getAllBoundingRegions(self):
         if not self.fileExists():
             from gtrackcore.util.CommonFunctions import prettyPrintTrackName
@@ -0,0 +1,73 @@
+import numpy
+
+def getCodeDataType(numCategories):
+    for dataType in ['uint8', 'uint16']:
+        if numCategories <= numpy.iinfo(dataType).max + 1:
+            return dataType
+    return 'int32'
+
+def shouldDictionaryEncode(array):
+    '''
+    Returns True if a string array is stored in less space as integer codes
+    and a table of the unique strings (categories) than as a plain array.
+    '''
+    if array.dtype.kind != 'S' or len(array.shape) != 1 or len(array) == 0:
+        return False
+
+    numCategories = len(numpy.unique(array))
+    encodedSize = len(array) * numpy.dtype(getCodeDataType(numCategories)).itemsize + \
+                  numCategories * array.dtype.itemsize
+    return encodedSize < array.nbytes
+
+
+class CategoricalArray(object):
+    '''
+    Dictionary-encoded string array: integer codes indexing a sorted table
+    of the unique strings (categories). Slicing and indexing by masks or index
+    arrays return new CategoricalArray objects sharing the same categories,
+    so that the strings are not created before decode() is called.
+    Categorical operations, e.g. filtering or grouping by category, may be
+    carried out directly on the codes.
+    '''
+
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def encode(cls, array):
+        categories, codes = numpy.unique(array, return_inverse=True)
+        return cls(codes.astype(getCodeDataType(len(categories))), categories)
+
+    def decode(self):
+        return self.categories[numpy.asarray(self.codes[0:len(self)])]
+
+    def __array__(self, dtype=None):
+        decoded = self.decode()
+        return decoded.astype(dtype) if dtype is not None else decoded
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    def __getslice__(self, i, j):
+        return CategoricalArray(self.codes[i:j], self.categories)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step is None:
+                return self.__getslice__(key.start or 0, key.stop if key.stop is not None else len(self))
+            return CategoricalArray(numpy.asarray(self.codes[0:len(self)])[key], self.categories)
+        if isinstance(key, (numpy.ndarray, list)):
+            return CategoricalArray(numpy.asarray(self.codes[0:len(self)])[key], self.categories)
+        return self.categories[self.codes[key]]
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    @property
+    def shape(self):
+        return tuple(self.codes.shape)
+
+    @property
+    def dtype(self):
+        return self.categories.dtype
@@ -16,6 +16,21 @@ def parseMemmapFileFn(fn):
     dtype = splittedFn[-1]
     return prefix, elementDim, dtypeDim, dtype
     
+CATEGORY_CODES_FILE_SUFFIX = 'codes'
+CATEGORY_TABLE_FILE_SUFFIX = 'categories'
+
+def createCategoricalFileFns(path, prefix, codeDataType, categoryDataType):
+    'Returns the file names of the codes and the category table of a dictionary-encoded array.'
+    return path + os.sep + prefix + '.' + codeDataType + '.' + CATEGORY_CODES_FILE_SUFFIX, \
+           path + os.sep + prefix + '.' + categoryDataType.replace('|', '') + '.' + CATEGORY_TABLE_FILE_SUFFIX
+
+def isCategoricalFileName(fn):
+    return os.path.basename(fn).split('.')[-1] in [CATEGORY_CODES_FILE_SUFFIX, CATEGORY_TABLE_FILE_SUFFIX]
+
+def parseCategoricalFileFn(fn):
+    prefix, dtype, suffix = os.path.basename(fn).split('.')
+    return prefix, dtype, suffix
+
 def calcShape(fn, elementDim, dtypeDim, dtype):
     dTypeSize = numpy.dtype(dtype).itemsize
     elementSize = dTypeSize * (elementDim if elementDim is not None else 1) * dtypeDim
@@ -1,6 +1,9 @@
+import numpy
 import os
 
-from gtrackcore.track.memmap.CommonMemmapFunctions import parseMemmapFileFn
+from gtrackcore.track.memmap.CategoricalArray import CategoricalArray
+from gtrackcore.track.memmap.CommonMemmapFunctions import parseMemmapFileFn, isCategoricalFileName, \
+                                                          parseCategoricalFileFn, CATEGORY_CODES_FILE_SUFFIX
 from gtrackcore.track.memmap.SmartMemmap import SmartMemmap
 from gtrackcore.track.memmap.BoundingRegionShelve import BoundingRegionShelve, isBoundingRegionFileName
 from gtrackcore.util.CommonFunctions import createDirPath
@@ -15,9 +18,27 @@ class TrackData(dict):
         self.boundingRegionShelve = None
 
 class TrackSource:
+    #If enabled, the opened files are shared by all TrackSource instances, e.g. in a long-running server
+    _SHARED_FILE_DICT = None
+
     def __init__(self):
         self._chrInUse = None
-        self._fileDict = {}
+        self._fileDict = self._SHARED_FILE_DICT if self._SHARED_FILE_DICT is not None else {}
+
+    @classmethod
+    def enableSharedFileCache(cls):
+        if cls._SHARED_FILE_DICT is None:
+            cls._SHARED_FILE_DICT = {}
+
+    @classmethod
+    def disableSharedFileCache(cls):
+        cls._SHARED_FILE_DICT = None
+
+    @classmethod
+    def clearSharedFileCache(cls):
+        'Releases the shared files, e.g. after tracks have been preprocessed anew.'
+        if cls._SHARED_FILE_DICT is not None:
+            cls._SHARED_FILE_DICT.clear()
     
     def getTrackData(self, trackName, genome, chr, allowOverlaps, forceChrFolders=False):
         trackData = TrackData()
@@ -27,6 +48,7 @@ class TrackSource:
             chr = None
         
         dir = createDirPath(trackName, genome, chr, allowOverlaps)
+        categoricalFns = {}
 
         for fn in os.listdir(dir):
             fullFn = dir + os.sep + fn
@@ -35,9 +57,15 @@ class TrackSource:
                 continue
                 
             if isBoundingRegionFileName(fn):
-                if fullFn not in self._fileDict:
-                    self._fileDict[fullFn] = brShelve
-                trackData.boundingRegionShelve = self._fileDict[fullFn]
+                fileKey = self._getFileKey(fullFn)
+                if fileKey not in self._fileDict:
+                    self._fileDict[fileKey] = brShelve
+                trackData.boundingRegionShelve = self._fileDict[fileKey]
+                continue
+            
+            if isCategoricalFileName(fn):
+                prefix, dtype, suffix = parseCategoricalFileFn(fn)
+                categoricalFns.setdefault(prefix, {})[suffix] = (fullFn, dtype)
                 continue
             
             prefix, elementDim, dtypeDim, dtype = parseMemmapFileFn(fn)
@@ -45,14 +73,38 @@ class TrackSource:
             assert prefix not in trackData
             trackData[prefix] = self._getFile(chr, dir, fullFn, elementDim, dtype, dtypeDim)
         
+        for prefix, fns in categoricalFns.iteritems():
+            assert prefix not in trackData
+            trackData[prefix] = self._getCategoricalFile(chr, dir, fns)
+        
         return trackData
     
+    def _getCategoricalFile(self, chr, dir, fns):
+        codesFn, codeDataType = fns[CATEGORY_CODES_FILE_SUFFIX]
+        tableFn, categoryDataType = [fns[suffix] for suffix in fns if suffix != CATEGORY_CODES_FILE_SUFFIX][0]
+        
+        codes = self._getFile(chr, dir, codesFn, None, codeDataType, 1)
+        tableKey = self._getFileKey(tableFn)
+        if tableKey not in self._fileDict:
+            self._fileDict[tableKey] = numpy.fromfile(tableFn, dtype=categoryDataType)
+        
+        return CategoricalArray(codes, self._fileDict[tableKey])
+    
     def _getFile(self, chr, dir, fullFn, elementDim, dtype, dtypeDim):
-        if chr is not None and chr != self._chrInUse:
+        if chr is not None and chr != self._chrInUse and self._fileDict is not self._SHARED_FILE_DICT:
             self._fileDict = {}
             self._chrInUse = chr
             
-        if fullFn not in self._fileDict:
-            self._fileDict[fullFn] = SmartMemmap(fullFn, elementDim=elementDim, dtype=dtype, dtypeDim=dtypeDim, mode='r')
+        fileKey = self._getFileKey(fullFn)
+        if fileKey not in self._fileDict:
+            self._fileDict[fileKey] = SmartMemmap(fullFn, elementDim=elementDim, dtype=dtype, dtypeDim=dtypeDim, mode='r')
+        
+        return self._fileDict[fileKey]
+    
+    def _getFileKey(self, fullFn):
+        if self._fileDict is not self._SHARED_FILE_DICT:
+            return fullFn
         
-        return self._fileDict[fullFn]        
+        #Shared files are kept for as long as the process runs, so files replaced by preprocessing must be opened anew
+        stat = os.stat(fullFn)
+        return (fullFn, stat.st_ino, stat.st_size, stat.st_mtime)        
@@ -1,10 +1,14 @@
+import numpy
+
 from collections import OrderedDict
 
 from gtrackcore.track.core.TrackView import TrackView
 from gtrackcore.track.format.TrackFormat import TrackFormat
 from gtrackcore.track.memmap.BoundingRegionShelve import BoundingRegionShelve
+from gtrackcore.track.memmap.CategoricalArray import CategoricalArray
 from gtrackcore.util.CompBinManager import CompBinManager
 from gtrackcore.util.CommonConstants import RESERVED_PREFIXES
+from gtrackcore.util.CustomExceptions import NotSupportedError
 
 class TrackViewLoader:
     @staticmethod
@@ -30,10 +34,37 @@ class TrackViewLoader:
         return array[bin] if bin is not None else array
 
     @staticmethod
-    def loadTrackView(trackData, region, borderHandling, allowOverlaps, trackName=[]):
+    def _applyColumnFilter(columnFilter, region, trackFormat, reservedArrays, extraArrays, extraArrayNames):
+        if trackFormat.reprIsDense():
+            raise NotSupportedError('Column filters are not supported for dense tracks: ' + str(trackFormat))
+
+        from gtrackcore.input.wrappers.GEColumnFilter import ColumnBatch
+        columns = dict((prefix, array) for prefix, array in \
+                       zip(RESERVED_PREFIXES.keys() + extraArrayNames, reservedArrays + extraArrays) \
+                       if array is not None)
+        mask = columnFilter.getMask(ColumnBatch(region.genome, region.chr, columns))
+
+        return [TrackViewLoader._getMasked(array, mask) for array in reservedArrays], \
+               [TrackViewLoader._getMasked(array, mask) for array in extraArrays]
+
+    @staticmethod
+    def _getMasked(array, mask):
+        if array is None:
+            return None
+        if isinstance(array, CategoricalArray):
+            return array[mask]
+        return numpy.asarray(array)[mask]
+
+    @staticmethod
+    def _decode(array):
+        return array.decode() if isinstance(array, CategoricalArray) else array
+
+    @staticmethod
+    def loadTrackView(trackData, region, borderHandling, allowOverlaps, trackName=[], columnFilter=None):
         """
         trackData : see TrackSource.getTrackData {'id' : smartmemmap}
         region : see GenomeRegion
+        columnFilter : optional filter expression (see GEColumnFilter), evaluated on the sliced arrays
         """
         #brShelve = BoundingRegionShelve(region.genome, trackName, allowOverlaps)
         brShelve = trackData.boundingRegionShelve
@@ -68,6 +99,14 @@ class TrackViewLoader:
         slicedReservedArrays = [(array[leftIndex:rightIndex] if array is not None else None) for array in reservedArrays]
         slicedExtraArrays = [(array[leftIndex:rightIndex] if array is not None else None) for array in extraArrays]
         
+        if columnFilter is not None:
+            slicedReservedArrays, slicedExtraArrays = \
+                TrackViewLoader._applyColumnFilter(columnFilter, region, trackFormat, \
+                                                   slicedReservedArrays, slicedExtraArrays, extraArrayNames)
+        
+        slicedReservedArrays = [TrackViewLoader._decode(array) for array in slicedReservedArrays]
+        slicedExtraArrays = [TrackViewLoader._decode(array) for array in slicedExtraArrays]
+        
         argList = [region] + slicedReservedArrays + [borderHandling, allowOverlaps] + [OrderedDict(zip(extraArrayNames, slicedExtraArrays))]
         tv = TrackView( *(argList) )
         
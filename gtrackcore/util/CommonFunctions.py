@@ -2,7 +2,6 @@ import os
 #import sys
 import functools
 import re
-import urllib
 #import contextlib
 #import traceback
 #import numpy
@@ -263,7 +262,8 @@ def convertTNstrToTNListFormat(tnStr, doUnquoting=False):
     tnStr = tnStr.strip()
     tnList = re.split(':|\^|\|', tnStr)
     if doUnquoting:        
-        tnList = [urllib.unquote(x) for x in tnList]
+        from urllib import unquote
+        tnList = [unquote(x) for x in tnList]
     return tnList
 #    
 ##used by echo
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import pkg_resources
+
+from gtrackcore.input.core.CompactGenomeElement import CompactGenomeElement, GenomeElementSchema
+from gtrackcore.input.core.GenomeElement import GenomeElement
+from gtrackcore.input.core.GenomeElementSource import GenomeElementSource
+
+BENCHMARK_FILES = ['BedGenomeElementSource/ucscGenes_chr21.bed',
+                   'BedGraphGenomeElementSource/generated_chr21_10000.bedgraph',
+                   'BedValuedGenomeElementSource/geneswithpvals.valued.bed',
+                   'GffGenomeElementSource/MotifFeatures_hg19_chr21.gff']
+
+def getElementSize(ge):
+    'Approximate number of bytes allocated for the element itself, excluding the attribute values.'
+    size = sys.getsizeof(ge)
+    if isinstance(ge, GenomeElement):
+        size += sys.getsizeof(ge.__dict__) + sys.getsizeof(ge.__dict__['extra']) + \
+                sys.getsizeof(ge.__dict__['orderedExtraKeys'])
+    else:
+        size += sys.getsizeof(ge._extraVals)
+    return size
+
+def _createElements(geCls, fieldTuples, schema):
+    if geCls is GenomeElement:
+        return [GenomeElement(genome, chr, start, end, val, strand, id, extra=extra, orderedExtraKeys=list(keys)) \
+                for genome, chr, start, end, val, strand, id, keys, extra in fieldTuples]
+    else:
+        return [CompactGenomeElement(genome, chr, start, end, val, strand, id, extra=extra, orderedExtraKeys=keys, schema=schema) \
+                for genome, chr, start, end, val, strand, id, keys, extra in fieldTuples]
+
+def _timeIt(func, repeats):
+    t = time.time()
+    for i in xrange(repeats):
+        func()
+    return time.time() - t
+
+def runBenchmark(genome='TestGenome', repeats=100, out=sys.stdout):
+    dataDir = os.path.join(pkg_resources.resource_filename('gtrackcore', 'data'), 'GESourceTracks')
+
+    print >>out, '%-45s %-22s %10s %14s %14s' % ('File', 'Element type', 'Bytes/el', 'Create (el/s)', 'getCopy (el/s)')
+    for fn in BENCHMARK_FILES:
+        geSource = GenomeElementSource(os.path.join(dataDir, fn), genome=genome)
+        fieldTuples = [(ge.genome, ge.chr, ge.start, ge.end, ge.val, ge.strand, ge.id, ge.orderedExtraKeys, ge.extra) \
+                       for ge in geSource]
+        numEls = len(fieldTuples) * repeats
+
+        for geCls in [GenomeElement, CompactGenomeElement]:
+            schema = GenomeElementSchema()
+            geList = _createElements(geCls, fieldTuples, schema)
+            bytesPerEl = 1.0 * sum(getElementSize(ge) for ge in geList) / len(geList)
+
+            createTime = _timeIt(lambda: _createElements(geCls, fieldTuples, schema), repeats)
+            copyTime = _timeIt(lambda: [ge.getCopy() for ge in geList], repeats)
+
+            print >>out, '%-45s %-22s %10.1f %14.0f %14.0f' % \
+                (os.path.basename(fn), geCls.__name__, bytesPerEl, numEls / createTime, numEls / copyTime)
+
+if __name__ == "__main__":
+    runBenchmark(*sys.argv[1:2])
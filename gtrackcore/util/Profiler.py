@@ -1,23 +1,23 @@
 #import cProfile
-import profile
-import pstats
-
-import hotshot, hotshot.stats
+#import pstats
 
 #from gtrackcore.util.StaticFile import GalaxyRunSpecificFile
-from gtrackcore.util.CommonFunctions import ensurePathExists
-from gtrackcore.util.HtmlCore import HtmlCore
+#from gtrackcore.util.CommonFunctions import ensurePathExists
+#from gtrackcore.util.HtmlCore import HtmlCore
 
+#The profiling modules are imported on first use, as they are slow to import
 class Profiler:
     PROFILE_HEADER = '--- Profile ---'
     PROFILE_FOOTER = '--- End Profile ---'
 
     def __init__(self):
+        import hotshot
         #self._prof = cProfile.Profile()
         self._prof = hotshot.Profile("hotspot.prof")
         self._stats = None
 
     def run(self, runStr, globals, locals):
+        import hotshot.stats
         self._prof = self._prof.runctx(runStr, globals, locals)
         self._prof.close()
         #self._stats = pstats.Stats(self._prof)